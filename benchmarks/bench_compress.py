@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Zip Compression Benchmark
+Compares shutil.make_archive with the parallel ZipCompressor at the same
+deflate level, and checks that both archives hold the same contents.
+
+Usage:
+    python benchmarks/bench_compress.py [--total-mb 512] [--level 6] [--workdir DIR]
+    python benchmarks/bench_compress.py --root /data/project --workers 1 4 8
+
+Generated trees mix compressible text, source-like files and
+already-compressed media, which the compressor stores rather than deflates.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.zip_compressor import ZipCompressor
+
+WORDS = ("the quick brown fox jumps over lazy dog lorem ipsum dolor sit amet "
+         "def class return import self value index buffer offset error").split()
+
+def make_mixed_tree(root: Path, total_mb: int, seed: int = 1):
+    """Build a tree of text logs, small sources and incompressible media"""
+    rng = random.Random(seed)
+    budget = total_mb * 1024 * 1024
+    written = 0
+    index = 0
+    while written < budget:
+        folder = root / f"dir_{index // 100:04d}"
+        folder.mkdir(exist_ok=True)
+        kind = rng.random()
+        if kind < 0.6:
+            lines = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(rng.randint(50, 2000))]
+            data = "\n".join(lines).encode()
+            (folder / f"source_{index}.py").write_bytes(data)
+        elif kind < 0.9:
+            lines = [f"{index}-{i} INFO {' '.join(rng.choice(WORDS) for _ in range(8))}"
+                     for i in range(rng.randint(20000, 120000))]
+            data = "\n".join(lines).encode()
+            (folder / f"log_{index}.log").write_bytes(data)
+        else:
+            data = os.urandom(rng.randint(1, 8) * 1024 * 1024)
+            (folder / f"photo_{index}.jpg").write_bytes(data)
+        written += len(data)
+        index += 1
+
+def archive_contents(path: Path):
+    """{name: crc} of the files in an archive"""
+    with zipfile.ZipFile(path) as archive:
+        return {info.filename: info.CRC for info in archive.infolist() if not info.is_dir()}
+
+def timed(label, function):
+    """Run function and print its wall time"""
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--total-mb', type=int, default=512)
+    parser.add_argument('--level', type=int, default=6)
+    parser.add_argument('--workers', type=int, nargs='*', default=None)
+    parser.add_argument('--workdir', default=None)
+    parser.add_argument('--root', default=None)
+    args = parser.parse_args()
+    workers = args.workers or sorted({1, os.cpu_count() or 1})
+    
+    def run(root: Path, out: Path):
+        print(f"{os.cpu_count()} CPUs, deflate level {args.level}")
+        baseline = out / "make_archive.zip"
+        _, base_time = timed("shutil.make_archive", lambda: shutil.make_archive(
+            str(baseline.with_suffix('')), 'zip', root))
+        expected = archive_contents(baseline)
+        print(f"{'':<28} {baseline.stat().st_size / 1048576:8.1f} MB")
+        for count in workers:
+            output = out / f"parallel_{count}.zip"
+            compressor = ZipCompressor(level=args.level, workers=count)
+            _, elapsed = timed(f"ZipCompressor ({count} threads)",
+                               lambda: compressor.compress(root, output))
+            matches = archive_contents(output) == expected
+            with zipfile.ZipFile(output) as archive:
+                intact = archive.testzip() is None
+            print(f"{'':<28} {output.stat().st_size / 1048576:8.1f} MB  "
+                  f"contents match: {matches}  crc ok: {intact}  speedup: {base_time / elapsed:.1f}x")
+            
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        tmp = Path(tmp)
+        if args.root:
+            run(Path(args.root), tmp)
+            return
+        root = tmp / "tree"
+        root.mkdir()
+        print(f"Generating {args.total_mb} MB mixed tree in {root} ...")
+        make_mixed_tree(root, args.total_mb)
+        run(root, tmp)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Viewport Highlighting Benchmark
+Times row decoding plus tokenizing for one screen of a large source file,
+the per-scroll work PagedViewer does before handing tags to Tk.
+
+Usage:
+    python benchmarks/bench_highlight.py [--lines 100000] [--rows 60] [--language python]
+    python benchmarks/bench_highlight.py --file /var/log/syslog --language log
+
+Scrolling reuses tokens cached by row text, as the viewer does; jumps
+start from an empty cache.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.mapped_file import TextDocument
+from src.utils.syntax import tokenize
+
+SOURCE_LINES = [
+    "class Widget{n}(Base):",
+    "    \"\"\"Docstring for widget {n}\"\"\"",
+    "    def render(self, rows, top=0, scale=1.5):",
+    "        if rows is None or len(rows) == 0:  # nothing to draw",
+    "            return {{'status': \"empty\", 'count': 0x{n:x}}}",
+    "        for index, row in enumerate(rows):",
+    "            self.draw(index, row.strip(), color='#{n:06x}', width=12)",
+    "        @property",
+    "        result = [value * 2 for value in range({n}) if value % 3]",
+    "",
+]
+
+def make_source(path: Path, lines: int):
+    """Write a Python-like file of the given number of lines"""
+    with open(path, 'w') as f:
+        for n in range(lines):
+            f.write(SOURCE_LINES[n % len(SOURCE_LINES)].format(n=n) + "\n")
+
+def render(document, language, top, rows, cache):
+    """Decode and tokenize one window; returns the offset after it"""
+    lines, end = document.rows(top, rows)
+    for line in lines:
+        if line not in cache:
+            cache[line] = tokenize(language, line)
+    return end
+
+def report(label, samples):
+    """Print percentiles of per-window times in milliseconds"""
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    print(f"{label:<22} p50 {pick(0.5):6.2f} ms   p99 {pick(0.99):6.2f} ms   max {samples[-1] * 1000:6.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--rows', type=int, default=60)
+    parser.add_argument('--language', default='python')
+    parser.add_argument('--file', default=None)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.file) if args.file else Path(tmp) / "source.py"
+        if not args.file:
+            make_source(path, args.lines)
+        document = TextDocument(path)
+        print(f"{path.name}: {document.size / 1048576:.1f} MB, {args.rows} rows per window")
+        
+        cache = {}
+        samples = []
+        top = 0
+        while top < document.size and len(samples) < 20000:
+            start = time.perf_counter()
+            render(document, args.language, top, args.rows, cache)
+            samples.append(time.perf_counter() - start)
+            top = document.step(top, 3)
+        report("scroll by 3 rows", samples)
+        
+        rng = random.Random(1)
+        samples = []
+        for _ in range(2000):
+            top = document.seek_fraction(rng.random())
+            start = time.perf_counter()
+            render(document, args.language, top, args.rows, {})
+            samples.append(time.perf_counter() - start)
+        report("jump, cold cache", samples)
+        document.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
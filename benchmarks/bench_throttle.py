@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Listing Latency Benchmark
+Measures directory listing latency while a background copy runs,
+with and without bandwidth throttling and low I/O priority.
+
+Usage:
+    python benchmarks/bench_throttle.py [--size-mb 512] [--files 5000]
+                                        [--rate-mb 50] [--workdir DIR]
+
+Use --workdir on the disk you want to measure; the default temporary
+directory is often tmpfs, where the copy never touches a real device.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.copy_engine import CopyEngine
+from src.utils.jobs import BackgroundJob
+
+def make_fixture(workdir: Path, size_mb: int, file_count: int):
+    """Create a large source file and a directory with many small files"""
+    source = workdir / "source"
+    source.mkdir()
+    chunk = os.urandom(1024 * 1024)
+    with open(source / "big.bin", 'wb') as f:
+        for _ in range(size_mb):
+            f.write(chunk)
+            
+    listing = workdir / "listing"
+    listing.mkdir()
+    for i in range(file_count):
+        (listing / f"file_{i:06d}.txt").write_bytes(b"x" * (i % 4096))
+    return source / "big.bin", listing
+
+def list_directory(path: Path):
+    """Emulate FileListView: one scandir pass plus a stat per entry"""
+    with os.scandir(path) as it:
+        return [entry.stat() for entry in it]
+
+def measure(listing: Path, source: Path, destination: Path, rate: int, low_priority: bool):
+    """Return listing latencies (ms) sampled while a copy job runs"""
+    engine = CopyEngine()
+    destination.mkdir(exist_ok=True)
+    for item in destination.iterdir():
+        item.unlink()
+        
+    job = BackgroundJob("bench-copy",
+                        lambda job: engine.copy([source], destination, rate,
+                                                cancel_event=job.cancel_event),
+                        low_priority=low_priority)
+    job.start()
+    
+    samples = []
+    deadline = time.monotonic() + 10
+    while job.is_running() and time.monotonic() < deadline:
+        # Drop the listing from the page cache where possible so the
+        # measurement competes with the copy for the disk
+        if hasattr(os, 'posix_fadvise'):
+            fd = os.open(listing, os.O_RDONLY)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            os.close(fd)
+        start = time.perf_counter()
+        list_directory(listing)
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.05)
+        
+    job.cancel()
+    job.join()
+    return samples
+
+def report(label, samples):
+    """Print latency statistics"""
+    if not samples:
+        print(f"{label:<32} no samples (copy finished too quickly; raise --size-mb)")
+        return
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(f"{label:<32} median {statistics.median(samples):7.2f} ms   "
+          f"p95 {p95:7.2f} ms   max {samples[-1]:7.2f} ms   n={len(samples)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size-mb', type=int, default=512)
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--rate-mb', type=int, default=50)
+    parser.add_argument('--workdir', default=None)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        workdir = Path(tmp)
+        source, listing = make_fixture(workdir, args.size_mb, args.files)
+        destination = workdir / "destination"
+        
+        idle = []
+        for _ in range(20):
+            start = time.perf_counter()
+            list_directory(listing)
+            idle.append((time.perf_counter() - start) * 1000)
+            
+        report("idle", idle)
+        report("unthrottled copy", measure(listing, source, destination, 0, False))
+        report(f"throttled {args.rate_mb} MB/s + low priority",
+               measure(listing, source, destination, args.rate_mb * 1024 * 1024, True))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -19,6 +19,7 @@ from src.utils.logger import Logger
 class FileManagerApp:
     def __init__(self):
         self.root = tk.Tk()
+        self.shut_down = False
         self.setup_application()
         
     def setup_application(self):
@@ -61,19 +62,30 @@ class FileManagerApp:
         
     def on_closing(self):
         """Handle application closing"""
+        try:
+            self.shutdown()
+        finally:
+            self.root.destroy()
+            
+    def shutdown(self):
+        """Save settings and flush caches; runs once, whichever way the app exits"""
+        if self.shut_down:
+            return
+        self.shut_down = True
         try:
             # Save settings
-            self.settings.save()
+            self.settings.close()
+            self.file_manager.file_ops.close()
             self.logger.info("Application closed successfully")
         except Exception as e:
             self.logger.error(f"Error during shutdown: {e}")
-        finally:
-            self.root.destroy()
             
     def run(self):
         """Start the application"""
         self.logger.info("Starting Advanced File Manager")
         self.root.mainloop()
+        # File > Exit leaves the loop without on_closing
+        self.shutdown()
 
 def main():
     """Main entry point"""
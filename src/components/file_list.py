@@ -10,11 +10,21 @@ from pathlib import Path
 from datetime import datetime
 import mimetypes
 
+from ..utils.jobs import BackgroundJob, JobCancelled
+
 class FileListView(ttk.Treeview):
     def __init__(self, parent, file_manager):
         super().__init__(parent, show='tree headings')
         self.file_manager = file_manager
         self.view_mode = 'detail'
+        self.folder_items = {}  # item id -> folder path still waiting for a size
+        self.size_jobs = []
+        self.size_refresh_pending = None
+        self.archive_job = None
+        self.records = {}  # item id -> [path, is_dir, size in bytes or None while a folder is unsized]
+        self.selected = set()  # item ids counted in the selection totals
+        self.selected_size = 0
+        self.selected_unsized = 0  # selected folders whose size is not known yet
         self.setup_columns()
         self.setup_bindings()
         
@@ -34,9 +44,9 @@ class FileListView(ttk.Treeview):
         self.column('modified', width=150, minwidth=120)
         
         # Add scrollbars
-        v_scrollbar = ttk.Scrollbar(self.master, orient='vertical', command=self.yview)
-        v_scrollbar.pack(side='right', fill='y')
-        self.configure(yscrollcommand=v_scrollbar.set)
+        self.v_scrollbar = ttk.Scrollbar(self.master, orient='vertical', command=self.yview)
+        self.v_scrollbar.pack(side='right', fill='y')
+        self.configure(yscrollcommand=self.on_scroll)
         
         h_scrollbar = ttk.Scrollbar(self.master, orient='horizontal', command=self.xview)
         h_scrollbar.pack(side='bottom', fill='x')
@@ -47,12 +57,21 @@ class FileListView(ttk.Treeview):
         self.bind('<Double-1>', self.on_double_click)
         self.bind('<Button-3>', self.on_right_click)
         self.bind('<<TreeviewSelect>>', self.on_select)
+        self.bind('<Configure>', lambda e: self.schedule_folder_sizes())
         
     def update_list(self, path):
         """Update file list for given path"""
         # Clear existing items
         self.delete(*self.get_children())
-        
+        self.cancel_folder_sizes()
+        self.clear_selection_totals()
+        if self.archive_job is not None:
+            self.archive_job.cancel()
+            self.archive_job = None
+        if self.file_manager.current_archive:
+            self.show_archive(path, *self.file_manager.current_archive)
+            return
+            
         try:
             items = []
             
@@ -63,6 +82,7 @@ class FileListView(ttk.Treeview):
                     'path': path.parent,
                     'is_dir': True,
                     'size': '',
+                    'bytes': None,
                     'type': 'Folder',
                     'modified': ''
                 })
@@ -76,13 +96,28 @@ class FileListView(ttk.Treeview):
                 items.append(item_info)
                 
             # Add items to tree
+            size_engine = self.file_manager.file_ops.size_engine
+            show_folder_sizes = self.file_manager.settings.get('show_folder_sizes', False)
             for item in items:
                 icon = self.get_icon(item)
-                self.insert('', 'end',
-                           text=f"{icon} {item['name']}",
-                           values=(item['size'], item['type'], item['modified']),
-                           tags=('directory' if item['is_dir'] else 'file',))
-                           
+                item_id = self.insert('', 'end',
+                                      text=f"{icon} {item['name']}",
+                                      values=(item['size'], item['type'], item['modified']),
+                                      tags=('directory' if item['is_dir'] else 'file',))
+                if item['name'] == '..':
+                    continue
+                size = item['bytes']
+                if item['is_dir']:
+                    total = size_engine.cached(item['path']) if show_folder_sizes else None
+                    if total is not None:
+                        size = total.size
+                        self.set(item_id, 'size', self.format_size(size))
+                    else:
+                        self.folder_items[item_id] = item['path']
+                self.records[item_id] = [item['path'], item['is_dir'], size]
+                
+            self.schedule_folder_sizes()
+            
         except PermissionError:
             self.insert('', 'end', text="❌ Permission Denied", values=('', '', ''))
         except Exception as e:
@@ -107,6 +142,7 @@ class FileListView(ttk.Treeview):
                 'path': path,
                 'is_dir': path.is_dir(),
                 'size': size,
+                'bytes': None if path.is_dir() else stat.st_size,
                 'type': file_type,
                 'modified': modified
             }
@@ -116,10 +152,142 @@ class FileListView(ttk.Treeview):
                 'path': path,
                 'is_dir': path.is_dir(),
                 'size': '',
+                'bytes': None if path.is_dir() else 0,
                 'type': 'Unknown',
                 'modified': ''
             }
             
+    def show_archive(self, path, archive, inner):
+        """List a folder inside an archive, reading the archive index off the UI thread if needed"""
+        archive_indexes = self.file_manager.file_ops.archive_indexes
+        index = archive_indexes.cached(archive)
+        if index is not None:
+            self.list_archive_folder(path, index, inner)
+            return
+        self.insert('', 'end', text=f"⏳ Reading {archive.name}...", values=('', '', ''))
+        
+        def on_done(index, error):
+            if not isinstance(error, JobCancelled):
+                self.after(0, lambda: self.finish_archive_listing(path, index, inner, error))
+                
+        def run(job):
+            return archive_indexes.get(archive, job.cancel_event)
+            
+        self.archive_job = BackgroundJob("Reading archive", run, done_callback=on_done).start()
+        
+    def finish_archive_listing(self, path, index, inner, error):
+        """Show a freshly read archive if the user is still looking at it"""
+        if path != self.file_manager.current_path:
+            return
+        self.archive_job = None
+        self.delete(*self.get_children())
+        if error:
+            self.insert('', 'end', text=f"❌ Error: {error}", values=('', '', ''))
+        else:
+            self.list_archive_folder(path, index, inner)
+            
+    def list_archive_folder(self, path, index, inner):
+        """Fill the list from an archive index entry's children"""
+        try:
+            entries = index.listdir(inner)
+        except NotADirectoryError as e:
+            self.insert('', 'end', text=f"❌ Error: {e}", values=('', '', ''))
+            return
+        self.insert('', 'end', text="⬆️ ..", values=('', 'Folder', ''), tags=('directory',))
+        show_hidden = self.file_manager.settings.get('show_hidden', False)
+        for entry in sorted(entries, key=lambda entry: (not entry.is_dir, entry.name.lower())):
+            if entry.name.startswith('.') and not show_hidden:
+                continue
+            item = {
+                'name': entry.name,
+                'path': path / entry.name,
+                'is_dir': entry.is_dir,
+                'size': self.format_size(entry.size),
+                'type': 'Folder' if entry.is_dir else self.get_file_type(Path(entry.name)),
+                'modified': datetime.fromtimestamp(entry.mtime).strftime('%Y-%m-%d %H:%M') if entry.mtime else ''
+            }
+            item_id = self.insert('', 'end',
+                                  text=f"{self.get_icon(item)} {item['name']}",
+                                  values=(item['size'], item['type'], item['modified']),
+                                  tags=('directory' if entry.is_dir else 'file',))
+            self.records[item_id] = [item['path'], entry.is_dir, entry.size]
+            
+    def on_scroll(self, first, last):
+        """Update the scrollbar and size newly visible folders"""
+        self.v_scrollbar.set(first, last)
+        self.schedule_folder_sizes()
+        
+    def schedule_folder_sizes(self):
+        """Size visible folders once scrolling settles"""
+        if not self.file_manager.settings.get('show_folder_sizes', False) or not self.folder_items:
+            return
+        if self.size_refresh_pending:
+            self.after_cancel(self.size_refresh_pending)
+        self.size_refresh_pending = self.after(150, self.request_visible_sizes)
+        
+    def visible_items(self):
+        """Item ids of rows currently scrolled into view"""
+        children = self.get_children()
+        if not children:
+            return []
+        first, last = self.yview()
+        start = int(first * len(children))
+        end = min(len(children), int(last * len(children)) + 1)
+        return children[start:end]
+        
+    def request_visible_sizes(self):
+        """Compute recursive sizes of visible folders in a background job"""
+        self.size_refresh_pending = None
+        pending = [(item_id, self.folder_items.pop(item_id))
+                   for item_id in self.visible_items() if item_id in self.folder_items]
+        if pending:
+            self.size_folders(pending)
+            
+    def size_folders(self, pending):
+        """Compute recursive sizes of (item id, path) folders in a background job"""
+        for item_id, path in pending:
+            self.set(item_id, 'size', '...')
+        size_engine = self.file_manager.file_ops.size_engine
+        
+        def run(job):
+            for item_id, path in pending:
+                total = size_engine.directory_size(path, cancel_event=job.cancel_event)
+                self.after(0, lambda i=item_id, t=total: self.set_item_size(i, t))
+                
+        job = BackgroundJob("Folder sizes", run, low_priority=True)
+        self.size_jobs = [running for running in self.size_jobs if running.is_running()]
+        self.size_jobs.append(job)
+        job.start()
+        
+    def set_item_size(self, item_id, total):
+        """Show a computed folder size if its row still exists"""
+        if self.exists(item_id):
+            self.set(item_id, 'size', self.format_size(total.size))
+        record = self.records.get(item_id)
+        if record is not None and record[2] is None:
+            record[2] = total.size
+            if item_id in self.selected:
+                self.selected_unsized -= 1
+                self.selected_size += total.size
+                self.show_selection_totals()
+                
+    def show_folder_size(self, path, total):
+        """Show a folder size computed elsewhere in the matching row"""
+        for item_id in self.get_children():
+            if self.item(item_id, 'text').split(' ', 1)[-1] == path.name:
+                self.folder_items.pop(item_id, None)
+                self.set_item_size(item_id, total)
+                
+    def cancel_folder_sizes(self):
+        """Stop sizing folders of the previous listing"""
+        for job in self.size_jobs:
+            job.cancel()
+        self.size_jobs = []
+        self.folder_items = {}
+        if self.size_refresh_pending:
+            self.after_cancel(self.size_refresh_pending)
+            self.size_refresh_pending = None
+            
     def format_size(self, size):
         """Format file size in human readable format"""
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -211,12 +379,59 @@ class FileListView(ttk.Treeview):
             
     def on_select(self, event):
         """Handle selection change"""
+        self.update_selection_totals()
         selection = self.get_selection()
         if selection:
             path = self.file_manager.current_path / selection[0].split(' ', 1)[1]
-            if path.exists() and path.is_file():
+            if self.file_manager.current_archive or (path.exists() and path.is_file()):
                 self.file_manager.preview_panel.update_preview(path)
                 
+    def update_selection_totals(self):
+        """Add or subtract the cached sizes of rows whose selection changed since the last event"""
+        current = {item_id for item_id in self.selection() if item_id in self.records}
+        unsized = []
+        for item_id in self.selected - current:
+            size = self.records[item_id][2]
+            if size is None:
+                self.selected_unsized -= 1
+            else:
+                self.selected_size -= size
+        for item_id in current - self.selected:
+            size = self.records[item_id][2]
+            if size is None:
+                self.selected_unsized += 1
+                if item_id in self.folder_items:
+                    unsized.append(item_id)
+            else:
+                self.selected_size += size
+        self.selected = current
+        if unsized and self.file_manager.settings.get('show_folder_sizes', False):
+            self.size_folders([(item_id, self.folder_items.pop(item_id)) for item_id in unsized])
+        self.show_selection_totals()
+        
+    def clear_selection_totals(self):
+        """Forget the selection totals of the previous listing"""
+        self.records = {}
+        self.selected = set()
+        self.selected_size = 0
+        self.selected_unsized = 0
+        if hasattr(self.file_manager, 'status_bar'):
+            self.show_selection_totals()
+            
+    def show_selection_totals(self):
+        """Show the selected count and size in the status bar"""
+        count = len(self.selected)
+        total_size = None
+        if count and count > self.selected_unsized:
+            total_size = self.format_size(self.selected_size)
+        if self.selected_unsized:
+            folders = f"{self.selected_unsized} folder{'s' if self.selected_unsized != 1 else ''}"
+            if self.file_manager.settings.get('show_folder_sizes', False):
+                total_size = f"{total_size or self.format_size(self.selected_size)}, sizing {folders}..."
+            elif total_size:
+                total_size = f"{total_size} + {folders}"
+        self.file_manager.status_bar.update_selection(count, total_size)
+        
     def get_selection(self):
         """Get selected items"""
         selection = self.selection()
@@ -0,0 +1,349 @@
+"""
+Paged Viewer Component
+Shows the visible window of a memory-mapped document
+"""
+
+import time
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+from ..utils.jobs import BackgroundJob, JobCancelled
+from ..utils.syntax import tokenize
+
+SYNTAX_COLORS = {
+    'keyword': '#0033b3',
+    'builtin': '#871094',
+    'decorator': '#9e880d',
+    'string': '#067d17',
+    'comment': '#8c8c8c',
+    'number': '#1750eb',
+    'key': '#871094',
+    'variable': '#c15b00',
+    'timestamp': '#7a7a7a',
+    'error': '#d00000',
+    'warning': '#b36b00',
+    'info': '#2a6099',
+}
+
+class PagedViewer(ttk.Frame):
+    MATCH_CONTEXT = 2  # rows shown above a match that was off screen
+    HIGHLIGHT_BUDGET = 0.008  # seconds of tokenizing per render; leave the rest of the window plain
+    TOKEN_CACHE_ROWS = 4096
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.document = None
+        self.language = None
+        self.token_cache = {}  # row text -> tokens, so scrolling only tokenizes new rows
+        self.top = 0
+        self.index_job = None
+        self.window_end = 0
+        self.find_job = None
+        self.count_job = None
+        self.find_key = None
+        self.find_pattern = None
+        self.match = None  # (start, end) byte span of the current match
+        self.setup_ui()
+        
+    def setup_ui(self):
+        """Setup jump bar, text window and scrollbar"""
+        jump_frame = ttk.Frame(self)
+        jump_frame.pack(fill=tk.X, pady=(0, 2))
+        
+        self.jump_label = tk.StringVar(value="Go to:")
+        ttk.Label(jump_frame, textvariable=self.jump_label).pack(side=tk.LEFT)
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(jump_frame, textvariable=self.jump_var, width=12)
+        jump_entry.pack(side=tk.LEFT, padx=5)
+        jump_entry.bind('<Return>', lambda e: self.jump())
+        
+        self.position_var = tk.StringVar(value="")
+        ttk.Label(jump_frame, textvariable=self.position_var).pack(side=tk.RIGHT)
+        
+        find_frame = ttk.Frame(self)
+        find_frame.pack(fill=tk.X, pady=(0, 2))
+        
+        ttk.Label(find_frame, text="Find:").pack(side=tk.LEFT)
+        self.find_var = tk.StringVar()
+        self.find_entry = ttk.Entry(find_frame, textvariable=self.find_var, width=20)
+        self.find_entry.pack(side=tk.LEFT, padx=5)
+        self.find_entry.bind('<Return>', lambda e: self.find())
+        self.find_entry.bind('<Shift-Return>', lambda e: self.find(backwards=True))
+        ttk.Button(find_frame, text="◀", width=3, command=lambda: self.find(backwards=True)).pack(side=tk.LEFT)
+        ttk.Button(find_frame, text="▶", width=3, command=self.find).pack(side=tk.LEFT, padx=(2, 5))
+        self.regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(find_frame, text="Regex", variable=self.regex_var).pack(side=tk.LEFT)
+        self.case_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(find_frame, text="Match case", variable=self.case_var).pack(side=tk.LEFT, padx=5)
+        
+        self.count_var = tk.StringVar(value="")
+        ttk.Label(find_frame, textvariable=self.count_var).pack(side=tk.RIGHT)
+        
+        text_frame = ttk.Frame(self)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.font = tkfont.Font(family='Courier', size=9)
+        self.text = tk.Text(text_frame, wrap=tk.NONE, font=self.font, state='disabled')
+        self.scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        for token, color in SYNTAX_COLORS.items():
+            self.text.tag_configure(token, foreground=color)
+        self.text.tag_configure('match', background='#fff176')
+        self.text.tag_configure('current_match', background='#ffab40')
+        
+        self.text.bind('<Configure>', lambda e: self.render())
+        self.text.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.text.bind('<Button-5>', lambda e: self.scroll(3))
+        self.text.bind('<Up>', lambda e: self.scroll(-1))
+        self.text.bind('<Down>', lambda e: self.scroll(1))
+        self.text.bind('<Prior>', lambda e: self.scroll(-self.visible_rows()))
+        self.text.bind('<Next>', lambda e: self.scroll(self.visible_rows()))
+        self.text.bind('<Control-Home>', lambda e: self.show_offset(0))
+        self.text.bind('<Control-End>', lambda e: self.show_end())
+        self.text.bind('<Button-1>', lambda e: self.text.focus_set())
+        self.text.bind('<Control-f>', lambda e: self.find_entry.focus_set())
+        self.text.bind('<F3>', lambda e: self.find())
+        self.text.bind('<Shift-F3>', lambda e: self.find(backwards=True))
+        
+    def load(self, document, language=None):
+        """Show a document from its start and index it in the background"""
+        self.close()
+        self.document = document
+        if language != self.language:
+            self.language = language
+            self.token_cache.clear()
+        self.top = 0
+        self.jump_label.set(document.jump_label)
+        self.render()
+        index = getattr(document, 'index', None)
+        if index is None or index.complete:
+            return
+            
+        def run(job):
+            index.build(job.report, job.cancel_event)
+            
+        def on_progress(done, total):
+            self.after(0, self.update_position)
+            
+        def on_done(result, error):
+            self.after(0, self.update_position)
+            
+        self.index_job = BackgroundJob("Line index", run, low_priority=True, progress_callback=on_progress,
+                                       done_callback=on_done, progress_interval=0.5).start()
+        
+    def close(self):
+        """Stop indexing and searching and release the current document"""
+        jobs = [job for job in (self.index_job, self.find_job, self.count_job) if job is not None]
+        for job in jobs:
+            job.cancel()
+        self.index_job = None
+        self.find_job = None
+        self.count_job = None
+        self.find_key = None
+        self.find_pattern = None
+        self.match = None
+        self.count_var.set("")
+        if self.document is not None:
+            document = self.document
+            self.document = None
+            self.release(document, jobs)
+            
+    def release(self, document, jobs):
+        """Close a document once the jobs reading it have stopped"""
+        # Unmapping while a job is inside the mapping raises BufferError,
+        # and a cancelled job only stops at its next checkpoint
+        jobs = [job for job in jobs if job.is_running()]
+        if not jobs:
+            document.close()
+            return
+            
+        def run(job):
+            for reader in jobs:
+                reader.join()
+            document.close()
+            
+        BackgroundJob("Close document", run).start()
+        
+    def visible_rows(self):
+        """Rows that fit in the text window"""
+        return max(1, self.text.winfo_height() // max(self.font.metrics('linespace'), 1))
+        
+    def render(self):
+        """Draw the rows starting at the current top offset"""
+        if self.document is None:
+            return
+        rows, end = self.document.rows(self.top, self.visible_rows())
+        self.window_end = end
+        self.text.config(state='normal')
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(rows))
+        if self.language:
+            self.highlight(rows)
+        if self.find_pattern is not None:
+            self.highlight_matches(len(rows))
+        self.text.config(state='disabled')
+        size = max(self.document.size, 1)
+        self.scrollbar.set(self.top / size, end / size)
+        self.update_position()
+        
+    def highlight(self, rows):
+        """Tag tokens in the rows just drawn, one tag_add call per token type"""
+        deadline = time.perf_counter() + self.HIGHLIGHT_BUDGET
+        ranges = {}
+        for number, row in enumerate(rows, 1):
+            tokens = self.token_cache.get(row)
+            if tokens is None:
+                if time.perf_counter() > deadline:
+                    break
+                if len(self.token_cache) >= self.TOKEN_CACHE_ROWS:
+                    self.token_cache.clear()
+                tokens = self.token_cache[row] = tokenize(self.language, row)
+            for token, start, end in tokens:
+                ranges.setdefault(token, []).extend((f"{number}.{start}", f"{number}.{end}"))
+        for token, indices in ranges.items():
+            self.text.tag_add(token, *indices)
+            
+    def highlight_matches(self, rows):
+        """Tag find matches in the rows just drawn"""
+        current = self.match[0] if self.match else None
+        ranges = {'match': [], 'current_match': []}
+        for row, start, end, offset in self.document.match_spans(self.top, rows, self.find_pattern):
+            tag = 'current_match' if offset == current else 'match'
+            ranges[tag].extend((f"{row + 1}.{start}", f"{row + 1}.{end}"))
+        for tag, indices in ranges.items():
+            if indices:
+                self.text.tag_add(tag, *indices)
+                
+    def update_position(self):
+        """Refresh the position shown beside the jump bar"""
+        if self.document is not None:
+            self.position_var.set(self.document.describe(self.top))
+            
+    def scroll(self, rows):
+        """Move the window by a number of rows"""
+        if self.document is not None:
+            self.show_offset(self.document.step(self.top, rows))
+        return 'break'
+        
+    def show_offset(self, offset):
+        """Show the document from a row-aligned byte offset"""
+        if self.document is not None:
+            self.top = offset
+            self.render()
+        return 'break'
+        
+    def show_end(self):
+        """Show the last page"""
+        if self.document is not None:
+            self.show_offset(self.document.last_page(self.visible_rows()))
+        return 'break'
+        
+    def on_scrollbar(self, action, value, units=None):
+        """Map scrollbar drags and clicks onto document offsets"""
+        if self.document is None:
+            return
+        if action == 'moveto':
+            self.show_offset(self.document.seek_fraction(float(value)))
+        elif units == 'pages':
+            self.scroll(int(value) * self.visible_rows())
+        else:
+            self.scroll(int(value))
+            
+    def jump(self):
+        """Go to the position typed in the jump bar"""
+        if self.document is None:
+            return
+        try:
+            self.show_offset(self.document.locate(self.jump_var.get().strip()))
+        except ValueError as e:
+            self.position_var.set(str(e))
+            
+    def find(self, backwards=False):
+        """Jump to the next (or previous) match of the find bar's query"""
+        if self.document is None:
+            return
+        document = self.document
+        key = (self.find_var.get(), self.regex_var.get(), self.case_var.get())
+        if key != self.find_key:
+            try:
+                pattern = document.compile_query(key[0], regex=key[1], ignore_case=not key[2])
+            except ValueError as e:
+                self.count_var.set(str(e))
+                return
+            self.find_key = key
+            self.find_pattern = pattern
+            self.match = None
+            self.start_count()
+        if self.find_job is not None:
+            self.find_job.cancel()
+        pattern = self.find_pattern
+        if self.match:
+            start = self.match[0] if backwards else self.match[0] + 1
+        else:
+            start = self.top
+            
+        def run(job):
+            return document.find(pattern, start, backwards, job.cancel_event)
+            
+        def on_done(found, error):
+            if not isinstance(error, JobCancelled):
+                self.after(0, lambda: self.show_match(document, found, error))
+                
+        self.find_job = BackgroundJob("Find", run, done_callback=on_done).start()
+        return 'break'
+        
+    def show_match(self, document, found, error):
+        """Scroll to a search result if its document is still shown"""
+        if document is not self.document:
+            return
+        self.find_job = None
+        if error:
+            self.count_var.set(str(error))
+            return
+        self.match = found
+        if found is None:
+            self.count_var.set("No matches")
+        elif not self.top <= found[0] < self.window_end:
+            self.top = document.step(document.row_start(found[0]), -self.MATCH_CONTEXT)
+        self.render()
+        
+    def start_count(self):
+        """Count every match in the background, showing the running total"""
+        if self.count_job is not None:
+            self.count_job.cancel()
+        document = self.document
+        pattern = self.find_pattern
+        counted = [0]
+        self.count_var.set("Counting...")
+        
+        def run(job):
+            def progress(done, total, found):
+                counted[0] = found
+                job.report(done, total)
+            return document.count(pattern, progress, job.cancel_event)
+            
+        def on_progress(done, total):
+            self.after(0, lambda: self.show_count(job, counted[0], done * 100 // max(total, 1)))
+            
+        def on_done(found, error):
+            if not isinstance(error, JobCancelled):
+                self.after(0, lambda: self.show_count(job, found, None, error))
+                
+        job = BackgroundJob("Count matches", run, low_priority=True, progress_callback=on_progress,
+                            done_callback=on_done, progress_interval=0.25)
+        self.count_job = job.start()
+        
+    def show_count(self, job, found, percent, error=None):
+        """Show the match count, or its progress while still scanning"""
+        if job is not self.count_job:
+            return
+        if error:
+            self.count_var.set(str(error))
+        elif percent is None:
+            self.count_job = None
+            self.count_var.set(f"{found:,} match{'es' if found != 1 else ''}")
+        else:
+            self.count_var.set(f"{found:,} matches so far ({percent}%)")
\ No newline at end of file
@@ -5,14 +5,41 @@ Shows file previews and information
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext
+import os
+import stat
+import time
+import codecs
 from pathlib import Path
+from datetime import datetime
 import mimetypes
 
+from ..utils.jobs import BackgroundJob, JobCancelled
+from ..utils.preview_cache import PreviewCache
+from ..utils.mapped_file import TextDocument, HexDocument
+from ..utils.log_tail import LogTail
+from ..utils.image_preview import load_image, is_previewable_image
+from ..utils.syntax import language_for
+from ..utils.dir_summary import summarize_directory, LIST_LIMIT
+from .paged_viewer import PagedViewer
+
 class PreviewPanel(ttk.Frame):
+    PREVIEW_DELAY = 120  # ms the selection must rest before a preview loads
+    FOLLOW_INTERVAL = 0.5  # seconds between checks of a followed file
+    IMAGE_MAX_PIXELS = 16 * 1000 * 1000  # larger images are decoded only on request
+    
     def __init__(self, parent, file_manager):
         super().__init__(parent)
         self.file_manager = file_manager
         self.current_file = None
+        self.preview_job = None
+        self.deep_job = None
+        self.preview_pending = None
+        self.preview_cache = PreviewCache(max_entries=64)
+        self.follow_job = None
+        self.follow_max_lines = 5000
+        image_cache_mb = self.file_manager.settings.get('image_cache_mb', 64)
+        self.image_cache = PreviewCache(max_entries=32, max_bytes=int(image_cache_mb * 1024 * 1024))
+        self.current_photo = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -38,6 +65,13 @@ class PreviewPanel(ttk.Frame):
         self.preview_frame = ttk.LabelFrame(self, text="Preview", padding=10)
         self.preview_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Follow mode for text files that are still being written
+        self.follow_var = tk.BooleanVar(value=False)
+        self.follow_check = ttk.Checkbutton(self.preview_frame, text="Follow end of file",
+                                            variable=self.follow_var, command=self.toggle_follow,
+                                            state='disabled')
+        self.follow_check.pack(anchor='w')
+        
         # Preview content
         self.preview_text = scrolledtext.ScrolledText(
             self.preview_frame, 
@@ -47,123 +81,420 @@ class PreviewPanel(ttk.Frame):
         )
         self.preview_text.pack(fill=tk.BOTH, expand=True)
         
+        # Text and binary files of any size are paged from a memory map instead
+        self.paged_viewer = PagedViewer(self.preview_frame)
+        
+        # Images, downscaled to fit the panel
+        self.image_frame = ttk.Frame(self.preview_frame)
+        self.image_info = ttk.Label(self.image_frame)
+        self.image_info.pack(anchor='w')
+        self.image_button = ttk.Button(self.image_frame, text="Load Full Image",
+                                       command=lambda: self.start_preview(force_image=True))
+        self.image_label = ttk.Label(self.image_frame, anchor='center')
+        self.image_label.pack(fill=tk.BOTH, expand=True)
+        
     def update_preview(self, file_path):
-        """Update preview for selected file"""
+        """Preview file_path once the selection settles, loading it off the UI thread"""
         self.current_file = file_path
+        self.stop_follow()
+        self.follow_var.set(False)
+        if self.preview_pending:
+            self.after_cancel(self.preview_pending)
+        if self.preview_job is not None:
+            self.preview_job.cancel()
+            self.preview_job = None
+        self.stop_deep_summary()
+        self.preview_pending = self.after(self.PREVIEW_DELAY, self.start_preview)
+        
+    def start_preview(self, force_image=False):
+        """Load the most recently requested preview in a background job"""
+        self.preview_pending = None
+        file_path = self.current_file
+        box = self.image_box()
+        max_bytes = int(self.file_manager.settings.get('image_preview_max_mb', 8) * 1024 * 1024)
         
-        if not file_path.exists():
+        def run(job):
+            preview = self.load_preview(file_path, job.cancel_event)
+            document = None
+            image = None
+            image_key = None
+            if preview is not None and preview.get('paged') == 'text':
+                document = TextDocument(file_path)
+            elif preview is not None and preview.get('paged') == 'hex':
+                document = HexDocument(file_path)
+            elif preview is not None and preview.get('image'):
+                image_key = preview['image'] + (box,)
+                if self.image_cache.get(image_key) is None:
+                    image = load_image(file_path, box, max_bytes, self.IMAGE_MAX_PIXELS,
+                                       job.cancel_event, force=force_image)
+            return preview, document, image, image_key
+            
+        def on_done(result, error):
+            if not isinstance(error, JobCancelled):
+                self.after(0, lambda: self.show_preview(file_path, result, error))
+                
+        self.preview_job = BackgroundJob("Preview", run, done_callback=on_done).start()
+        
+    def show_preview(self, file_path, result, error):
+        """Render a loaded preview unless a newer selection superseded it"""
+        preview, document, image, image_key = result if result else (None, None, None, None)
+        if file_path != self.current_file:
+            if document is not None:
+                document.close()
+            return
+        self.preview_job = None
+        if error:
+            preview = {'name': file_path.name, 'size': '-', 'type': 'Unknown', 'modified': '-',
+                       'text': f"Error reading file: {error}"}
+        if preview is None:
             self.clear_preview()
             return
             
-        # Update file info
-        self.update_file_info(file_path)
-        
-        # Update preview content
-        if file_path.is_file():
-            self.show_file_preview(file_path)
+        self.show_info(preview)
+        self.follow_check.config(state='normal' if preview.get('paged') == 'text' else 'disabled')
+        if document is not None:
+            self.show_view(self.paged_viewer)
+            language = language_for(file_path) if preview.get('paged') == 'text' else None
+            self.paged_viewer.load(document, language)
+        elif image_key is not None:
+            self.show_image(image, image_key)
         else:
-            self.show_directory_info(file_path)
-            
-    def update_file_info(self, file_path):
-        """Update file information display"""
-        try:
-            stat = file_path.stat()
-            
-            self.name_label.config(text=f"Name: {file_path.name}")
-            
-            if file_path.is_file():
-                size = self.format_size(stat.st_size)
-                self.size_label.config(text=f"Size: {size}")
-            else:
-                self.size_label.config(text="Size: -")
+            self.show_text(preview['text'])
+            if preview.get('directory'):
+                self.start_deep_summary(file_path, preview['text'])
                 
-            file_type = self.get_file_type(file_path)
-            self.type_label.config(text=f"Type: {file_type}")
+    def show_info(self, preview):
+        """Fill the file information labels"""
+        self.name_label.config(text=f"Name: {preview['name']}")
+        self.size_label.config(text=f"Size: {preview['size']}")
+        self.type_label.config(text=f"Type: {preview['type']}")
+        self.modified_label.config(text=f"Modified: {preview['modified']}")
+        
+    def show_partial(self, file_path, preview):
+        """Render a folder summary that is still being scanned"""
+        if file_path != self.current_file or self.preview_job is None:
+            return
+        self.show_info(preview)
+        self.follow_check.config(state='disabled')
+        self.show_text(preview['text'])
+        
+    def start_deep_summary(self, dir_path, text):
+        """Add subfolder totals below a folder summary, at once if known or in the background if enabled"""
+        engine = self.file_manager.file_ops.size_engine
+        total = engine.cached(dir_path)
+        if total is not None:
+            self.show_text(text + self.format_deep_summary(total))
+            return
+        if not self.file_manager.settings.get('preview_deep_summary', False):
+            return
+        self.show_text(text + "\nIncluding subfolders: calculating...\n")
+        last_report = [0.0]
+        
+        def run(job):
+            return engine.directory_size(dir_path, job.report, job.cancel_event)
             
-            from datetime import datetime
-            modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-            self.modified_label.config(text=f"Modified: {modified}")
+        def on_progress(done, total):
+            now = time.monotonic()
+            if now - last_report[0] >= 0.25:
+                last_report[0] = now
+                line = f"\nIncluding subfolders: calculating ({done:,} folders scanned)...\n"
+                self.after(0, lambda: self.show_deep_summary(job, text + line))
+                
+        def on_done(total, error):
+            if isinstance(error, JobCancelled):
+                return
+            line = f"\nIncluding subfolders: {error}\n" if error else self.format_deep_summary(total)
+            self.after(0, lambda: self.show_deep_summary(job, text + line, finished=True))
             
-        except Exception as e:
-            self.name_label.config(text=f"Name: {file_path.name}")
-            self.size_label.config(text="Size: -")
-            self.type_label.config(text="Type: Unknown")
-            self.modified_label.config(text="Modified: -")
+        job = BackgroundJob("Folder summary", run, low_priority=True,
+                            progress_callback=on_progress, done_callback=on_done)
+        self.deep_job = job.start()
+        
+    def show_deep_summary(self, job, text, finished=False):
+        """Show the folder summary with its latest subfolder totals line"""
+        if job is not self.deep_job:
+            return
+        if finished:
+            self.deep_job = None
+        self.show_text(text)
+        
+    def stop_deep_summary(self):
+        """Cancel a running subfolder total"""
+        if self.deep_job is not None:
+            self.deep_job.cancel()
+            self.deep_job = None
             
-    def show_file_preview(self, file_path):
-        """Show file content preview"""
+    def format_deep_summary(self, total):
+        """Line describing the recursive total of a folder"""
+        return (f"\nIncluding subfolders: {self.format_size(total.size)} in "
+                f"{total.files:,} files, {total.dirs:,} folders\n")
+        
+        
+    def show_view(self, view):
+        """Pack one of the preview widgets in place of the others"""
+        if view is not self.paged_viewer:
+            self.paged_viewer.close()
+        if view is not self.image_frame:
+            self.image_label.config(image='')
+            self.current_photo = None
+        for widget in (self.preview_text, self.paged_viewer, self.image_frame):
+            if widget is not view:
+                widget.pack_forget()
+        view.pack(fill=tk.BOTH, expand=True)
+        
+    def show_text(self, text):
+        """Swap in the plain text preview"""
+        self.show_view(self.preview_text)
         self.preview_text.config(state='normal')
         self.preview_text.delete(1.0, tk.END)
+        self.preview_text.insert(tk.END, text)
+        self.preview_text.config(state='disabled')
         
-        try:
-            # Check file size
-            if file_path.stat().st_size > 1024 * 1024:  # 1MB limit
-                self.preview_text.insert(tk.END, "File too large for preview")
-            else:
-                mime_type, _ = mimetypes.guess_type(str(file_path))
+    def image_box(self):
+        """Pixels available for an image in the preview frame"""
+        return (max(self.preview_frame.winfo_width() - 24, 64),
+                max(self.preview_frame.winfo_height() - 48, 64))
+        
+    def show_image(self, image, image_key):
+        """Show a decoded image from the cache, decoding it on first use"""
+        cached = self.image_cache.get(image_key)
+        if cached is None and image is not None and not image.deferred:
+            try:
+                photo = tk.PhotoImage(data=image.data, format=image.format)
+                if image.factor > 1 and not image.prescaled:
+                    photo = photo.subsample(image.factor)
+            except tk.TclError as e:
+                self.show_text(f"Cannot decode image: {e}")
+                return
+            caption = f"{image.width} x {image.height} px"
+            if image.factor > 1:
+                caption += f", shown at 1/{image.factor} size"
+            cached = (photo, caption)
+            self.image_cache.put(image_key, cached, photo.width() * photo.height() * 4)
+            
+        self.show_view(self.image_frame)
+        if cached is not None:
+            self.current_photo, caption = cached
+            self.image_label.config(image=self.current_photo)
+            self.image_info.config(text=caption)
+            self.image_button.pack_forget()
+        else:
+            self.current_photo = None
+            self.image_label.config(image='')
+            self.image_info.config(text=f"{image.width} x {image.height} px - too large to decode automatically")
+            self.image_button.pack(anchor='w', pady=5, before=self.image_label)
+            
+    def toggle_follow(self):
+        """Switch the current text file between paged viewing and following its end"""
+        if self.current_file is None:
+            return
+        if self.follow_var.get():
+            self.start_follow(self.current_file)
+        else:
+            self.stop_follow()
+            self.start_preview()
+            
+    def start_follow(self, file_path):
+        """Show the last lines of file_path and append new ones as they are written"""
+        self.stop_follow()
+        self.show_text("")
+        self.follow_max_lines = max(100, int(self.file_manager.settings.get('follow_max_lines', 5000)))
+        tail = LogTail(file_path, max_lines=self.follow_max_lines)
+        
+        def run(job):
+            try:
+                lines = tail.tail()
+                self.after(0, lambda: self.append_lines(job, lines))
+                while not job.cancel_event.wait(self.FOLLOW_INTERVAL):
+                    lines = tail.poll()
+                    if lines:
+                        self.after(0, lambda lines=lines: self.append_lines(job, lines))
+            finally:
+                tail.close()
                 
-                if mime_type and mime_type.startswith('text/'):
-                    # Text file preview
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read(10000)  # First 10KB
-                            self.preview_text.insert(tk.END, content)
-                            if len(content) == 10000:
-                                self.preview_text.insert(tk.END, "\n\n... (truncated)")
-                    except UnicodeDecodeError:
-                        self.preview_text.insert(tk.END, "Binary file - cannot preview")
-                        
-                elif mime_type and mime_type.startswith('image/'):
-                    self.preview_text.insert(tk.END, f"Image file: {file_path.name}\n")
-                    self.preview_text.insert(tk.END, f"Type: {mime_type}\n")
-                    self.preview_text.insert(tk.END, "Image preview not available in text mode")
-                    
-                else:
-                    # Try to read as text anyway
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read(1000)
-                            if content.isprintable():
-                                self.preview_text.insert(tk.END, content)
-                            else:
-                                self.preview_text.insert(tk.END, "Binary file - cannot preview")
-                    except:
-                        self.preview_text.insert(tk.END, "Cannot preview this file type")
-                        
-        except Exception as e:
-            self.preview_text.insert(tk.END, f"Error reading file: {e}")
+        def on_done(result, error):
+            if error:
+                message = f"--- Stopped following: {error} ---"
+                self.after(0, lambda: self.append_lines(job, [message]))
+                
+        job = BackgroundJob("Follow", run, done_callback=on_done)
+        self.follow_job = job.start()
+        
+    def stop_follow(self):
+        """Stop following the current file"""
+        if self.follow_job is not None:
+            self.follow_job.cancel()
+            self.follow_job = None
             
+    def append_lines(self, job, lines):
+        """Append followed lines, dropping the oldest beyond follow_max_lines"""
+        if job is not self.follow_job:
+            return
+        at_end = self.preview_text.yview()[1] >= 1.0
+        self.preview_text.config(state='normal')
+        self.preview_text.insert(tk.END, "".join(line + "\n" for line in lines))
+        excess = int(self.preview_text.index('end-1c').split('.')[0]) - 1 - self.follow_max_lines
+        if excess > 0:
+            self.preview_text.delete('1.0', f'{excess + 1}.0')
         self.preview_text.config(state='disabled')
+        if at_end:
+            self.preview_text.see(tk.END)
+            
+    def load_preview(self, file_path, cancel_event=None):
+        """Stat and read a preview on a worker thread, reusing cached previews of unchanged files"""
+        found = self.file_manager.file_ops.archive_indexes.lookup(file_path)
+        if found:
+            index, entry = found
+            key = (str(file_path), entry.size, entry.mtime)
+            preview = self.preview_cache.get(key)
+            if preview is None:
+                preview = self.load_archive_entry(index, entry)
+                self.preview_cache.put(key, preview)
+            return preview
+            
+        try:
+            st = file_path.stat()
+        except OSError:
+            return None
+        key = (str(file_path), st.st_mtime_ns, st.st_size)
+        preview = self.preview_cache.get(key)
+        if preview is not None:
+            return preview
+            
+        is_dir = stat.S_ISDIR(st.st_mode)
+        preview = {
+            'name': file_path.name,
+            'size': '-' if is_dir else self.format_size(st.st_size),
+            'type': self.get_file_type(file_path),
+            'modified': datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+            'paged': None,
+            'image': None,
+            'text': ''
+        }
+        if is_dir:
+            def progress(summary):
+                partial = dict(preview, text=self.format_directory_summary(summary))
+                self.after(0, lambda: self.show_partial(file_path, partial))
+                
+            preview['directory'] = True
+            preview['text'] = self.read_directory_info(file_path, cancel_event, progress)
+        else:
+            try:
+                preview['paged'] = self.paged_kind(file_path)
+                if is_previewable_image(file_path) and not preview['paged']:
+                    preview['image'] = (str(file_path), st.st_mtime_ns, st.st_size)
+                elif not preview['paged']:
+                    preview['text'] = self.read_file_preview(file_path)
+            except OSError as e:
+                preview['text'] = f"Error reading file: {e}"
+        # Rewriting a file leaves its folder's mtime alone, so a cached
+        # folder summary would show stale sizes; folders are rescanned
+        if not is_dir:
+            self.preview_cache.put(key, preview)
+        return preview
         
-    def show_directory_info(self, dir_path):
-        """Show directory information"""
-        self.preview_text.config(state='normal')
-        self.preview_text.delete(1.0, tk.END)
+    def is_text_file(self, file_path):
+        """True if the start of the file is UTF-8 text without NUL bytes"""
+        with open(file_path, 'rb') as f:
+            head = f.read(8192)
+        if b'\0' in head:
+            return False
+        try:
+            # Not final: the sample may end inside a multi-byte character
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+            return True
+        except UnicodeDecodeError:
+            return False
+            
+    def paged_kind(self, file_path):
+        """'text' or 'hex' for files shown in the paged viewer, None for images"""
+        if self.is_text_file(file_path):
+            return 'text'
+        mime_type, _ = mimetypes.guess_type(str(file_path))
+        if mime_type and mime_type.startswith('image/'):
+            return None
+        return 'hex'
+        
+    def read_file_preview(self, file_path):
+        """Text shown for an image in a format Tk cannot decode"""
+        mime_type, _ = mimetypes.guess_type(str(file_path))
+        return (f"Image file: {file_path.name}\n"
+                f"Type: {mime_type}\n"
+                "Image preview is available for PNG, GIF and PPM files")
         
+    def read_directory_info(self, dir_path, cancel_event=None, progress_callback=None):
+        """Text summarizing a directory's contents, from a single scandir pass"""
         try:
-            items = list(dir_path.iterdir())
-            folders = [item for item in items if item.is_dir()]
-            files = [item for item in items if item.is_file()]
+            return self.format_directory_summary(summarize_directory(dir_path, progress_callback, cancel_event))
+        except PermissionError:
+            return "Permission denied"
+        except JobCancelled:
+            raise
+        except Exception as e:
+            return f"Error: {e}"
             
-            self.preview_text.insert(tk.END, f"Directory: {dir_path.name}\n\n")
-            self.preview_text.insert(tk.END, f"Contains:\n")
-            self.preview_text.insert(tk.END, f"  📁 {len(folders)} folders\n")
-            self.preview_text.insert(tk.END, f"  📄 {len(files)} files\n\n")
+    def format_directory_summary(self, summary):
+        """Text for a complete or partial DirectorySummary"""
+        lines = [f"Directory: {summary.path.name}\n\n",
+                 "Contains:\n",
+                 f"  📁 {summary.folders:,} folders\n",
+                 f"  📄 {summary.files:,} files ({self.format_size(summary.size)})\n"]
+        if summary.other:
+            lines.append(f"  ❔ {summary.other:,} other items\n")
+        if summary.errors:
+            lines.append(f"  ⚠ {summary.errors:,} unreadable\n")
+        if summary.newest:
+            mtime, name = summary.newest
+            lines.append(f"\nNewest file: {name} ({datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')})\n")
+        if summary.types:
+            lines.append("\nBy type:\n")
+            for extension, files, size in summary.top_types():
+                lines.append(f"  {extension or '(none)':<10} {files:>8,} files  {self.format_size(size):>10}\n")
+                
+        if not summary.complete:
+            lines.append(f"\nScanning... {summary.total:,} items so far\n")
+        elif summary.total <= LIST_LIMIT:
+            lines.append("\nContents:\n")
+            for is_dir, name in sorted(summary.names, key=lambda item: (not item[0], item[1])):
+                lines.append(f"  {'📁' if is_dir else '📄'} {name}\n")
+        else:
+            lines.append(f"\nToo many items to list ({summary.total:,} total)\n")
+        return "".join(lines)
+        
+    def load_archive_entry(self, index, entry):
+        """Preview of an archive member's details and the start of its data"""
+        preview = {
+            'name': entry.name,
+            'size': self.format_size(entry.size),
+            'type': 'Folder' if entry.is_dir else self.type_from_name(entry.name),
+            'modified': (datetime.fromtimestamp(entry.mtime).strftime('%Y-%m-%d %H:%M:%S')
+                         if entry.mtime else '-')
+        }
+        if entry.is_dir:
+            children = index.listdir(entry.path)
+            folders = sum(1 for child in children if child.is_dir)
+            preview['text'] = (f"Folder in {index.archive.name}\n\n"
+                               "Contains:\n"
+                               f"  📁 {folders} folders\n"
+                               f"  📄 {len(children) - folders} files\n")
+            return preview
             
-            if len(items) <= 20:  # Show contents if not too many
-                self.preview_text.insert(tk.END, "Contents:\n")
-                for item in sorted(items, key=lambda x: (not x.is_dir(), x.name)):
-                    icon = "📁" if item.is_dir() else "📄"
-                    self.preview_text.insert(tk.END, f"  {icon} {item.name}\n")
+        text = f"Compressed: {self.format_size(entry.compressed_size)}\n\n"
+        try:
+            data = index.read(entry.path, 10000)
+            if b'\0' in data:
+                text += "Binary file - cannot preview"
             else:
-                self.preview_text.insert(tk.END, f"Too many items to list ({len(items)} total)")
-                
-        except PermissionError:
-            self.preview_text.insert(tk.END, "Permission denied")
+                # Not final when cut short: the sample may end inside a multi-byte character
+                text += codecs.getincrementaldecoder('utf-8')().decode(data, final=len(data) < 10000)
+                if len(data) >= 10000:
+                    text += "\n\n... (truncated)"
+        except UnicodeDecodeError:
+            text += "Binary file - cannot preview"
         except Exception as e:
-            self.preview_text.insert(tk.END, f"Error: {e}")
-            
-        self.preview_text.config(state='disabled')
+            text += f"Error reading archive member: {e}"
+        preview['text'] = text
+        return preview
         
     def clear_preview(self):
         """Clear preview panel"""
@@ -171,10 +502,11 @@ class PreviewPanel(ttk.Frame):
         self.size_label.config(text="Size: -")
         self.type_label.config(text="Type: -")
         self.modified_label.config(text="Modified: -")
-        
-        self.preview_text.config(state='normal')
-        self.preview_text.delete(1.0, tk.END)
-        self.preview_text.config(state='disabled')
+        self.stop_deep_summary()
+        self.stop_follow()
+        self.follow_var.set(False)
+        self.follow_check.config(state='disabled')
+        self.show_text("")
         
     def format_size(self, size):
         """Format file size"""
@@ -188,12 +520,15 @@ class PreviewPanel(ttk.Frame):
         """Get file type description"""
         if path.is_dir():
             return "Folder"
-            
-        mime_type, _ = mimetypes.guess_type(str(path))
+        return self.type_from_name(path.name)
+        
+    def type_from_name(self, name):
+        """File type description from a name alone, without touching the filesystem"""
+        mime_type, _ = mimetypes.guess_type(name)
         if mime_type:
             return mime_type
         else:
-            ext = path.suffix.lower()
+            ext = Path(name).suffix.lower()
             if ext:
                 return f"{ext[1:].upper()} File"
             else:
@@ -45,7 +45,7 @@ class ToolbarFrame(ttk.Frame):
         action_frame.pack(side=tk.RIGHT, padx=5)
         
         self.refresh_btn = ttk.Button(action_frame, text="🔄 Refresh", 
-                                     command=self.file_manager.refresh_view, width=10)
+                                     command=lambda: self.file_manager.refresh_view(rescan=True), width=10)
         self.refresh_btn.pack(side=tk.LEFT, padx=2)
         
         self.search_btn = ttk.Button(action_frame, text="🔍 Search", 
@@ -55,8 +55,9 @@ class ToolbarFrame(ttk.Frame):
     def navigate_to_address(self, event):
         """Navigate to address bar location"""
         from pathlib import Path
+        from ..utils.archive_index import split_archive_path
         path = Path(self.address_var.get())
-        if path.exists():
+        if path.exists() or split_archive_path(path):
             self.file_manager.navigate_to(path)
             
     def update_address(self, path):
@@ -0,0 +1,257 @@
+"""
+Duplicates Dialog
+Runs the staged duplicate finder and lists groups of identical files
+"""
+
+import time
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+from pathlib import Path
+
+from ..utils.duplicates import DuplicateFinder
+from ..utils.dedupe import DEDUPE_MODES
+from ..utils.jobs import JobCancelled
+
+class DuplicatesDialog:
+    STAGE_LABELS = {
+        'scan': "Scanning files",
+        'partial': "Comparing file edges",
+        'full': "Hashing candidates",
+    }
+    
+    def __init__(self, parent, directory, file_manager):
+        self.directory = Path(directory)
+        self.file_manager = file_manager
+        self.scan_thread = None
+        self.cancel_event = threading.Event()
+        self.groups = []
+        self.group_items = {}
+        self.paths = {}
+        self.last_progress = 0.0
+        
+        self.dialog = tk.Toplevel(parent)
+        self.setup_dialog()
+        self.start_scan()
+        
+    def setup_dialog(self):
+        """Setup duplicates dialog"""
+        self.dialog.title(f"Duplicate Files - {self.directory}")
+        self.dialog.geometry("700x500")
+        
+        results_frame = ttk.LabelFrame(self.dialog, text="Duplicate Groups", padding=10)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        self.results_tree = ttk.Treeview(results_frame, columns=('size', 'folder'))
+        self.results_tree.heading('#0', text='Name')
+        self.results_tree.heading('size', text='Size')
+        self.results_tree.heading('folder', text='Folder')
+        self.results_tree.column('#0', width=220)
+        self.results_tree.column('size', width=90, anchor='e')
+        self.results_tree.column('folder', width=330)
+        
+        v_scroll = ttk.Scrollbar(results_frame, orient='vertical', command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=v_scroll.set)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.status_var = tk.StringVar(value="Starting scan...")
+        ttk.Label(self.dialog, textvariable=self.status_var).pack(fill=tk.X, padx=10)
+        
+        self.progress = ttk.Progressbar(self.dialog, mode='indeterminate')
+        self.progress.pack(fill=tk.X, padx=10, pady=5)
+        
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.scan_btn = ttk.Button(button_frame, text="Rescan", command=self.start_scan)
+        self.scan_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.stop_btn = ttk.Button(button_frame, text="Stop", command=self.stop_scan)
+        self.stop_btn.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(button_frame, text="Open Location", command=self.open_location).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Move to Trash", command=self.trash_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Replace with Links", command=self.link_duplicates).pack(side=tk.LEFT, padx=5)
+        
+        self.link_mode_var = tk.StringVar(value='auto')
+        ttk.Combobox(button_frame, textvariable=self.link_mode_var, values=DEDUPE_MODES,
+                     state='readonly', width=9).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side=tk.RIGHT, padx=5)
+        
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+    def start_scan(self):
+        """Start the duplicate scan in a background thread"""
+        if self.scan_thread and self.scan_thread.is_alive():
+            return
+            
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.paths = {}
+        self.group_items = {}
+        self.cancel_event = threading.Event()
+        self.scan_btn.config(state='disabled')
+        self.stop_btn.config(state='normal')
+        self.progress.config(mode='indeterminate')
+        self.progress.start()
+        
+        self.scan_thread = threading.Thread(target=self.perform_scan)
+        self.scan_thread.daemon = True
+        self.scan_thread.start()
+        
+    def stop_scan(self):
+        """Stop the current scan"""
+        self.cancel_event.set()
+        
+    def close(self):
+        """Cancel any scan and close the dialog"""
+        self.cancel_event.set()
+        self.dialog.destroy()
+        
+    def perform_scan(self):
+        """Run the finder on the worker thread"""
+        hash_cache = self.file_manager.file_ops.hash_cache
+        hash_cache.reset_stats()
+        finder = DuplicateFinder(hash_cache=hash_cache)
+        started = time.monotonic()
+        try:
+            groups = finder.find(self.directory, self.report_progress, self.cancel_event)
+            elapsed = time.monotonic() - started
+            hardlinked = sum(len(links) for links in finder.hardlinks.values())
+            hit_rate = hash_cache.hit_rate
+            self.dialog.after(0, lambda: self.show_results(groups, elapsed, hardlinked, hit_rate))
+        except JobCancelled:
+            self.dialog.after(0, lambda: self.finish_scan("Scan stopped"))
+        except Exception as e:
+            # e is unbound once the except block ends, before the lambda runs
+            message = f"Scan error: {e}"
+            self.dialog.after(0, lambda: self.finish_scan(message))
+            
+    def report_progress(self, stage, done, total):
+        """Forward progress to the UI at most ten times a second"""
+        now = time.monotonic()
+        if now - self.last_progress < 0.1 and done != total:
+            return
+        self.last_progress = now
+        self.dialog.after(0, lambda: self.update_progress(stage, done, total))
+        
+    def update_progress(self, stage, done, total):
+        """Show stage progress"""
+        label = self.STAGE_LABELS.get(stage, stage)
+        if total:
+            if str(self.progress.cget('mode')) != 'determinate':
+                self.progress.stop()
+                self.progress.config(mode='determinate', maximum=100)
+            self.progress['value'] = done * 100 / total
+            self.status_var.set(f"{label}: {done:,} of {total:,}")
+        else:
+            self.status_var.set(f"{label}: {done:,} files")
+            
+    def finish_scan(self, message):
+        """Reset controls after a scan ends"""
+        self.progress.stop()
+        self.progress.config(mode='determinate')
+        self.progress['value'] = 0
+        self.scan_btn.config(state='normal')
+        self.stop_btn.config(state='disabled')
+        self.status_var.set(message)
+        
+    def show_results(self, groups, elapsed, hardlinked, hit_rate=0.0):
+        """Fill the tree with duplicate groups"""
+        self.groups = groups
+        format_size = self.file_manager.file_list.format_size
+        for group in groups:
+            group_id = self.results_tree.insert(
+                '', 'end', open=True,
+                text=f"{len(group.paths)} identical files",
+                values=(format_size(group.size), f"{format_size(group.wasted_bytes)} reclaimable"))
+            self.group_items[group_id] = group
+            for path in group.paths:
+                item_id = self.results_tree.insert(group_id, 'end', text=path.name,
+                                                   values=(format_size(group.size), str(path.parent)))
+                self.paths[item_id] = path
+                
+        wasted = sum(group.wasted_bytes for group in groups)
+        message = (f"{len(groups)} groups, {format_size(wasted)} reclaimable "
+                   f"({elapsed:.1f}s, {hit_rate:.0%} of hashes cached)")
+        if hardlinked:
+            message += f"; {hardlinked} hardlinks skipped"
+        self.finish_scan(message)
+        
+    def get_selected_paths(self):
+        """File paths selected in the results"""
+        return [self.paths[item_id] for item_id in self.results_tree.selection() if item_id in self.paths]
+        
+    def open_location(self):
+        """Navigate the main window to the selected file's folder"""
+        paths = self.get_selected_paths()
+        if paths:
+            self.file_manager.navigate_to(paths[0].parent)
+            
+    def trash_selected(self):
+        """Move selected duplicates to the trash"""
+        paths = self.get_selected_paths()
+        if not paths:
+            return
+        if not messagebox.askyesno("Move to Trash", f"Move {len(paths)} file(s) to the Trash?",
+                                   parent=self.dialog):
+            return
+        trashed, failed = self.file_manager.file_ops.trash_files(paths)
+        trashed_paths = {item.original_path for item in trashed}
+        for item_id, path in list(self.paths.items()):
+            if path in trashed_paths:
+                self.results_tree.delete(item_id)
+                del self.paths[item_id]
+        if failed:
+            messagebox.showerror("Error", f"Failed to trash {len(failed)} file(s): {failed[0][1]}",
+                                 parent=self.dialog)
+        self.file_manager.refresh_view()
+        
+    def get_selected_groups(self):
+        """Groups with a selected row, or every group when nothing is selected"""
+        selection = self.results_tree.selection()
+        if not selection:
+            return list(self.group_items.values())
+        groups = []
+        for item_id in selection:
+            group_id = item_id if item_id in self.group_items else self.results_tree.parent(item_id)
+            group = self.group_items.get(group_id)
+            if group is not None and group not in groups:
+                groups.append(group)
+        return groups
+        
+    def link_duplicates(self):
+        """Replace duplicates of the chosen groups with links to one copy"""
+        groups = self.get_selected_groups()
+        if not groups:
+            return
+        mode = self.link_mode_var.get()
+        format_size = self.file_manager.file_list.format_size
+        wasted = sum(group.wasted_bytes for group in groups)
+        message = (f"Replace duplicates in {len(groups)} group(s) with links to a single copy, "
+                   f"reclaiming up to {format_size(wasted)}?")
+        if mode != 'reflink':
+            message += ("\n\nHardlinked files share one set of contents and permissions: "
+                        "editing one changes all of them.")
+        if not messagebox.askyesno("Replace with Links", message, parent=self.dialog):
+            return
+            
+        duplicates = {group.digest: group.paths for group in groups}
+        
+        def run(job):
+            return self.file_manager.file_ops.dedupe_files(duplicates, mode, job.report, job.cancel_event)
+            
+        def on_complete(result):
+            summary = (f"Linked {result.linked + result.reflinked} file(s), "
+                       f"reclaimed {format_size(result.reclaimed_bytes)}")
+            if result.skipped:
+                path, reason = result.skipped[0]
+                summary += f"\n\nSkipped {len(result.skipped)} file(s), e.g. {path.name}: {reason}"
+            self.file_manager.logger.info(summary.replace("\n\n", "; "))
+            if self.dialog.winfo_exists():
+                messagebox.showinfo("Replace with Links", summary, parent=self.dialog)
+                self.start_scan()
+                
+        self.file_manager.run_background_job("Replacing duplicates with links", run, on_complete,
+                                             units='files')
+        self.status_var.set("Linking duplicates in the background...")
\ No newline at end of file
@@ -6,17 +6,20 @@ Application settings and configuration
 import tkinter as tk
 from tkinter import ttk
 
+from ..utils.hashing import HASH_ALGORITHMS
+
 class PreferencesDialog:
-    def __init__(self, parent, settings, theme_manager):
+    def __init__(self, parent, settings, theme_manager, on_apply=None):
         self.settings = settings
         self.theme_manager = theme_manager
+        self.on_apply = on_apply
         self.dialog = tk.Toplevel(parent)
         self.setup_dialog()
         
     def setup_dialog(self):
         """Setup preferences dialog"""
         self.dialog.title("Preferences")
-        self.dialog.geometry("500x400")
+        self.dialog.geometry("500x580")
         self.dialog.resizable(False, False)
         
         # Create notebook
@@ -53,6 +56,10 @@ class PreferencesDialog:
         ttk.Checkbutton(file_ops_frame, text="Confirm file deletions", 
                        variable=self.confirm_delete_var).pack(anchor='w')
         
+        self.use_trash_var = tk.BooleanVar(value=self.settings.get('use_trash', True))
+        ttk.Checkbutton(file_ops_frame, text="Move deleted items to the Trash", 
+                       variable=self.use_trash_var).pack(anchor='w')
+        
         self.auto_save_var = tk.BooleanVar(value=self.settings.get('auto_save', True))
         ttk.Checkbutton(file_ops_frame, text="Auto-save settings", 
                        variable=self.auto_save_var).pack(anchor='w')
@@ -136,6 +143,42 @@ class PreferencesDialog:
         self.preview_limit_var = tk.StringVar(value="1")
         ttk.Entry(perf_frame, textvariable=self.preview_limit_var, width=10).pack(anchor='w', pady=2)
         
+        self.deep_summary_var = tk.BooleanVar(value=self.settings.get('preview_deep_summary', False))
+        ttk.Checkbutton(perf_frame, text="Include subfolder totals in folder previews", 
+                       variable=self.deep_summary_var).pack(anchor='w')
+        
+        # Background transfers
+        transfer_frame = ttk.LabelFrame(advanced_frame, text="Transfers", padding=10)
+        transfer_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(transfer_frame, text="Total bandwidth limit (KB/s, 0 = unlimited):").grid(row=0, column=0, sticky='w')
+        self.transfer_limit_var = tk.StringVar(value=str(self.settings.get('transfer_rate_limit_kb', 0)))
+        ttk.Entry(transfer_frame, textvariable=self.transfer_limit_var, width=10).grid(row=0, column=1, sticky='w', padx=5)
+        
+        ttk.Label(transfer_frame, text="Per-job bandwidth limit (KB/s, 0 = unlimited):").grid(row=1, column=0, sticky='w')
+        self.job_limit_var = tk.StringVar(value=str(self.settings.get('job_rate_limit_kb', 0)))
+        ttk.Entry(transfer_frame, textvariable=self.job_limit_var, width=10).grid(row=1, column=1, sticky='w', padx=5)
+        
+        self.low_priority_var = tk.BooleanVar(value=self.settings.get('low_priority_transfers', True))
+        ttk.Checkbutton(transfer_frame, text="Run transfers at low CPU and I/O priority", 
+                       variable=self.low_priority_var).grid(row=2, column=0, columnspan=2, sticky='w')
+        
+        self.verify_copies_var = tk.BooleanVar(value=self.settings.get('verify_copies', False))
+        ttk.Checkbutton(transfer_frame, text="Verify copies with checksum:", 
+                       variable=self.verify_copies_var).grid(row=3, column=0, sticky='w')
+        self.verify_algorithm_var = tk.StringVar(value=self.settings.get('verify_algorithm', 'blake2b'))
+        ttk.Combobox(transfer_frame, textvariable=self.verify_algorithm_var, 
+                    values=list(HASH_ALGORITHMS), state='readonly', width=10).grid(row=3, column=1, sticky='w', padx=5)
+        
+        self.export_checksums_var = tk.BooleanVar(value=self.settings.get('export_checksums', False))
+        ttk.Checkbutton(transfer_frame, text="Export checksum file after verified copies", 
+                       variable=self.export_checksums_var).grid(row=4, column=0, columnspan=2, sticky='w')
+        
+        ttk.Label(transfer_frame, text="Zip compression level (0 = store only):").grid(row=5, column=0, sticky='w')
+        self.compression_level_var = tk.StringVar(value=str(self.settings.get('compression_level', 6)))
+        ttk.Spinbox(transfer_frame, from_=0, to=9, textvariable=self.compression_level_var,
+                    width=8).grid(row=5, column=1, sticky='w', padx=5)
+        
         # File associations
         assoc_frame = ttk.LabelFrame(advanced_frame, text="File Associations", padding=10)
         assoc_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -186,19 +229,46 @@ class PreferencesDialog:
             
     def apply_settings(self):
         """Apply current settings"""
-        self.settings.set('confirm_delete', self.confirm_delete_var.get())
-        self.settings.set('auto_save', self.auto_save_var.get())
-        self.settings.set('show_hidden', self.show_hidden_var.get())
-        self.settings.set('show_file_extensions', self.show_extensions_var.get())
-        self.settings.set('date_format', self.date_format_var.get())
-        self.settings.set('view_mode', self.view_mode_var.get())
-        self.settings.set('toolbar_visible', self.show_toolbar_var.get())
-        self.settings.set('statusbar_visible', self.show_statusbar_var.get())
-        self.settings.set('show_preview', self.show_preview_var.get())
-        
+        with self.settings.batch():
+            self.settings.set('confirm_delete', self.confirm_delete_var.get())
+            self.settings.set('use_trash', self.use_trash_var.get())
+            self.settings.set('auto_save', self.auto_save_var.get())
+            self.settings.set('show_hidden', self.show_hidden_var.get())
+            self.settings.set('show_file_extensions', self.show_extensions_var.get())
+            self.settings.set('date_format', self.date_format_var.get())
+            self.settings.set('view_mode', self.view_mode_var.get())
+            self.settings.set('toolbar_visible', self.show_toolbar_var.get())
+            self.settings.set('statusbar_visible', self.show_statusbar_var.get())
+            self.settings.set('show_preview', self.show_preview_var.get())
+            self.settings.set('preview_deep_summary', self.deep_summary_var.get())
+            self.settings.set('transfer_rate_limit_kb', self.parse_rate_limit(self.transfer_limit_var.get()))
+            self.settings.set('job_rate_limit_kb', self.parse_rate_limit(self.job_limit_var.get()))
+            self.settings.set('low_priority_transfers', self.low_priority_var.get())
+            self.settings.set('verify_copies', self.verify_copies_var.get())
+            self.settings.set('verify_algorithm', self.verify_algorithm_var.get())
+            self.settings.set('export_checksums', self.export_checksums_var.get())
+            self.settings.set('compression_level', self.parse_compression_level(self.compression_level_var.get()))
+            
         # Apply theme
         self.theme_manager.apply_theme(self.theme_var.get())
         
+        if self.on_apply:
+            self.on_apply()
+            
+    def parse_rate_limit(self, value):
+        """Parse a KB/s limit, treating invalid input as unlimited"""
+        try:
+            return max(0, int(value))
+        except ValueError:
+            return 0
+            
+    def parse_compression_level(self, value):
+        """Parse a zlib level, clamping to 0-9 and defaulting to 6"""
+        try:
+            return min(9, max(0, int(value)))
+        except ValueError:
+            return 6
+            
     def save_and_close(self):
         """Save settings and close dialog"""
         self.apply_settings()
@@ -10,15 +10,33 @@ from datetime import datetime
 import os
 import stat
 
+from ..utils.jobs import BackgroundJob, JobCancelled
+from ..utils.selection_stats import SelectionWalker
+
 class PropertiesDialog:
-    def __init__(self, parent, file_path):
-        self.file_path = Path(file_path)
+    def __init__(self, parent, file_paths, size_engine=None):
+        """file_paths is one path or a list; several paths show aggregate totals"""
+        if isinstance(file_paths, (str, os.PathLike)):
+            file_paths = [file_paths]
+        self.file_paths = [Path(path) for path in file_paths]
+        self.file_path = self.file_paths[0]
+        self.size_engine = size_engine
+        self.size_job = None
+        self.size_label = None
         self.dialog = tk.Toplevel(parent)
         self.setup_dialog()
         
+        if len(self.file_paths) > 1:
+            self.start_selection_walk()
+        elif self.size_label is not None and self.size_engine is not None:
+            self.start_size_calculation()
+            
     def setup_dialog(self):
         """Setup the properties dialog"""
-        self.dialog.title(f"Properties - {self.file_path.name}")
+        if len(self.file_paths) > 1:
+            self.dialog.title(f"Properties - {len(self.file_paths):,} items")
+        else:
+            self.dialog.title(f"Properties - {self.file_path.name}")
         self.dialog.geometry("400x500")
         self.dialog.resizable(False, False)
         
@@ -30,12 +48,15 @@ class PropertiesDialog:
         notebook = ttk.Notebook(self.dialog)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # General tab
-        self.create_general_tab(notebook)
-        
-        # Security tab
-        self.create_security_tab(notebook)
-        
+        if len(self.file_paths) > 1:
+            self.create_selection_tab(notebook)
+        else:
+            # General tab
+            self.create_general_tab(notebook)
+            
+            # Security tab
+            self.create_security_tab(notebook)
+            
         # Button frame
         button_frame = ttk.Frame(self.dialog)
         button_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -76,7 +97,8 @@ class PropertiesDialog:
                 size = self.format_size(file_stat.st_size)
                 self.add_property(props_frame, "Size:", f"{size} ({file_stat.st_size:,} bytes)", 2)
             else:
-                self.add_property(props_frame, "Size:", "Calculating...", 2)
+                self.size_label = self.add_property(props_frame, "Size:", "Calculating...", 2)
+                self.contents_label = self.add_property(props_frame, "Contains:", "", 6)
                 
             # Dates
             created = datetime.fromtimestamp(file_stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
@@ -90,6 +112,63 @@ class PropertiesDialog:
         except Exception as e:
             self.add_property(props_frame, "Error:", str(e), 0)
             
+    def create_selection_tab(self, notebook):
+        """Create the general tab for several selected items"""
+        general_frame = ttk.Frame(notebook)
+        notebook.add(general_frame, text="General")
+        
+        header_frame = ttk.Frame(general_frame)
+        header_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Label(header_frame, text="🗂", font=("Arial", 24)).pack(side=tk.LEFT, padx=10)
+        ttk.Label(header_frame, text=f"{len(self.file_paths):,} items selected",
+                  font=("Arial", 12, "bold")).pack(side=tk.LEFT, anchor='w')
+        
+        props_frame = ttk.LabelFrame(general_frame, text="Properties", padding=10)
+        props_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        parents = {path.parent for path in self.file_paths}
+        location = str(parents.pop()) if len(parents) == 1 else f"{len(parents):,} folders"
+        self.add_property(props_frame, "Location:", location, 0)
+        self.size_label = self.add_property(props_frame, "Size:", "Calculating...", 1)
+        self.contents_label = self.add_property(props_frame, "Contains:", "", 2)
+        self.modified_label = self.add_property(props_frame, "Modified:", "", 3)
+        self.owners_label = self.add_property(props_frame, "Owners:", "", 4)
+        self.errors_label = self.add_property(props_frame, "", "", 5)
+        
+    def start_selection_walk(self):
+        """Total the selection on a parallel background walk, updating the labels as it goes"""
+        paths = list(self.file_paths)
+        
+        def run(job):
+            def progress(snapshot):
+                self.dialog.after(0, lambda: self.show_selection_stats(snapshot))
+            return SelectionWalker().walk(paths, progress, job.cancel_event)
+            
+        def on_done(stats, error):
+            if stats is not None:
+                self.dialog.after(0, lambda: self.show_selection_stats(stats))
+            elif not isinstance(error, JobCancelled):
+                self.dialog.after(0, lambda: self.size_label.config(text=f"Error: {error}"))
+                
+        self.size_job = BackgroundJob("Selection properties", run, low_priority=True, done_callback=on_done).start()
+        self.dialog.bind('<Destroy>', lambda e: self.size_job.cancel())
+        
+    def show_selection_stats(self, stats):
+        """Fill in running or final totals for a multi-selection"""
+        if not self.dialog.winfo_exists():
+            return
+        suffix = "" if stats.complete else " ..."
+        self.size_label.config(text=f"{self.format_size(stats.size)} ({stats.size:,} bytes){suffix}")
+        self.contents_label.config(text=f"{stats.files:,} files, {stats.folders:,} folders{suffix}")
+        if stats.oldest is not None:
+            oldest = datetime.fromtimestamp(stats.oldest).strftime('%Y-%m-%d %H:%M:%S')
+            newest = datetime.fromtimestamp(stats.newest).strftime('%Y-%m-%d %H:%M:%S')
+            self.modified_label.config(text=oldest if oldest == newest else f"{oldest} to {newest}")
+        self.owners_label.config(text=stats.owner_names())
+        if stats.errors:
+            self.errors_label.config(text=f"{stats.errors:,} items could not be read")
+            
     def create_security_tab(self, notebook):
         """Create security/permissions tab"""
         security_frame = ttk.Frame(notebook)
@@ -141,7 +220,28 @@ class PropertiesDialog:
     def add_property(self, parent, label, value, row):
         """Add a property row"""
         ttk.Label(parent, text=label, font=("Arial", 9, "bold")).grid(row=row, column=0, sticky='w', padx=5, pady=2)
-        ttk.Label(parent, text=value, font=("Arial", 9)).grid(row=row, column=1, sticky='w', padx=10, pady=2)
+        value_label = ttk.Label(parent, text=value, font=("Arial", 9))
+        value_label.grid(row=row, column=1, sticky='w', padx=10, pady=2)
+        return value_label
+        
+    def start_size_calculation(self):
+        """Compute the folder total in the background, cancelled if the dialog closes"""
+        def run(job):
+            return self.size_engine.directory_size(self.file_path, cancel_event=job.cancel_event)
+            
+        def on_done(total, error):
+            if total is not None:
+                self.dialog.after(0, lambda: self.show_folder_total(total))
+                
+        self.size_job = BackgroundJob("Folder size", run, low_priority=True, done_callback=on_done).start()
+        self.dialog.bind('<Destroy>', lambda e: self.size_job.cancel())
+        
+    def show_folder_total(self, total):
+        """Fill in the computed folder size"""
+        if not self.dialog.winfo_exists():
+            return
+        self.size_label.config(text=f"{self.format_size(total.size)} ({total.size:,} bytes)")
+        self.contents_label.config(text=f"{total.files:,} files, {total.dirs:,} folders")
         
     def get_file_type(self):
         """Get file type description"""
@@ -0,0 +1,204 @@
+"""
+Top Files Dialog
+Streams the largest or oldest files under a folder while the scan runs
+"""
+
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+from pathlib import Path
+
+from ..utils.top_files import TopFilesFinder, TOP_FILE_ORDERS
+from ..utils.jobs import JobCancelled
+
+class TopFilesDialog:
+    def __init__(self, parent, directory, file_manager):
+        self.directory = Path(directory)
+        self.file_manager = file_manager
+        self.scan_thread = None
+        self.cancel_event = threading.Event()
+        self.paths = {}
+        
+        self.dialog = tk.Toplevel(parent)
+        self.setup_dialog()
+        self.start_scan()
+        
+    def setup_dialog(self):
+        """Setup top files dialog"""
+        self.dialog.title(f"Largest Files - {self.directory}")
+        self.dialog.geometry("750x500")
+        
+        options_frame = ttk.Frame(self.dialog, padding=(10, 5))
+        options_frame.pack(fill=tk.X)
+        
+        ttk.Label(options_frame, text="Show top").pack(side=tk.LEFT)
+        self.count_var = tk.StringVar(value="100")
+        ttk.Spinbox(options_frame, from_=10, to=10000, increment=10, textvariable=self.count_var,
+                    width=7).pack(side=tk.LEFT, padx=5)
+        
+        self.order_labels = {label: order for order, label in TOP_FILE_ORDERS.items()}
+        self.order_var = tk.StringVar(value=TOP_FILE_ORDERS['size'])
+        ttk.Combobox(options_frame, textvariable=self.order_var, values=list(self.order_labels),
+                     state='readonly', width=16).pack(side=tk.LEFT, padx=5)
+        
+        self.scan_btn = ttk.Button(options_frame, text="Scan", command=self.start_scan)
+        self.scan_btn.pack(side=tk.LEFT, padx=5)
+        self.stop_btn = ttk.Button(options_frame, text="Stop", command=self.stop_scan)
+        self.stop_btn.pack(side=tk.LEFT, padx=5)
+        
+        results_frame = ttk.Frame(self.dialog, padding=(10, 0))
+        results_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.results_tree = ttk.Treeview(results_frame, columns=('size', 'modified', 'folder'))
+        self.results_tree.heading('#0', text='Name')
+        self.results_tree.heading('size', text='Size')
+        self.results_tree.heading('modified', text='Modified')
+        self.results_tree.heading('folder', text='Folder')
+        self.results_tree.column('#0', width=200)
+        self.results_tree.column('size', width=90, anchor='e')
+        self.results_tree.column('modified', width=130)
+        self.results_tree.column('folder', width=300)
+        self.results_tree.bind('<Double-1>', lambda e: self.open_selected())
+        
+        v_scroll = ttk.Scrollbar(results_frame, orient='vertical', command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=v_scroll.set)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(self.dialog, textvariable=self.status_var).pack(fill=tk.X, padx=10, pady=(5, 0))
+        
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Button(button_frame, text="Open", command=self.open_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Open Location", command=self.open_location).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Move to Trash", command=self.trash_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Delete", command=self.delete_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side=tk.RIGHT, padx=5)
+        
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+    def start_scan(self):
+        """Start the scan in a background thread"""
+        if self.scan_thread and self.scan_thread.is_alive():
+            return
+        try:
+            count = max(1, int(self.count_var.get()))
+        except ValueError:
+            count = 100
+        order = self.order_labels.get(self.order_var.get(), 'size')
+        finder = TopFilesFinder(count, order,
+                                follow_hidden=self.file_manager.settings.get('show_hidden', False))
+        
+        self.cancel_event = threading.Event()
+        self.scan_btn.config(state='disabled')
+        self.stop_btn.config(state='normal')
+        self.status_var.set("Scanning...")
+        self.scan_thread = threading.Thread(target=self.perform_scan, args=(finder,))
+        self.scan_thread.daemon = True
+        self.scan_thread.start()
+        
+    def perform_scan(self, finder):
+        """Run the finder on the worker thread, streaming snapshots to the UI"""
+        def on_partial(files, scanned):
+            self.dialog.after(0, lambda: self.show_files(files, f"Scanning... {scanned:,} files checked"))
+            
+        try:
+            files = finder.find(self.directory, on_partial, self.cancel_event)
+            message = f"Top {len(files)} of {finder.scanned:,} files"
+            self.dialog.after(0, lambda: self.show_files(files, message, finished=True))
+        except JobCancelled:
+            self.dialog.after(0, lambda: self.finish_scan(f"Stopped after {finder.scanned:,} files"))
+        except Exception as e:
+            message = f"Scan error: {e}"
+            self.dialog.after(0, lambda: self.finish_scan(message))
+            
+    def show_files(self, files, message, finished=False):
+        """Replace the list with a ranked snapshot"""
+        if not self.dialog.winfo_exists():
+            return
+        selected = set(self.get_selected_paths())
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.paths = {}
+        format_size = self.file_manager.file_list.format_size
+        for top_file in files:
+            modified = datetime.fromtimestamp(top_file.mtime).strftime('%Y-%m-%d %H:%M')
+            item_id = self.results_tree.insert('', 'end', text=top_file.path.name,
+                                               values=(format_size(top_file.size), modified,
+                                                       str(top_file.path.parent)))
+            self.paths[item_id] = top_file.path
+            if top_file.path in selected:
+                self.results_tree.selection_add(item_id)
+        if finished:
+            self.finish_scan(message)
+        else:
+            self.status_var.set(message)
+            
+    def finish_scan(self, message):
+        """Reset controls after a scan ends"""
+        if not self.dialog.winfo_exists():
+            return
+        self.scan_btn.config(state='normal')
+        self.stop_btn.config(state='disabled')
+        self.status_var.set(message)
+        
+    def stop_scan(self):
+        """Stop the current scan"""
+        self.cancel_event.set()
+        
+    def close(self):
+        """Cancel any scan and close the dialog"""
+        self.cancel_event.set()
+        self.dialog.destroy()
+        
+    def get_selected_paths(self):
+        """File paths selected in the results"""
+        return [self.paths[item_id] for item_id in self.results_tree.selection() if item_id in self.paths]
+        
+    def open_selected(self):
+        """Open the selected file with its default application"""
+        paths = self.get_selected_paths()
+        if paths:
+            self.file_manager.open_file(paths[0])
+            
+    def open_location(self):
+        """Navigate the main window to the selected file's folder"""
+        paths = self.get_selected_paths()
+        if paths:
+            self.file_manager.navigate_to(paths[0].parent)
+            
+    def remove_rows(self, paths):
+        """Drop rows of files that no longer exist"""
+        for item_id, path in list(self.paths.items()):
+            if path in paths:
+                self.results_tree.delete(item_id)
+                del self.paths[item_id]
+                
+    def trash_selected(self):
+        """Move selected files to the trash"""
+        paths = self.get_selected_paths()
+        if not paths:
+            return
+        if not messagebox.askyesno("Move to Trash", f"Move {len(paths)} file(s) to the Trash?",
+                                   parent=self.dialog):
+            return
+        trashed, failed = self.file_manager.file_ops.trash_files(paths)
+        self.remove_rows({item.original_path for item in trashed})
+        if failed:
+            messagebox.showerror("Error", f"Failed to trash {len(failed)} file(s): {failed[0][1]}",
+                                 parent=self.dialog)
+        self.file_manager.refresh_view()
+        
+    def delete_selected(self):
+        """Permanently delete selected files"""
+        paths = self.get_selected_paths()
+        if not paths:
+            return
+        if not messagebox.askyesno("Delete Permanently",
+                                   f"Permanently delete {len(paths)} file(s)? This cannot be undone.",
+                                   parent=self.dialog):
+            return
+        self.file_manager.start_permanent_delete(paths)
+        self.remove_rows(set(paths))
\ No newline at end of file
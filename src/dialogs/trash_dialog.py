@@ -0,0 +1,118 @@
+"""
+Trash Dialog
+Lists trashed items for restore, permanent deletion or emptying
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+class TrashDialog:
+    def __init__(self, parent, file_manager):
+        self.file_manager = file_manager
+        self.trash = file_manager.file_ops.trash
+        self.items = {}
+        
+        self.dialog = tk.Toplevel(parent)
+        self.setup_dialog()
+        self.load_items()
+        
+    def setup_dialog(self):
+        """Setup trash dialog"""
+        self.dialog.title("Trash")
+        self.dialog.geometry("650x400")
+        
+        list_frame = ttk.Frame(self.dialog, padding=10)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.items_tree = ttk.Treeview(list_frame, columns=('location', 'deleted'))
+        self.items_tree.heading('#0', text='Name')
+        self.items_tree.heading('location', text='Original Location')
+        self.items_tree.heading('deleted', text='Deleted')
+        self.items_tree.column('#0', width=180)
+        self.items_tree.column('location', width=300)
+        self.items_tree.column('deleted', width=140)
+        
+        v_scroll = ttk.Scrollbar(list_frame, orient='vertical', command=self.items_tree.yview)
+        self.items_tree.configure(yscrollcommand=v_scroll.set)
+        self.items_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(self.dialog, textvariable=self.status_var).pack(fill=tk.X, padx=10)
+        
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Button(button_frame, text="Restore", command=self.restore_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Delete Permanently", command=self.delete_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Empty Trash", command=self.empty_trash).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=self.dialog.destroy).pack(side=tk.RIGHT, padx=5)
+        
+    def load_items(self):
+        """Fill the list from the trash metadata"""
+        self.items_tree.delete(*self.items_tree.get_children())
+        self.items = {}
+        try:
+            items = self.trash.list_items()
+        except OSError as e:
+            self.status_var.set(f"Cannot read trash: {e}")
+            return
+            
+        for item in sorted(items, key=lambda i: i.deletion_date, reverse=True):
+            item_id = self.items_tree.insert('', 'end', text=item.original_path.name,
+                                             values=(str(item.original_path.parent),
+                                                     item.deletion_date.replace('T', ' ')))
+            self.items[item_id] = item
+        self.status_var.set(f"{len(items)} item(s) in trash")
+        
+    def get_selected_items(self):
+        """Trashed items selected in the list"""
+        return [self.items[item_id] for item_id in self.items_tree.selection()]
+        
+    def restore_selected(self):
+        """Restore selected items to their original location"""
+        restored = 0
+        for item in self.get_selected_items():
+            try:
+                self.trash.restore(item)
+                restored += 1
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to restore {item.original_path.name}: {e}",
+                                     parent=self.dialog)
+        self.load_items()
+        self.file_manager.refresh_view()
+        self.file_manager.status_bar.update_status(f"Restored {restored} item(s)")
+        
+    def delete_selected(self):
+        """Permanently delete selected items in the background"""
+        items = self.get_selected_items()
+        if not items:
+            return
+        if not messagebox.askyesno("Delete Permanently",
+                                   f"Permanently delete {len(items)} item(s)? This cannot be undone.",
+                                   parent=self.dialog):
+            return
+        self.start_purge(items)
+        
+    def empty_trash(self):
+        """Permanently delete everything in the trash in the background"""
+        if not self.items:
+            return
+        if not messagebox.askyesno("Empty Trash",
+                                   f"Permanently delete all {len(self.items)} item(s) in the trash?",
+                                   parent=self.dialog):
+            return
+        self.start_purge(None)
+        
+    def start_purge(self, items):
+        """Run a throttled purge job and refresh the list when it ends"""
+        def run(job):
+            return self.trash.purge(items, progress_callback=job.report,
+                                    cancel_event=job.cancel_event)
+            
+        def on_complete(result):
+            if self.dialog.winfo_exists():
+                self.load_items()
+                
+        self.file_manager.run_background_job("Emptying trash", run, on_complete, units='items')
+        self.status_var.set("Deleting in the background...")
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Treemap Dialog
+Disk usage map of a folder drawn as a squarified treemap
+"""
+
+import os
+import time
+import zlib
+import tkinter as tk
+from tkinter import ttk
+from pathlib import Path
+
+from ..utils.jobs import BackgroundJob, JobCancelled
+from ..utils.treemap import TreemapLayout
+
+class TreemapDialog:
+    FOLDER_COLORS = ['#5b7fa6', '#6f9a6a', '#a6895b', '#8a6aa6', '#5ba69e', '#a65b6f']
+    FILE_COLORS = ['#9fc5e8', '#b6d7a8', '#ffe599', '#f9cb9c', '#d5a6bd', '#a2c4c9', '#ea9999', '#b4a7d6']
+    MERGED_COLOR = '#cccccc'
+    
+    def __init__(self, parent, directory, file_manager):
+        self.root_directory = Path(directory)
+        self.directory = Path(directory)
+        self.file_manager = file_manager
+        self.size_engine = file_manager.file_ops.size_engine
+        self.layout_engine = TreemapLayout(self.size_engine)
+        self.job = None
+        self.rects = {}  # canvas item id -> TreemapRect
+        self.resize_pending = None
+        self.closed = False
+        
+        self.dialog = tk.Toplevel(parent)
+        self.setup_dialog()
+        self.dialog.after(100, self.start_layout)
+        
+    def setup_dialog(self):
+        """Setup treemap dialog"""
+        self.dialog.title(f"Disk Usage - {self.directory}")
+        self.dialog.geometry("900x650")
+        
+        toolbar = ttk.Frame(self.dialog)
+        toolbar.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.up_btn = ttk.Button(toolbar, text="⬆ Up", command=self.go_up)
+        self.up_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Rescan", command=self.rescan).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Open in File Manager", command=self.open_in_file_manager).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Close", command=self.close).pack(side=tk.RIGHT, padx=5)
+        
+        self.canvas = tk.Canvas(self.dialog, background='white', highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.canvas.bind('<Motion>', self.on_motion)
+        self.canvas.bind('<Button-1>', self.on_click)
+        
+        self.status_var = tk.StringVar(value="Scanning...")
+        ttk.Label(self.dialog, textvariable=self.status_var).pack(fill=tk.X, padx=10, pady=5)
+        
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        self.dialog.bind('<Destroy>', self.on_destroy)
+        
+    def start_layout(self):
+        """Size the folder (reusing memoized subtotals) and lay it out off the UI thread"""
+        if self.job is not None:
+            self.job.cancel()
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width < 10 or height < 10:
+            return
+        directory = self.directory
+        self.dialog.title(f"Disk Usage - {directory}")
+        self.up_btn.config(state='normal' if directory != self.root_directory else 'disabled')
+        
+        def run(job):
+            started = time.monotonic()
+            total = self.size_engine.directory_size(directory, job.report, job.cancel_event)
+            rects = self.layout_engine.layout(directory, width, height, job.cancel_event)
+            return total, rects, time.monotonic() - started
+            
+        def on_progress(done, total):
+            self.post(lambda: self.status_var.set(f"Scanning... {done:,} folders"))
+            
+        def on_done(result, error):
+            if isinstance(error, JobCancelled):
+                return
+            self.post(lambda: self.show_layout(directory, result, error))
+            
+        self.job = BackgroundJob("Treemap", run, low_priority=True,
+                                 progress_callback=on_progress, done_callback=on_done).start()
+        
+    def post(self, callback):
+        """Run callback on the UI thread, unless the dialog is already gone"""
+        if self.closed:
+            return
+        try:
+            self.dialog.after(0, callback)
+        except (tk.TclError, RuntimeError):
+            # Destroyed between the check and the call
+            pass
+            
+    def show_layout(self, directory, result, error):
+        """Draw the rectangles computed by the layout job"""
+        if not self.dialog.winfo_exists() or directory != self.directory:
+            return
+        if error:
+            self.status_var.set(f"Error: {error}")
+            return
+        total, rects, elapsed = result
+        started = time.monotonic()
+        self.canvas.delete('all')
+        self.rects = {}
+        format_size = self.file_manager.file_list.format_size
+        for rect in rects:
+            x1, y1 = rect.x, rect.y
+            x2, y2 = rect.x + rect.width, rect.y + rect.height
+            item_id = self.canvas.create_rectangle(x1, y1, x2, y2, fill=self.color_for(rect), outline='#555555')
+            self.rects[item_id] = rect
+            # Labels only where they fit; the header band of folders holds theirs
+            if rect.width > 60 and rect.height > 14:
+                label = rect.label if rect.is_dir else f"{rect.label} ({format_size(rect.size)})"
+                self.canvas.create_text(x1 + 3, y1 + 1, text=label, anchor='nw', font=("Arial", 8),
+                                        width=rect.width - 6, state='disabled')
+        draw_time = time.monotonic() - started
+        self.status_var.set(f"{directory}: {format_size(total.size)} in {total.files:,} files, "
+                            f"{total.dirs:,} folders - {len(rects):,} blocks "
+                            f"(layout {elapsed:.2f}s, draw {draw_time:.2f}s)")
+        
+    def color_for(self, rect):
+        """Folders by depth, files by extension"""
+        if rect.path is None:
+            return self.MERGED_COLOR
+        if rect.is_dir:
+            return self.FOLDER_COLORS[rect.depth % len(self.FOLDER_COLORS)]
+        extension = os.path.splitext(rect.label)[1].lower().encode('utf-8', 'replace')
+        return self.FILE_COLORS[zlib.crc32(extension) % len(self.FILE_COLORS)]
+        
+    def rect_at(self, event):
+        """Innermost rectangle under the pointer"""
+        items = self.canvas.find_overlapping(event.x, event.y, event.x, event.y)
+        for item_id in reversed(items):
+            if item_id in self.rects:
+                return self.rects[item_id]
+        return None
+        
+    def on_motion(self, event):
+        """Describe the item under the pointer"""
+        rect = self.rect_at(event)
+        if rect is None:
+            return
+        format_size = self.file_manager.file_list.format_size
+        if rect.path is None:
+            self.status_var.set(f"{rect.label}: {format_size(rect.size)}")
+        else:
+            self.status_var.set(f"{rect.path}: {format_size(rect.size)}")
+            
+    def on_click(self, event):
+        """Drill down into the clicked folder"""
+        rect = self.rect_at(event)
+        while rect is not None and not rect.is_dir:
+            rect = self.parent_rect(rect)
+        if rect is not None and rect.path:
+            self.directory = Path(rect.path)
+            self.start_layout()
+            
+    def parent_rect(self, rect):
+        """Folder rectangle containing a file rectangle"""
+        parent = os.path.dirname(rect.path) if rect.path else None
+        for other in self.rects.values():
+            if other.path == parent and other.is_dir:
+                return other
+        return None
+        
+    def go_up(self):
+        """Show the parent folder, down to the folder the map was opened on"""
+        if self.directory != self.root_directory:
+            self.directory = self.directory.parent
+            self.start_layout()
+            
+    def rescan(self):
+        """Forget memoized and stored sizes under the shown folder and scan again"""
+        self.size_engine.invalidate(self.directory, stored=True)
+        self.start_layout()
+        
+    def open_in_file_manager(self):
+        """Navigate the main window to the shown folder"""
+        self.file_manager.navigate_to(self.directory)
+        
+    def on_resize(self, event):
+        """Lay out again once resizing settles"""
+        if self.resize_pending:
+            self.dialog.after_cancel(self.resize_pending)
+        self.resize_pending = self.dialog.after(200, self.start_layout)
+        
+    def close(self):
+        """Cancel any layout and close the dialog"""
+        if self.job is not None:
+            self.job.cancel()
+        self.dialog.destroy()
+        
+    def on_destroy(self, event):
+        """Stop the layout job however the dialog was destroyed"""
+        if event.widget is self.dialog:
+            self.closed = True
+            if self.job is not None:
+                self.job.cancel()
\ No newline at end of file
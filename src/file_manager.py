@@ -6,12 +6,12 @@ Handles the primary file browsing interface
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import shutil
 import subprocess
 import platform
 from pathlib import Path
 from datetime import datetime
 import mimetypes
+import posixpath
 
 from .components.file_tree import FileTreeView
 from .components.file_list import FileListView
@@ -21,7 +21,16 @@ from .components.statusbar import StatusBar
 from .dialogs.properties_dialog import PropertiesDialog
 from .dialogs.search_dialog import SearchDialog
 from .dialogs.preferences_dialog import PreferencesDialog
+from .dialogs.trash_dialog import TrashDialog
+from .dialogs.duplicates_dialog import DuplicatesDialog
+from .dialogs.treemap_dialog import TreemapDialog
+from .dialogs.top_files_dialog import TopFilesDialog
 from .utils.file_operations import FileOperations
+from .utils.jobs import BackgroundJob, JobCancelled
+from .utils.journal import OperationJournal
+from .utils.hashing import write_checksum_sidecar
+from .utils.trash import Trash
+from .utils.archive_index import is_archive, archive_stem, split_archive_path
 
 class FileManagerWindow:
     def __init__(self, root, settings, theme_manager, logger):
@@ -30,12 +39,21 @@ class FileManagerWindow:
         self.theme_manager = theme_manager
         self.logger = logger
         self.current_path = Path.home()
+        self.current_archive = None  # (archive file, inner path) while browsing an archive
         self.clipboard = []
         self.clipboard_operation = None  # 'cut' or 'copy'
+        self.file_ops = FileOperations(purge_rate=self.settings.get('trash_purge_rate', 2000),
+                                       hash_cache_entries=self.settings.get('hash_cache_max_entries', 1000000),
+                                       persist_folder_sizes=self.settings.get('persist_folder_sizes', True),
+                                       config_dir=self.settings.config_file.parent)
+        self.jobs = []
+        self.apply_transfer_settings()
         
         self.setup_ui()
         self.setup_bindings()
         self.load_initial_directory()
+        self.root.after(500, self.resume_interrupted_jobs)
+        self.root.after(10000, self.prune_hash_cache)
         
     def setup_ui(self):
         """Create the main UI layout"""
@@ -102,6 +120,9 @@ class FileManagerWindow:
         file_menu.add_command(label="Open", command=self.open_selected, accelerator="Enter")
         file_menu.add_command(label="Open With...", command=self.open_with)
         file_menu.add_separator()
+        file_menu.add_command(label="Compress to Zip", command=self.compress_selected)
+        file_menu.add_command(label="Extract Here", command=self.extract_selected)
+        file_menu.add_command(label="Extract To...", command=lambda: self.extract_selected(ask_destination=True))
         file_menu.add_command(label="Properties", command=self.show_properties, accelerator="Alt+Enter")
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit, accelerator="Ctrl+Q")
@@ -114,16 +135,20 @@ class FileManagerWindow:
         edit_menu.add_command(label="Paste", command=self.paste_files, accelerator="Ctrl+V")
         edit_menu.add_separator()
         edit_menu.add_command(label="Delete", command=self.delete_files, accelerator="Delete")
+        edit_menu.add_command(label="Delete Permanently", command=self.delete_files_permanently, accelerator="Shift+Delete")
         edit_menu.add_command(label="Rename", command=self.rename_file, accelerator="F2")
         edit_menu.add_separator()
         edit_menu.add_command(label="Select All", command=self.select_all, accelerator="Ctrl+A")
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Cancel Background Operations", command=self.cancel_background_jobs)
         
         # View menu
         view_menu = tk.Menu(self.menubar, tearoff=0)
         self.menubar.add_cascade(label="View", menu=view_menu)
-        view_menu.add_command(label="Refresh", command=self.refresh_view, accelerator="F5")
+        view_menu.add_command(label="Refresh", command=lambda: self.refresh_view(rescan=True), accelerator="F5")
         view_menu.add_separator()
         view_menu.add_command(label="Show Hidden Files", command=self.toggle_hidden_files)
+        view_menu.add_command(label="Show Folder Sizes", command=self.toggle_folder_sizes)
         view_menu.add_command(label="Show Preview Panel", command=self.toggle_preview_panel)
         view_menu.add_separator()
         view_menu.add_command(label="List View", command=lambda: self.change_view_mode("list"))
@@ -135,7 +160,11 @@ class FileManagerWindow:
         self.menubar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Search", command=self.open_search_dialog, accelerator="Ctrl+F")
         tools_menu.add_command(label="Calculate Folder Size", command=self.calculate_folder_size)
+        tools_menu.add_command(label="Disk Usage Map", command=self.show_disk_usage)
+        tools_menu.add_command(label="Largest Files", command=self.find_largest_files)
         tools_menu.add_command(label="Find Duplicates", command=self.find_duplicates)
+        tools_menu.add_command(label="Clear Size Cache", command=self.clear_size_cache)
+        tools_menu.add_command(label="Trash...", command=self.show_trash)
         tools_menu.add_separator()
         tools_menu.add_command(label="Open Terminal Here", command=self.open_terminal)
         tools_menu.add_command(label="Open Command Prompt", command=self.open_command_prompt)
@@ -160,8 +189,9 @@ class FileManagerWindow:
         self.root.bind('<Control-f>', lambda e: self.open_search_dialog())
         self.root.bind('<Control-comma>', lambda e: self.open_preferences())
         self.root.bind('<F2>', lambda e: self.rename_file())
-        self.root.bind('<F5>', lambda e: self.refresh_view())
+        self.root.bind('<F5>', lambda e: self.refresh_view(rescan=True))
         self.root.bind('<Delete>', lambda e: self.delete_files())
+        self.root.bind('<Shift-Delete>', lambda e: self.delete_files_permanently())
         self.root.bind('<Return>', lambda e: self.open_selected())
         self.root.bind('<Alt-Return>', lambda e: self.show_properties())
         
@@ -173,12 +203,15 @@ class FileManagerWindow:
     def navigate_to(self, path):
         """Navigate to a specific directory"""
         try:
-            if path.exists() and path.is_dir():
+            archive_location = split_archive_path(path)
+            if archive_location or (path.exists() and path.is_dir()):
                 self.current_path = path
+                self.current_archive = archive_location
                 self.file_tree.update_tree(path)
                 self.file_list.update_list(path)
                 self.status_bar.update_path(path)
-                self.settings.set('last_directory', str(path))
+                if not archive_location:
+                    self.settings.set('last_directory', str(path))
                 self.logger.info(f"Navigated to: {path}")
             else:
                 messagebox.showerror("Error", f"Cannot access directory: {path}")
@@ -202,13 +235,23 @@ class FileManagerWindow:
         # Implementation for navigation history
         pass
         
-    def refresh_view(self):
-        """Refresh the current view"""
+    def refresh_view(self, rescan=False):
+        """Refresh the current view; rescan also drops stored folder sizes below it"""
+        # Anything below the current folder may have changed outside the app
+        self.file_ops.size_engine.invalidate(self.current_path, stored=rescan)
         self.file_list.update_list(self.current_path)
         self.status_bar.update_status("Refreshed")
         
+    def clear_size_cache(self):
+        """Forget every memoized and stored folder size"""
+        self.file_ops.size_engine.clear(stored=True)
+        self.refresh_view()
+        self.status_bar.update_status("Size cache cleared")
+        
     def create_new_folder(self):
         """Create a new folder"""
+        if self.archive_read_only():
+            return
         name = tk.simpledialog.askstring("New Folder", "Enter folder name:")
         if name:
             try:
@@ -221,6 +264,8 @@ class FileManagerWindow:
                 
     def create_new_file(self):
         """Create a new file"""
+        if self.archive_read_only():
+            return
         name = tk.simpledialog.askstring("New File", "Enter file name:")
         if name:
             try:
@@ -236,11 +281,31 @@ class FileManagerWindow:
         selection = self.file_list.get_selection()
         if selection:
             path = self.current_path / selection[0]
-            if path.is_dir():
+            if self.current_archive:
+                found = self.file_ops.archive_indexes.lookup(path)
+                if found and found[1].is_dir:
+                    self.navigate_to(path)
+                elif found:
+                    self.open_archive_member(path)
+            elif path.is_dir() or is_archive(path):
                 self.navigate_to(path)
             else:
                 self.open_file(path)
                 
+    def open_archive_member(self, path):
+        """Stream an archive member to a temp file and open it"""
+        def run(job):
+            return self.file_ops.archive_indexes.stage_member(path, job.cancel_event)
+            
+        self.run_background_job(f"Opening {path.name}", run, self.open_file)
+        
+    def archive_read_only(self):
+        """Tell the user that archive contents cannot be changed in place"""
+        if self.current_archive:
+            messagebox.showinfo("Archive", "Archives are browsed read-only. Extract files to change them.")
+            return True
+        return False
+        
     def open_file(self, path):
         """Open a file with the default application"""
         try:
@@ -262,11 +327,100 @@ class FileManagerWindow:
         """Show properties dialog for selected items"""
         selection = self.file_list.get_selection()
         if selection:
-            path = self.current_path / selection[0]
-            dialog = PropertiesDialog(self.root, path)
+            paths = [self.current_path / name for name in selection]
+            dialog = PropertiesDialog(self.root, paths, self.file_ops.size_engine)
+            
+    def compress_selected(self):
+        """Compress the selected folder (or the current one) into a zip beside it"""
+        selection = self.file_list.get_selection()
+        folder = self.current_path / selection[0] if selection else self.current_path
+        if not folder.is_dir():
+            messagebox.showinfo("Compress", "Select a folder to compress.")
+            return
+        output = folder.parent / f"{folder.name}.zip"
+        if output.exists() and not messagebox.askyesno("Compress", f"{output.name} already exists. Replace it?"):
+            return
+        level = self.settings.get('compression_level', 6)
+        
+        def run(job):
+            # Errors stay with this job; last_error is shared by every job
+            return self.file_ops.create_zip(folder, output, job.report, job.cancel_event, level)
+            
+        def on_complete(archive):
+            self.logger.info(f"Compressed {folder} to {archive}")
             
+        self.run_background_job(f"Compressing {folder.name}", run, on_complete)
+        
+    def extract_selected(self, ask_destination=False):
+        """Extract the selected archive, or the selected members of the archive being browsed"""
+        selection = self.file_list.get_selection()
+        if self.current_archive:
+            archive, inner = self.current_archive
+            members = [posixpath.join(inner, name) for name in selection] or [inner]
+            destination = archive.parent
+            ask_destination = True
+        else:
+            archives = [self.current_path / name for name in selection if is_archive(self.current_path / name)]
+            if not archives:
+                messagebox.showinfo("Extract", "Select an archive to extract.")
+                return
+            archive = archives[0]
+            members = None
+            destination = self.current_path / archive_stem(archive)
+            
+        if ask_destination:
+            chosen = filedialog.askdirectory(title="Extract To", initialdir=str(destination.parent))
+            if not chosen:
+                return
+            destination = Path(chosen)
+        self.start_extract_job(archive, destination, members)
+        
+    def start_extract_job(self, archive, destination, members=None):
+        """Stream an archive, or some of its members, into destination in the background"""
+        conflicts = self.extract_conflicts(archive, destination, members)
+        if conflicts and not messagebox.askyesno(
+                "Extract", f"{len(conflicts)} item(s) in {destination.name} may be replaced, "
+                           f"including {conflicts[0]}. Continue?"):
+            return
+        max_ratio = self.settings.get('extract_max_ratio', 100)
+        
+        def run(job):
+            # Errors stay with this job; last_error is shared by every job
+            return self.file_ops.extract_members(archive, destination, members, job.report,
+                                                 job.cancel_event, max_ratio)
+            
+        def on_complete(result):
+            self.logger.info(f"Extracted {archive.name} to {destination}")
+            if result.skipped:
+                self.logger.warning(f"Skipped {len(result.skipped)} member(s) of {archive.name}: "
+                                    f"{', '.join(result.skipped[:10])}")
+                messagebox.showwarning("Extract", f"{len(result.skipped)} link or special file(s) in "
+                                                  f"{archive.name} were not extracted, including "
+                                                  f"{result.skipped[0]}.")
+                
+        self.run_background_job(f"Extracting {archive.name}", run, on_complete)
+        
+    def extract_conflicts(self, archive, destination, members=None):
+        """Existing names in destination that extracting would replace"""
+        if not destination.is_dir():
+            return []
+        index = self.file_ops.archive_indexes.cached(archive)
+        names = set()
+        for inner in members if members is not None else ['']:
+            inner = inner.strip('/')
+            if inner:
+                names.add(posixpath.basename(inner))
+            elif index is not None:
+                names.update(entry.name for entry in index.listdir(''))
+            else:
+                # Not indexed yet; anything already in the folder may be replaced
+                names.update(os.listdir(destination))
+        return sorted(name for name in names if os.path.lexists(destination / name))
+        
     def cut_files(self):
         """Cut selected files to clipboard"""
+        if self.archive_read_only():
+            return
         selection = self.file_list.get_selection()
         if selection:
             self.clipboard = [self.current_path / name for name in selection]
@@ -282,55 +436,245 @@ class FileManagerWindow:
             self.status_bar.update_status(f"Copied {len(selection)} item(s)")
             
     def paste_files(self):
-        """Paste files from clipboard"""
+        """Paste files from clipboard in a background job"""
+        if self.archive_read_only():
+            return
         if not self.clipboard:
             return
             
-        try:
-            for source_path in self.clipboard:
-                dest_path = self.current_path / source_path.name
-                
-                if self.clipboard_operation == 'copy':
-                    if source_path.is_dir():
-                        shutil.copytree(source_path, dest_path)
-                    else:
-                        shutil.copy2(source_path, dest_path)
-                elif self.clipboard_operation == 'cut':
-                    shutil.move(source_path, dest_path)
-                    
-            if self.clipboard_operation == 'cut':
+        # Pasting members copied from archives extracts just those members
+        archives = {}
+        for path in self.clipboard:
+            location = split_archive_path(path)
+            if location and location[1]:
+                archives.setdefault(location[0], []).append(location[1])
+        if archives:
+            if sum(len(members) for members in archives.values()) < len(self.clipboard):
+                messagebox.showinfo("Paste", "Paste items copied from an archive separately from other files.")
+                return
+            for archive, members in archives.items():
+                self.start_extract_job(archive, self.current_path, members)
+            return
+            
+        operation = self.clipboard_operation
+        journal = OperationJournal.create('copy' if operation == 'copy' else 'move',
+                                          self.clipboard, self.current_path)
+        
+        def on_complete(result):
+            if operation == 'cut':
                 self.clipboard.clear()
                 
-            self.refresh_view()
-            self.status_bar.update_status("Paste completed")
+        self.start_paste_job(journal, on_complete=on_complete)
+        
+    def start_paste_job(self, journal, resume=False, on_complete=None):
+        """Run a journaled copy or move batch in the background"""
+        sources = journal.sources
+        destination = journal.destination
+        rate_limit = self.settings.get('job_rate_limit_kb', 0) * 1024
+        verify = None
+        if self.settings.get('verify_copies', False):
+            verify = self.settings.get('verify_algorithm', 'blake2b')
+        
+        def run(job):
+            result = None
+            try:
+                if journal.kind == 'copy':
+                    result = self.file_ops.copy_engine.copy(sources, destination, rate_limit,
+                                                            progress_callback=job.report,
+                                                            cancel_event=job.cancel_event,
+                                                            journal=journal, resume=resume,
+                                                            verify=verify)
+                else:
+                    result = self.file_ops.copy_engine.move(sources, destination, rate_limit,
+                                                            progress_callback=job.report,
+                                                            cancel_event=job.cancel_event,
+                                                            journal=journal, resume=resume,
+                                                            verify=verify)
+            except JobCancelled:
+                journal.discard()
+                raise
+            except Exception:
+                # Keep the journal so the batch can be resumed later, unless
+                # it failed its checks (destination exists, same file) before
+                # writing anything; resuming that would merge into the target
+                if journal.planned:
+                    journal.close()
+                else:
+                    journal.discard()
+                raise
+            journal.finish()
+            return result
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to paste: {e}")
+        def on_done(result):
+            if result is not None and result.algorithm:
+                self.report_verification(result, destination)
+            if on_complete:
+                on_complete(result)
+                
+        label = "Copying" if journal.kind == 'copy' else "Moving"
+        self.run_background_job(label, run, on_done)
+        
+    def report_verification(self, result, destination):
+        """Export checksums and report files whose copy did not verify"""
+        if self.settings.get('export_checksums', False) and result.checksums:
+            try:
+                sidecar = write_checksum_sidecar(result.checksums, destination, result.algorithm)
+                self.logger.info(f"Wrote checksums to {sidecar}")
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to write checksum file: {e}")
+                
+        if result.mismatches:
+            names = "\n".join(str(path) for path in result.mismatches[:20])
+            more = len(result.mismatches) - 20
+            if more > 0:
+                names += f"\n... and {more} more"
+            self.logger.error(f"Verification failed for {len(result.mismatches)} file(s)")
+            messagebox.showerror("Verification Failed",
+                                 f"{len(result.mismatches)} file(s) differ from their source:\n\n{names}")
+        else:
+            self.logger.info(f"Verified {len(result.checksums)} file(s) with {result.algorithm}")
             
+    def resume_interrupted_jobs(self):
+        """Offer to resume batch operations interrupted by a crash or exit"""
+        for journal in OperationJournal.pending():
+            if not journal.destination.is_dir():
+                journal.discard()
+                continue
+            if messagebox.askyesno("Resume Operation",
+                                   f"An operation did not finish:\n\n{journal.describe()}\n\n"
+                                   "Resume it now? Files already copied will be skipped."):
+                self.start_paste_job(journal, resume=True)
+            else:
+                journal.discard()
+                
+    def prune_hash_cache(self):
+        """Drop stale hash cache rows in a quiet low-priority job"""
+        def on_done(result, error):
+            if error:
+                self.logger.error(f"Hash cache pruning failed: {error}")
+            elif result:
+                self.logger.info(f"Pruned {result} stale hash cache entries")
+                
+        BackgroundJob("Pruning hash cache", lambda job: self.file_ops.prune_hash_cache(job.cancel_event),
+                      low_priority=True, done_callback=on_done).start()
+        
+    def run_background_job(self, description, target, on_complete=None, units='bytes'):
+        """Run a file operation off the UI thread, reporting progress in the status bar"""
+        def on_progress(done, total):
+            self.root.after(0, lambda: self.status_bar.update_status(
+                self.format_progress(description, done, total, units)))
+            
+        def on_done(result, error):
+            self.root.after(0, lambda: self.finish_background_job(
+                job, description, result, error, on_complete))
+            
+        job = BackgroundJob(description, target,
+                            low_priority=self.settings.get('low_priority_transfers', True),
+                            progress_callback=on_progress, done_callback=on_done)
+        self.jobs.append(job)
+        self.status_bar.update_status(f"{description}...")
+        return job.start()
+        
+    def finish_background_job(self, job, description, result, error, on_complete=None):
+        """Handle completion of a background job on the UI thread"""
+        if job in self.jobs:
+            self.jobs.remove(job)
+            
+        if isinstance(error, JobCancelled):
+            self.status_bar.update_status(f"{description} cancelled")
+        elif error:
+            self.logger.error(f"{description} failed: {error}")
+            messagebox.showerror("Error", f"{description} failed: {error}")
+        else:
+            if on_complete:
+                on_complete(result)
+            self.status_bar.update_status(f"{description} completed")
+            
+        self.refresh_view()
+        
+    def format_progress(self, description, done, total, units='bytes'):
+        """Format a progress message for the status bar"""
+        if total:
+            percent = done * 100 // total
+            if units == 'bytes':
+                return (f"{description}... {percent}% "
+                        f"({self.file_list.format_size(done)} of {self.file_list.format_size(total)})")
+            return f"{description}... {percent}% ({done:,} of {total:,} {units})"
+        return f"{description}..."
+        
+    def cancel_background_jobs(self):
+        """Cancel all running background operations"""
+        for job in self.jobs:
+            job.cancel()
+            
+    def apply_transfer_settings(self):
+        """Apply bandwidth limits from settings to the copy engine"""
+        self.file_ops.set_rate_limits(self.settings.get('transfer_rate_limit_kb', 0) * 1024)
+        
     def delete_files(self):
-        """Delete selected files"""
+        """Move selected files to the trash, or delete them if trash is off"""
+        if self.archive_read_only():
+            return
         selection = self.file_list.get_selection()
         if not selection:
             return
             
-        if messagebox.askyesno("Confirm Delete", 
-                              f"Are you sure you want to delete {len(selection)} item(s)?"):
-            try:
-                for name in selection:
-                    path = self.current_path / name
-                    if path.is_dir():
-                        shutil.rmtree(path)
-                    else:
-                        path.unlink()
-                        
-                self.refresh_view()
-                self.status_bar.update_status(f"Deleted {len(selection)} item(s)")
+        if not (self.settings.get('use_trash', True) and Trash.is_supported()):
+            self.delete_files_permanently()
+            return
+            
+        if self.settings.get('confirm_delete', True) and not messagebox.askyesno(
+                "Move to Trash", f"Move {len(selection)} item(s) to the Trash?"):
+            return
+            
+        # Each item is a single rename, so this returns immediately even
+        # for huge trees; data is only removed when the trash is emptied
+        paths = [self.current_path / name for name in selection]
+        trashed, failed = self.file_ops.trash_files(paths)
+        self.refresh_view()
+        self.status_bar.update_status(f"Moved {len(trashed)} item(s) to the Trash")
+        
+        if failed:
+            names = "\n".join(f"{path.name}: {error}" for path, error in failed[:10])
+            if messagebox.askyesno("Cannot Move to Trash",
+                                   f"{len(failed)} item(s) could not be moved to the Trash:\n\n"
+                                   f"{names}\n\nDelete them permanently instead?"):
+                self.start_permanent_delete([path for path, error in failed])
                 
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete: {e}")
+    def delete_files_permanently(self):
+        """Permanently delete selected files in a background job"""
+        if self.archive_read_only():
+            return
+        selection = self.file_list.get_selection()
+        if not selection:
+            return
+            
+        if not messagebox.askyesno("Confirm Delete", 
+                                   f"Permanently delete {len(selection)} item(s)? This cannot be undone."):
+            return
+        self.start_permanent_delete([self.current_path / name for name in selection])
+        
+    def start_permanent_delete(self, paths):
+        """Delete paths with a throttled background purge"""
+        def run(job):
+            for i, path in enumerate(paths):
+                job.check_cancelled()
+                self.file_ops.trash.remove_tree(path, job.cancel_event)
+                job.report(i + 1, len(paths))
                 
+        self.run_background_job("Deleting", run, units='items')
+        
+    def show_trash(self):
+        """Open the trash dialog to restore or purge items"""
+        if not Trash.is_supported():
+            messagebox.showinfo("Trash", "The trash is not available on this platform.")
+            return
+        dialog = TrashDialog(self.root, self)
+        
     def rename_file(self):
         """Rename selected file"""
+        if self.archive_read_only():
+            return
         selection = self.file_list.get_selection()
         if len(selection) == 1:
             old_name = selection[0]
@@ -355,6 +699,12 @@ class FileManagerWindow:
         self.settings.set('show_hidden', not current)
         self.refresh_view()
         
+    def toggle_folder_sizes(self):
+        """Toggle the recursive size of folders in the file list"""
+        current = self.settings.get('show_folder_sizes', False)
+        self.settings.set('show_folder_sizes', not current)
+        self.file_list.update_list(self.current_path)
+        
     def toggle_preview_panel(self):
         """Toggle preview panel visibility"""
         # Implementation for toggling preview panel
@@ -371,13 +721,38 @@ class FileManagerWindow:
         
     def calculate_folder_size(self):
         """Calculate and display folder sizes"""
-        # Implementation for folder size calculation
-        pass
+        selection = self.file_list.get_selection()
+        folders = [self.current_path / name for name in selection if (self.current_path / name).is_dir()]
+        if not folders:
+            folders = [self.current_path]
+        engine = self.file_ops.size_engine
+        
+        def run(job):
+            return [(folder, engine.directory_size(folder, job.report, job.cancel_event))
+                    for folder in folders]
+            
+        def on_complete(results):
+            lines = []
+            for folder, total in results:
+                if folder != self.current_path:
+                    self.file_list.show_folder_size(folder, total)
+                lines.append(f"{folder.name or folder}: {self.file_list.format_size(total.size)} "
+                             f"({total.files:,} files, {total.dirs:,} folders)")
+            messagebox.showinfo("Folder Size", "\n".join(lines))
+            
+        self.run_background_job("Calculating folder size", run, on_complete, units='folders')
+        
+    def show_disk_usage(self):
+        """Open a treemap of the current directory"""
+        dialog = TreemapDialog(self.root, self.current_path, self)
+        
+    def find_largest_files(self):
+        """Find the largest or oldest files under the current directory"""
+        dialog = TopFilesDialog(self.root, self.current_path, self)
         
     def find_duplicates(self):
         """Find duplicate files in the current directory"""
-        # Implementation for duplicate file finder
-        pass
+        dialog = DuplicatesDialog(self.root, self.current_path, self)
         
     def open_terminal(self):
         """Open terminal in current directory"""
@@ -397,7 +772,8 @@ class FileManagerWindow:
         
     def open_preferences(self):
         """Open preferences dialog"""
-        dialog = PreferencesDialog(self.root, self.settings, self.theme_manager)
+        dialog = PreferencesDialog(self.root, self.settings, self.theme_manager,
+                                   on_apply=self.apply_transfer_settings)
         
     def show_shortcuts(self):
         """Show keyboard shortcuts help"""
@@ -414,7 +790,8 @@ Edit Operations:
 Ctrl+X - Cut
 Ctrl+C - Copy
 Ctrl+V - Paste
-Delete - Delete
+Delete - Move to Trash
+Shift+Delete - Delete Permanently
 F2 - Rename
 Ctrl+A - Select All
 
@@ -5,17 +5,27 @@ Handles application settings and configuration
 
 import json
 import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Dict
 
+SAVE_DELAY = 1.0  # seconds changes may wait before being written together
+
 class SettingsManager:
     def __init__(self, config_file="config/settings.json"):
         self.config_file = Path(config_file)
         self.settings = {}
+        self.lock = threading.Lock()  # guards settings and dirty against the flush thread
+        self.write_lock = threading.Lock()  # one writer at a time
+        self.dirty = False
+        self.batch_depth = 0
+        self.save_timer = None
         self.default_settings = {
             'theme': 'default',
             'view_mode': 'detail',
             'show_hidden': False,
+            'show_folder_sizes': False,
             'show_preview': True,
             'window_geometry': '1200x800',
             'last_directory': str(Path.home()),
@@ -29,7 +39,23 @@ class SettingsManager:
             'toolbar_visible': True,
             'statusbar_visible': True,
             'sidebar_width': 200,
-            'preview_panel_height': 200
+            'preview_panel_height': 200,
+            'transfer_rate_limit_kb': 0,
+            'job_rate_limit_kb': 0,
+            'low_priority_transfers': True,
+            'verify_copies': False,
+            'verify_algorithm': 'blake2b',
+            'export_checksums': False,
+            'use_trash': True,
+            'trash_purge_rate': 2000,
+            'hash_cache_max_entries': 1000000,
+            'persist_folder_sizes': True,
+            'compression_level': 6,
+            'extract_max_ratio': 100,
+            'follow_max_lines': 5000,
+            'image_preview_max_mb': 8,
+            'image_cache_mb': 64,
+            'preview_deep_summary': False
         }
         self.load()
         
@@ -52,32 +78,98 @@ class SettingsManager:
             self.settings = self.default_settings.copy()
             
     def save(self):
-        """Save settings to file"""
+        """Save settings to file now"""
+        self.cancel_scheduled_save()
+        with self.lock:
+            self.dirty = True
+        self.flush()
+        
+    def flush(self):
+        """Write settings if they changed since the last write"""
+        # Serialized under write_lock, so a write of older text can never land last
+        with self.write_lock:
+            with self.lock:
+                self.save_timer = None
+                if not self.dirty:
+                    return
+                self.dirty = False
+                text = json.dumps(self.settings, indent=2)
+            try:
+                self.write_file(text)
+            except Exception as e:
+                with self.lock:
+                    self.dirty = True
+                print(f"Error saving settings: {e}")
+                
+    def write_file(self, text: str):
+        """Replace the settings file atomically, so a crash leaves the old or new file, never half of one"""
+        self.config_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.config_file.with_name(f".{self.config_file.name}.tmp")
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+            with open(temp_path, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+            
+    def schedule_save(self):
+        """Write changes on a background thread after SAVE_DELAY, coalescing everything set meanwhile"""
+        with self.lock:
+            if self.save_timer is not None or not self.dirty:
+                return
+            self.save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
             
+    def cancel_scheduled_save(self):
+        """Stop a pending background write"""
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+                
+    def close(self):
+        """Write any pending changes; call on exit"""
+        self.cancel_scheduled_save()
+        self.flush()
+        
+    @contextmanager
+    def batch(self):
+        """Group several set calls into one write"""
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0 and self.get('auto_save', True):
+                self.schedule_save()
+                
+                
     def get(self, key: str, default: Any = None) -> Any:
         """Get a setting value"""
         return self.settings.get(key, default)
         
     def set(self, key: str, value: Any):
-        """Set a setting value"""
-        self.settings[key] = value
-        if self.get('auto_save', True):
-            self.save()
+        """Set a setting value, written in the background shortly after"""
+        with self.lock:
+            self.settings[key] = value
+            self.dirty = True
+        if self.batch_depth == 0 and self.get('auto_save', True):
+            self.schedule_save()
             
     def reset_to_defaults(self):
         """Reset all settings to defaults"""
-        self.settings = self.default_settings.copy()
+        with self.lock:
+            self.settings = self.default_settings.copy()
         self.save()
         
     def add_recent_location(self, path: str):
         """Add a location to recent locations"""
-        recent = self.get('recent_locations', [])
+        recent = list(self.get('recent_locations', []))
         if path in recent:
             recent.remove(path)
         recent.insert(0, path)
@@ -87,7 +179,7 @@ class SettingsManager:
         
     def add_bookmark(self, name: str, path: str):
         """Add a bookmark"""
-        bookmarks = self.get('bookmarks', [])
+        bookmarks = list(self.get('bookmarks', []))
         bookmark = {'name': name, 'path': path}
         if bookmark not in bookmarks:
             bookmarks.append(bookmark)
@@ -106,6 +198,6 @@ class SettingsManager:
         
     def set_file_association(self, extension: str, application: str):
         """Set file association for an extension"""
-        associations = self.get('file_associations', {})
+        associations = dict(self.get('file_associations', {}))
         associations[extension.lower()] = application
         self.set('file_associations', associations)
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Archive Extraction Module
+Streaming, selective and parallel extraction with safety limits
+"""
+
+import os
+import shutil
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from pathlib import Path
+from typing import List, Optional
+
+from .archive_index import ArchiveIndex, ArchiveEntry
+from .jobs import JobCancelled
+
+class UnsafeArchiveError(Exception):
+    """Raised when an archive would write outside the destination or expand too far"""
+
+class ExtractResult:
+    """Outcome of an extraction"""
+    def __init__(self):
+        self.files = 0
+        self.folders = 0
+        self.bytes_written = 0
+        self.extracted: List[Path] = []
+        self.skipped: List[str] = []  # members that could not be recreated
+
+class ArchiveExtractor:
+    def __init__(self, workers: int = None, max_ratio: float = 100.0, chunk_size: int = 1024 * 1024):
+        """max_ratio caps uncompressed output relative to the archive size (0 = no limit)"""
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.max_ratio = max_ratio
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        
+    def extract(self, index: ArchiveIndex, destination: Path, members: Optional[List[str]] = None,
+                progress_callback=None, cancel_event: threading.Event = None) -> ExtractResult:
+        """Extract members (inner paths of files or folders; None for everything) into destination
+
+        A selected folder is recreated under destination by name, with
+        everything below it. Zip members are independent, so they are
+        decompressed and written on a thread pool; tar members are
+        streamed in archive order in a single pass. Hard links are
+        linked to the first copy written, and symlinks are created last,
+        only where they resolve inside destination.
+        """
+        destination = Path(destination)
+        plan = self.plan(index, destination, members)
+        total_bytes = sum(entry.size for entry, _ in plan if not entry.is_dir)
+        self.check_ratio(index, total_bytes)
+        
+        result = ExtractResult()
+        self.done_bytes = 0
+        self.total_bytes = total_bytes
+        self.progress_callback = progress_callback
+        destination.mkdir(parents=True, exist_ok=True)
+        files = []
+        links = []  # (target, first target written with the same data)
+        symlinks = []
+        written = {}  # id(member header) -> target
+        created = set()
+        for entry, target in plan:
+            folder = target if entry.is_dir else os.path.dirname(target)
+            if folder not in created:
+                os.makedirs(folder, exist_ok=True)
+                created.add(folder)
+            if entry.is_dir:
+                result.folders += 1
+            elif entry.link is not None:
+                symlinks.append((entry, target))
+            elif id(entry.info) in written:
+                links.append((target, written[id(entry.info)]))
+            else:
+                written[id(entry.info)] = target
+                files.append((entry, target))
+                
+        if index.kind == 'zip' and self.workers > 1 and len(files) > 1:
+            self.extract_parallel(index, files, cancel_event)
+        else:
+            targets = dict((id(entry), target) for entry, target in files)
+            for entry, member in index.stream_members([entry for entry, _ in files]):
+                self.write_member(entry, member, targets[id(entry)], cancel_event)
+        for target, source in links:
+            self.link_file(source, target)
+        for entry, target in symlinks:
+            if not self.make_symlink(entry, target, destination):
+                result.skipped.append(entry.path)
+        result.files = len(files) + len(links) + len(symlinks) - len(result.skipped)
+        result.skipped.extend(self.skipped_members(index, members))
+                
+        for entry, target in reversed(plan):
+            if entry.is_dir and entry.mtime:
+                os.utime(target, (entry.mtime, entry.mtime))
+        result.bytes_written = self.done_bytes
+        result.extracted = [Path(target) for entry, target in plan
+                            if os.path.dirname(target) == str(destination)]
+        if progress_callback:
+            progress_callback(self.done_bytes, total_bytes)
+        return result
+        
+    def plan(self, index: ArchiveIndex, destination: Path, members: Optional[List[str]]):
+        """(entry, target path) pairs, refusing any target outside destination
+
+        Member names are already normalized by the index, so only folders
+        that exist as symlinks can lead outside; each parent folder is
+        resolved once.
+        """
+        root = os.path.realpath(destination)
+        inside = {}  # parent folder -> resolves inside destination
+        plan = []
+        seen = set()
+        for inner in members if members is not None else ['']:
+            inner = inner.strip('/')
+            base = inner.rpartition('/')[0]
+            entries = index.walk(inner)
+            if not entries:
+                raise FileNotFoundError(f"No member {inner!r} in {index.archive.name}")
+            for entry in entries:
+                if not entry.path or entry.path in seen:
+                    continue
+                seen.add(entry.path)
+                relative = entry.path[len(base):].lstrip('/') if base else entry.path
+                target = os.path.join(destination, *relative.split('/'))
+                parent = os.path.dirname(target)
+                if parent not in inside:
+                    resolved = os.path.realpath(parent)
+                    inside[parent] = resolved == root or resolved.startswith(root.rstrip(os.sep) + os.sep)
+                if not inside[parent]:
+                    raise UnsafeArchiveError(f"{entry.path} would be written outside {destination}")
+                plan.append((entry, target))
+        return plan
+        
+    def skipped_members(self, index: ArchiveIndex, members: Optional[List[str]]) -> List[str]:
+        """Members the index could not list (devices, fifos, broken hard links) within the selection"""
+        selected = [inner.strip('/') for inner in members] if members is not None else ['']
+        return [name for name in index.skipped
+                if any(not inner or name == inner or name.startswith(inner + '/') for inner in selected)]
+        
+    def link_file(self, source: str, target: str):
+        """Hard link target to an extracted file, copying it where links are not supported"""
+        folder, name = os.path.split(target)
+        temp_path = os.path.join(folder, f".{name}.part")
+        try:
+            try:
+                os.link(source, temp_path)
+            except OSError:
+                shutil.copy2(source, temp_path)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.unlink(temp_path)
+            raise
+            
+    def make_symlink(self, entry: ArchiveEntry, target: str, destination: Path) -> bool:
+        """Create a symlink that resolves inside destination; False if it was skipped"""
+        # Resolved on disk, so links through links created earlier are followed too
+        root = os.path.realpath(destination)
+        resolved = os.path.realpath(os.path.join(os.path.dirname(target), entry.link))
+        inside = resolved == root or resolved.startswith(root.rstrip(os.sep) + os.sep)
+        if os.path.isabs(entry.link) or not inside:
+            return False
+        folder, name = os.path.split(target)
+        temp_path = os.path.join(folder, f".{name}.part")
+        try:
+            if os.path.lexists(temp_path):
+                os.unlink(temp_path)
+            os.symlink(entry.link, temp_path)
+            os.replace(temp_path, target)
+        except OSError:
+            # Creating symlinks needs extra privileges on some systems
+            if os.path.lexists(temp_path):
+                os.unlink(temp_path)
+            return False
+        return True
+        
+    def check_ratio(self, index: ArchiveIndex, total_bytes: int):
+        """Refuse archives whose contents expand beyond max_ratio times their size"""
+        if not self.max_ratio:
+            return
+        archive_size = max(index.archive.stat().st_size, 1)
+        if total_bytes > archive_size * self.max_ratio:
+            raise UnsafeArchiveError(f"{index.archive.name} expands to {total_bytes:,} bytes, more than "
+                                     f"{self.max_ratio:g} times its size")
+            
+    def extract_parallel(self, index: ArchiveIndex, files, cancel_event: threading.Event = None):
+        """Write zip members concurrently, largest first"""
+        files = sorted(files, key=lambda item: item[0].size, reverse=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = []
+            for entry, target in files:
+                futures.append(pool.submit(self.extract_one, index, entry, target, cancel_event))
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                future.result()
+                
+    def extract_one(self, index: ArchiveIndex, entry: ArchiveEntry, target: str,
+                    cancel_event: threading.Event = None):
+        """Open and write a single member"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled("Extraction cancelled")
+        with index.open(entry.path) as member:
+            self.write_member(entry, member, target, cancel_event)
+            
+    def write_member(self, entry: ArchiveEntry, member, target: str, cancel_event: threading.Event = None):
+        """Stream one member to a temporary name, then move it into place"""
+        folder, name = os.path.split(target)
+        temp_path = os.path.join(folder, f".{name}.part")
+        written = 0
+        try:
+            with open(temp_path, 'wb') as out:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise JobCancelled("Extraction cancelled")
+                    chunk = member.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    # Declared sizes were checked against the limit; never trust data past them
+                    if written > entry.size:
+                        raise UnsafeArchiveError(f"{entry.path} is larger than its recorded size")
+                    out.write(chunk)
+                    self.add_progress(len(chunk))
+            if entry.mode and stat.S_IMODE(entry.mode):
+                os.chmod(temp_path, stat.S_IMODE(entry.mode) & 0o777)
+            if entry.mtime:
+                os.utime(temp_path, (entry.mtime, entry.mtime))
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+            
+    def add_progress(self, size: int):
+        """Count written bytes from any worker and forward progress"""
+        with self.lock:
+            self.done_bytes += size
+            if self.progress_callback:
+                self.progress_callback(self.done_bytes, self.total_bytes)
\ No newline at end of file
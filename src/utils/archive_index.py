@@ -0,0 +1,411 @@
+"""
+Archive Index Module
+Browse zip and tar archives as virtual folders from their member index
+"""
+
+import os
+import shutil
+import posixpath
+import tarfile
+import tempfile
+import zipfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .jobs import JobCancelled
+
+ARCHIVE_SUFFIXES = {
+    '.zip': 'zip',
+    '.tar': 'tar',
+    '.tar.gz': 'tar',
+    '.tgz': 'tar',
+    '.tar.bz2': 'tar',
+    '.tbz2': 'tar',
+    '.tar.xz': 'tar',
+    '.txz': 'tar',
+}
+
+def archive_kind(path: Path) -> Optional[str]:
+    """'zip' or 'tar' for names the browser can open, else None"""
+    name = path.name.lower()
+    for suffix, kind in ARCHIVE_SUFFIXES.items():
+        if name.endswith(suffix) and len(name) > len(suffix):
+            return kind
+    return None
+
+def archive_stem(path: Path) -> str:
+    """Archive name without its archive suffix, e.g. 'photos' for photos.tar.gz"""
+    name = path.name
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.lower().endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return path.stem
+
+def is_archive(path: Path) -> bool:
+    """True for an archive file that can be browsed"""
+    return archive_kind(path) is not None and path.is_file()
+
+def split_archive_path(path: Path):
+    """(archive file, inner posix path) when path is an archive or lies inside one, else None"""
+    for candidate in [path, *path.parents]:
+        if archive_kind(candidate) and candidate.is_file():
+            inner = path.relative_to(candidate).as_posix()
+            return candidate, '' if inner == '.' else inner
+    return None
+
+def normalize_member_name(name: str) -> Optional[str]:
+    """Member name as a clean relative posix path, or None if it escapes the archive root"""
+    if '\\' not in name and '//' not in name and '/.' not in name and not name.startswith(('/', '.')):
+        return name.rstrip('/') or None
+    name = posixpath.normpath(name.replace('\\', '/').lstrip('/'))
+    if name in ('', '.') or name == '..' or name.startswith('../'):
+        return None
+    return name
+
+class ArchiveEntry:
+    """A member, or a folder implied by member paths"""
+    __slots__ = ('name', 'path', 'is_dir', 'size', 'compressed_size', 'mtime', 'mode', 'info', 'link')
+    
+    def __init__(self, name: str, path: str, is_dir: bool, size: int = 0, compressed_size: int = 0,
+                 mtime: float = 0.0, mode: int = 0, info=None, link: str = None):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.compressed_size = compressed_size
+        self.mtime = mtime
+        self.mode = mode
+        self.info = info
+        self.link = link  # symlink target as stored in the archive
+
+class ArchiveIndex:
+    def __init__(self, archive: Path, kind: str):
+        self.archive = archive
+        self.kind = kind
+        self.entries: Dict[str, ArchiveEntry] = {'': ArchiveEntry(archive.name, '', True)}
+        self.children: Dict[str, Dict[str, ArchiveEntry]] = {'': {}}
+        self.zip_file = None
+        self.file_count = 0
+        self.skipped: List[str] = []  # members that are neither files, folders nor links
+        # Handles stay open while readers use them, even after close() is requested
+        self.lock = threading.Lock()
+        self.readers = 0
+        self.retired = False
+        self.tar_file = None  # shared tar handle, reused by reads that move forward
+        self.tar_busy = False
+        
+    @classmethod
+    def build(cls, archive: Path, cancel_event: threading.Event = None) -> 'ArchiveIndex':
+        """Read only the zip central directory or the tar headers
+
+        Zip members are listed from the central directory at the end of
+        the file without touching their data. Plain tars are walked by
+        seeking from header to header; compressed tars have to be
+        decompressed once to reach every header. A tar hard link is
+        listed as a file that reads its target's data; devices, fifos
+        and links to missing members are listed in skipped.
+        """
+        kind = archive_kind(archive)
+        if kind is None:
+            raise ValueError(f"Not a supported archive: {archive}")
+        index = cls(archive, kind)
+        if kind == 'zip':
+            index.zip_file = zipfile.ZipFile(archive)
+            mtimes = {}  # members often share timestamps
+            for info in index.zip_file.infolist():
+                mtime = mtimes.get(info.date_time)
+                if mtime is None:
+                    mtime = datetime(*info.date_time).timestamp() if info.date_time[0] >= 1980 else 0.0
+                    mtimes[info.date_time] = mtime
+                index.add(info.filename, info.is_dir(), info.file_size, info.compress_size,
+                          mtime, info.external_attr >> 16, info)
+        else:
+            with tarfile.open(archive, 'r:*') as tar:
+                count = 0
+                while True:
+                    info = tar.next()
+                    if info is None:
+                        break
+                    tar.members = []  # headers are kept in the index, not twice
+                    count += 1
+                    if count % 1000 == 0 and cancel_event is not None and cancel_event.is_set():
+                        raise JobCancelled("Reading archive cancelled")
+                    if info.isfile() or info.isdir():
+                        index.add(info.name, info.isdir(), info.size, info.size, info.mtime, info.mode, info)
+                    elif info.issym():
+                        index.add(info.name, False, 0, 0, info.mtime, info.mode, info, info.linkname)
+                    elif info.islnk():
+                        target = index.entries.get(normalize_member_name(info.linkname) or '')
+                        if target is None or target.is_dir or target.link is not None:
+                            index.skipped.append(info.name)
+                        else:
+                            index.add(info.name, False, target.size, target.size, info.mtime, info.mode,
+                                      target.info)
+                    else:
+                        index.skipped.append(info.name)
+        index.total_folders()
+        return index
+        
+    def add(self, name: str, is_dir: bool, size: int, compressed_size: int, mtime: float, mode: int, info,
+            link: str = None):
+        """Record a member and the folders above it"""
+        path = normalize_member_name(name)
+        if path is None:
+            return
+        parent, _, base = path.rpartition('/')
+        self.ensure_dir(parent)
+        existing = self.entries.get(path)
+        if is_dir:
+            entry = self.ensure_dir(path)
+            entry.mtime = mtime
+            entry.mode = mode
+            return
+        if existing is None:
+            self.file_count += 1  # a later member with the same name replaces the earlier one
+        entry = ArchiveEntry(base, path, False, size, compressed_size, mtime, mode, info, link)
+        self.entries[path] = entry
+        self.children[parent][base] = entry
+        
+    def ensure_dir(self, path: str) -> ArchiveEntry:
+        """Folder entry for path, creating it and its parents as needed"""
+        entry = self.entries.get(path)
+        if entry is not None and entry.is_dir:
+            return entry
+        parent, _, base = path.rpartition('/')
+        self.ensure_dir(parent)
+        entry = ArchiveEntry(base, path, True)
+        self.entries[path] = entry
+        self.children[path] = {}
+        self.children[parent][base] = entry
+        return entry
+        
+    def total_folders(self):
+        """Set each folder's size to the total of the files below it, deepest folders first"""
+        for path in sorted(self.children, key=lambda path: path.count('/') + bool(path), reverse=True):
+            folder = self.entries[path]
+            folder.size = sum(child.size for child in self.children[path].values())
+            
+    def entry(self, inner: str) -> Optional[ArchiveEntry]:
+        """Entry at an inner path ('' is the archive root)"""
+        return self.entries.get(inner.strip('/'))
+        
+    def listdir(self, inner: str = '') -> List[ArchiveEntry]:
+        """Entries directly inside a folder of the archive"""
+        children = self.children.get(inner.strip('/'))
+        if children is None:
+            raise NotADirectoryError(f"No folder {inner!r} in {self.archive.name}")
+        return list(children.values())
+        
+    def walk(self, inner: str) -> List[ArchiveEntry]:
+        """The entry at an inner path and every entry below it"""
+        entry = self.entry(inner)
+        if entry is None:
+            return []
+        entries = [entry]
+        stack = [entry.path] if entry.is_dir else []
+        while stack:
+            for child in self.children[stack.pop()].values():
+                entries.append(child)
+                if child.is_dir:
+                    stack.append(child.path)
+        return entries
+        
+    def resolve_link(self, entry: ArchiveEntry) -> Optional[ArchiveEntry]:
+        """File entry a symlink points to inside the archive, or None if it leads elsewhere"""
+        for _ in range(40):
+            if entry.link is None:
+                return None if entry.is_dir else entry
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(entry.path), entry.link))
+            if entry.link.startswith('/') or target == '..' or target.startswith('../'):
+                return None
+            entry = self.entries.get(target)
+            if entry is None:
+                return None
+        return None
+        
+    @contextmanager
+    def reading(self):
+        """Keep the archive handle open for the duration of a read"""
+        with self.lock:
+            self.readers += 1
+            if self.kind == 'zip' and self.zip_file is None:
+                # Reopened for a reader that still held the index after close()
+                self.zip_file = zipfile.ZipFile(self.archive)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.readers -= 1
+                if self.retired and not self.readers:
+                    self._close_locked()
+                    
+    @contextmanager
+    def open(self, inner: str):
+        """Stream one member's data; safe to use from several threads"""
+        entry = self.entry(inner)
+        if entry is not None and entry.link is not None:
+            entry = self.resolve_link(entry)
+        if entry is None or entry.is_dir:
+            raise FileNotFoundError(f"No file {inner!r} in {self.archive.name}")
+        with self.reading():
+            if self.kind == 'zip':
+                # ZipFile serializes seeks on the shared handle, so members can be read concurrently
+                with self.zip_file.open(entry.info) as member:
+                    yield member
+                return
+            # A compressed tar seeks forward by decompressing from where it
+            # is, so reads share one handle instead of each decompressing
+            # from the start; a read that finds it busy opens its own
+            with self.lock:
+                shared = not self.tar_busy
+                if shared:
+                    self.tar_busy = True
+                    if self.tar_file is None:
+                        self.tar_file = tarfile.open(self.archive, 'r:*')
+                    tar = self.tar_file
+            if not shared:
+                tar = tarfile.open(self.archive, 'r:*')
+            try:
+                member = tar.extractfile(entry.info)
+                try:
+                    yield member
+                finally:
+                    member.close()
+            finally:
+                if shared:
+                    with self.lock:
+                        self.tar_busy = False
+                else:
+                    tar.close()
+                    
+    def stream_members(self, entries: List[ArchiveEntry]):
+        """Yield (entry, file object) for file entries in archive order
+
+        A compressed tar can only be read front to back, so its members
+        are taken from one pass over the archive rather than reopened
+        and decompressed up to each member in turn.
+        """
+        if self.kind == 'zip':
+            with self.reading():
+                for entry in entries:
+                    with self.zip_file.open(entry.info) as member:
+                        yield entry, member
+            return
+        with tarfile.open(self.archive, 'r:*') as tar:
+            for entry in sorted(entries, key=lambda entry: entry.info.offset_data):
+                member = tar.extractfile(entry.info)
+                try:
+                    yield entry, member
+                finally:
+                    member.close()
+                    
+    def read(self, inner: str, limit: int = -1) -> bytes:
+        """Up to limit bytes from the start of a member"""
+        with self.open(inner) as member:
+            return member.read(limit)
+            
+    def copy_member(self, inner: str, target: Path, cancel_event: threading.Event = None,
+                    chunk_size: int = 1024 * 1024):
+        """Stream a member into a file on disk"""
+        with self.open(inner) as member, open(target, 'wb') as out:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled("Copy from archive cancelled")
+                chunk = member.read(chunk_size)
+                if not chunk:
+                    break
+                out.write(chunk)
+        entry = self.entry(inner)
+        if entry.mtime:
+            os.utime(target, (entry.mtime, entry.mtime))
+            
+    def close(self):
+        """Release the archive file handles now, or when the last reader finishes"""
+        with self.lock:
+            self.retired = True
+            if not self.readers:
+                self._close_locked()
+                
+    def _close_locked(self):
+        """Close the handles; caller holds self.lock and no reader is active"""
+        if self.zip_file is not None:
+            self.zip_file.close()
+            self.zip_file = None
+        if self.tar_file is not None:
+            self.tar_file.close()
+            self.tar_file = None
+
+class ArchiveIndexCache:
+    def __init__(self, max_archives: int = 8):
+        """Indexes of recently browsed archives, rebuilt when the archive changes"""
+        self.max_archives = max_archives
+        self.indexes = OrderedDict()  # archive path -> (size, mtime_ns, ArchiveIndex)
+        self.lock = threading.Lock()
+        self.temp_dir = None
+        
+    def cached(self, archive: Path) -> Optional[ArchiveIndex]:
+        """Index of an unchanged archive, without reading it"""
+        try:
+            st = archive.stat()
+        except OSError:
+            return None
+        with self.lock:
+            cached = self.indexes.get(archive)
+            if cached is None or cached[:2] != (st.st_size, st.st_mtime_ns):
+                return None
+            self.indexes.move_to_end(archive)
+            return cached[2]
+            
+    def get(self, archive: Path, cancel_event: threading.Event = None) -> ArchiveIndex:
+        """Index of archive, reading it if it is new or has changed"""
+        index = self.cached(archive)
+        if index is not None:
+            return index
+        st = archive.stat()
+        index = ArchiveIndex.build(archive, cancel_event)
+        with self.lock:
+            previous = self.indexes.pop(archive, None)
+            if previous is not None:
+                previous[2].close()
+            self.indexes[archive] = (st.st_size, st.st_mtime_ns, index)
+            while len(self.indexes) > self.max_archives:
+                self.indexes.popitem(last=False)[1][2].close()
+        return index
+        
+    def lookup(self, path: Path):
+        """(index, entry) for a path inside an already indexed archive, else None"""
+        location = split_archive_path(path)
+        if location is None:
+            return None
+        index = self.cached(location[0])
+        if index is None:
+            return None
+        entry = index.entry(location[1])
+        return (index, entry) if entry is not None else None
+        
+    def stage_member(self, path: Path, cancel_event: threading.Event = None) -> Path:
+        """Copy one member to a private temp folder so other applications can open it"""
+        archive, inner = split_archive_path(path)
+        index = self.get(archive, cancel_event)
+        with self.lock:
+            if self.temp_dir is None:
+                self.temp_dir = Path(tempfile.mkdtemp(prefix='file-manager-archive-'))
+        # A private folder per member, so concurrent opens never share a name
+        folder = Path(tempfile.mkdtemp(dir=self.temp_dir))
+        target = folder / posixpath.basename(inner)
+        index.copy_member(inner, target, cancel_event)
+        return target
+        
+    def close(self):
+        """Close archive handles and remove staged members"""
+        with self.lock:
+            for _, _, index in self.indexes.values():
+                index.close()
+            self.indexes.clear()
+            if self.temp_dir is not None:
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+                self.temp_dir = None
\ No newline at end of file
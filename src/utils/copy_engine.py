@@ -0,0 +1,399 @@
+"""
+Copy Engine Module
+Chunked, throttled file copying and moving used by paste and background transfers
+"""
+
+import errno
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import List
+
+from .throttle import TokenBucket, BandwidthLimiter
+from .jobs import BackgroundJob, JobCancelled
+from .journal import OperationJournal, CHECKPOINT_BYTES
+from .hashing import new_hasher, hash_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl that makes the destination share the source's extents (btrfs, XFS)
+FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+
+def fsync_directory(path: Path):
+    """Persist a directory's entries; a no-op where directories can't be opened"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class CopyEntry:
+    """One item of a copy plan"""
+    __slots__ = ('kind', 'source', 'destination', 'size')
+    
+    def __init__(self, kind, source, destination, size=0):
+        self.kind = kind  # 'dir', 'file' or 'link'
+        self.source = source
+        self.destination = destination
+        self.size = size
+
+class CopyResult:
+    """Outcome of a copy: byte count and, when verifying, per-file checksums"""
+    def __init__(self, algorithm: str = None):
+        self.algorithm = algorithm
+        self.bytes_copied = 0
+        self.reflinked = 0
+        self.checksums = {}   # destination -> source digest
+        self.mismatches = []  # destinations whose re-read digest differed
+        
+    @property
+    def verified(self) -> bool:
+        """True when verification ran and every file matched"""
+        return self.algorithm is not None and not self.mismatches
+
+class CopyEngine:
+    def __init__(self, chunk_size: int = 1024 * 1024, global_rate_limit: int = 0,
+                 use_reflinks: bool = True, hash_cache=None):
+        self.chunk_size = chunk_size
+        self.hash_cache = hash_cache
+        self.use_reflinks = use_reflinks and fcntl is not None
+        # Shared by every job so the sum of all transfers stays under the cap
+        self.global_bucket = TokenBucket(global_rate_limit)
+        
+    def set_global_rate_limit(self, rate: int):
+        """Set the global cap in bytes per second (0 = unlimited)"""
+        self.global_bucket.set_rate(rate)
+        
+    def plan(self, source_paths: List[Path], destination: Path,
+             resume: bool = False) -> List[CopyEntry]:
+        """Build the list of directories, files and links to copy
+
+        With resume=True existing destination folders are expected, since
+        an earlier run of the same batch created them.
+        """
+        entries = []
+        for source_path in source_paths:
+            source_path = Path(source_path)
+            dest_path = Path(destination) / source_path.name
+            if source_path.is_dir() and not source_path.is_symlink():
+                if dest_path.exists() and not resume:
+                    raise FileExistsError(f"Destination already exists: {dest_path}")
+                self._plan_directory(source_path, dest_path, entries)
+            elif source_path.is_symlink():
+                entries.append(CopyEntry('link', source_path, dest_path))
+            else:
+                if dest_path.exists() and os.path.samefile(source_path, dest_path):
+                    raise shutil.SameFileError(f"{source_path} and {dest_path} are the same file")
+                entries.append(CopyEntry('file', source_path, dest_path, source_path.stat().st_size))
+        return entries
+        
+    def _plan_directory(self, source: Path, destination: Path, entries: List[CopyEntry]):
+        """Add a directory tree to the plan with one scandir pass per folder"""
+        entries.append(CopyEntry('dir', source, destination))
+        with os.scandir(source) as it:
+            for entry in it:
+                src = Path(entry.path)
+                dst = destination / entry.name
+                if entry.is_symlink():
+                    entries.append(CopyEntry('link', src, dst))
+                elif entry.is_dir():
+                    self._plan_directory(src, dst, entries)
+                else:
+                    entries.append(CopyEntry('file', src, dst, entry.stat().st_size))
+                    
+    def copy(self, source_paths: List[Path], destination: Path, rate_limit: int = 0,
+             progress_callback=None, cancel_event: threading.Event = None,
+             journal: OperationJournal = None, resume: bool = False,
+             verify: str = None) -> CopyResult:
+        """Copy sources into destination
+
+        rate_limit is a per-job cap in bytes per second on top of the
+        global cap. Raises JobCancelled if cancel_event is set. When a
+        journal is given every finished file (and every CHECKPOINT_BYTES of
+        a large one) is recorded, and with resume=True files the journal
+        already vouches for are skipped.
+
+        verify names a hash algorithm ('blake2b' or 'sha256'). The source
+        is hashed from the same reads that feed the copy, then only the
+        destination is read back; reflinked files share the source's
+        blocks and are not read back at all.
+        """
+        entries = self.plan(source_paths, destination, resume)
+        return self.copy_entries(entries, rate_limit, progress_callback, cancel_event,
+                                 journal, resume, verify)
+        
+    def copy_entries(self, entries: List[CopyEntry], rate_limit: int = 0,
+                     progress_callback=None, cancel_event: threading.Event = None,
+                     journal: OperationJournal = None, resume: bool = False,
+                     verify: str = None, durable: bool = False) -> CopyResult:
+        """Execute a copy plan; durable=True fsyncs every file and folder written"""
+        limiter = BandwidthLimiter(TokenBucket(rate_limit), self.global_bucket)
+        result = CopyResult(verify)
+        total_bytes = sum(entry.size for entry in entries)
+        done_bytes = 0
+        copied_dirs = []
+        if journal is not None and not journal.planned:
+            journal.record_plan()
+            
+        def on_bytes(count):
+            nonlocal done_bytes
+            done_bytes += count
+            result.bytes_copied += count
+            if progress_callback:
+                progress_callback(done_bytes, total_bytes)
+                
+        for entry in entries:
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled("Copy cancelled")
+            if entry.kind == 'dir':
+                entry.destination.mkdir(parents=True, exist_ok=True)
+                copied_dirs.append(entry)
+            elif entry.kind == 'link':
+                if resume and os.path.lexists(entry.destination):
+                    continue
+                os.symlink(os.readlink(entry.source), entry.destination)
+            else:
+                source_stat = os.stat(entry.source)
+                offset = 0
+                if resume and journal is not None:
+                    if journal.is_complete(entry.destination, source_stat):
+                        done_bytes += entry.size
+                        if verify:
+                            # Still listed in the checksums of the whole batch
+                            result.checksums[entry.destination] = self.completed_digest(
+                                entry.destination, verify, cancel_event)
+                        continue
+                    # A verified copy needs the whole source stream, so it
+                    # restarts partially copied files from the beginning
+                    if not verify:
+                        offset = journal.resume_offset(entry.destination, source_stat)
+                        done_bytes += offset
+                        
+                checkpoint = None
+                if journal is not None:
+                    def checkpoint(position, entry=entry, source_stat=source_stat):
+                        journal.record_chunk(entry.destination, position, source_stat)
+                        
+                hasher = new_hasher(verify) if verify else None
+                reflinked = self.copy_file(entry.source, entry.destination, limiter, cancel_event,
+                                           on_bytes, offset=offset, checkpoint=checkpoint,
+                                           hasher=hasher, durable=durable)
+                if reflinked:
+                    result.reflinked += 1
+                if hasher is not None:
+                    digest = hasher.hexdigest()
+                    result.checksums[entry.destination] = digest
+                    if not reflinked and self.read_back(entry.destination, verify, cancel_event) != digest:
+                        result.mismatches.append(entry.destination)
+                        continue
+                    self.cache_digests(entry, source_stat, verify, digest)
+                if journal is not None:
+                    journal.record_file(entry.destination, source_stat)
+                    
+        # Directory times are restored last, after their contents were written
+        for entry in reversed(copied_dirs):
+            try:
+                shutil.copystat(entry.source, entry.destination)
+            except OSError:
+                pass
+            if durable:
+                fsync_directory(entry.destination)
+                
+        if self.hash_cache is not None and result.checksums:
+            self.hash_cache.flush()
+        if progress_callback:
+            progress_callback(total_bytes, total_bytes)
+        return result
+        
+    def copy_file(self, source: Path, destination: Path, limiter: BandwidthLimiter = None,
+                  cancel_event: threading.Event = None, on_bytes=None,
+                  offset: int = 0, checkpoint=None, hasher=None, durable: bool = False) -> bool:
+        """Copy one file in chunks, waiting on the limiter before every write
+
+        A non-zero offset continues an interrupted copy: the destination is
+        cut back to offset and both files are read/written from there.
+        checkpoint(position) is called every CHECKPOINT_BYTES and hasher,
+        if given, is fed every byte read from the source. Returns True
+        when the file was cloned with a reflink instead of copied.
+        """
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        mode = 'r+b' if offset else 'wb'
+        reflinked = False
+        with open(source, 'rb', buffering=0) as src, open(destination, mode) as dst:
+            if not offset and self.reflink(src, dst):
+                reflinked = True
+                if on_bytes:
+                    on_bytes(os.fstat(src.fileno()).st_size)
+                if hasher is None:
+                    src.seek(0, os.SEEK_END)
+            if offset:
+                dst.truncate(offset)
+                dst.seek(offset)
+                src.seek(offset)
+            position = offset
+            next_checkpoint = offset + CHECKPOINT_BYTES
+            while True:
+                count = src.readinto(buffer)
+                if not count:
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled("Copy cancelled")
+                if limiter is not None and not limiter.consume(count, cancel_event):
+                    raise JobCancelled("Copy cancelled")
+                if hasher is not None:
+                    hasher.update(view[:count])
+                if reflinked:
+                    # Only hashing the source; the data is already shared
+                    continue
+                dst.write(view[:count])
+                position += count
+                if on_bytes:
+                    on_bytes(count)
+                if checkpoint and position >= next_checkpoint:
+                    # Data must reach the disk before the journal claims it
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                    checkpoint(position)
+                    next_checkpoint = position + CHECKPOINT_BYTES
+            if durable or (hasher is not None and not reflinked):
+                dst.flush()
+                os.fsync(dst.fileno())
+            if hasher is not None and not reflinked and hasattr(os, 'posix_fadvise'):
+                # Make the read-back come from the device, not the page cache
+                os.posix_fadvise(dst.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        shutil.copystat(source, destination)
+        return reflinked
+        
+    def move(self, source_paths: List[Path], destination: Path, rate_limit: int = 0,
+             progress_callback=None, cancel_event: threading.Event = None,
+             journal: OperationJournal = None, resume: bool = False,
+             verify: str = None) -> CopyResult:
+        """Move sources into destination
+
+        Sources on the destination's device are renamed in one pass with no
+        data copied. The rest are streamed through copy_entries() with every
+        file fsynced (and verified if requested), and each source is only
+        deleted once its whole copy is durable.
+        """
+        destination = Path(destination)
+        dest_device = os.stat(destination).st_dev
+        cross_device = []
+        
+        for source_path in source_paths:
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled("Move cancelled")
+            source_path = Path(source_path)
+            # Items moved before an interruption are already gone
+            if not os.path.lexists(source_path):
+                continue
+            dest_path = destination / source_path.name
+            if os.path.lexists(dest_path) and not resume:
+                raise FileExistsError(f"Destination already exists: {dest_path}")
+            if os.lstat(source_path).st_dev != dest_device:
+                cross_device.append(source_path)
+                continue
+            try:
+                os.rename(source_path, dest_path)
+            except OSError as e:
+                # Same st_dev does not always mean one filesystem (bind
+                # mounts, btrfs subvolumes); fall back to copying
+                if e.errno != errno.EXDEV:
+                    raise
+                cross_device.append(source_path)
+                
+        result = CopyResult(verify)
+        if not cross_device:
+            if progress_callback:
+                progress_callback(1, 1)
+            return result
+            
+        entries = self.plan(cross_device, destination, resume)
+        try:
+            result = self.copy_entries(entries, rate_limit, progress_callback, cancel_event,
+                                       journal, resume, verify, durable=True)
+        except JobCancelled:
+            # No source was deleted yet; remove the partial copies so a retry
+            # does not stop on its own half-written destination
+            for source_path in cross_device:
+                dest_path = destination / source_path.name
+                if dest_path.is_dir() and not dest_path.is_symlink():
+                    shutil.rmtree(dest_path, ignore_errors=True)
+                else:
+                    try:
+                        os.unlink(dest_path)
+                    except OSError:
+                        pass
+            raise
+        fsync_directory(destination)
+        
+        failed = {Path(path) for path in result.mismatches}
+        for source_path in cross_device:
+            dest_path = destination / source_path.name
+            if any(path == dest_path or dest_path in path.parents for path in failed):
+                continue
+            if source_path.is_dir() and not source_path.is_symlink():
+                shutil.rmtree(source_path)
+            else:
+                os.unlink(source_path)
+        return result
+        
+    def reflink(self, src, dst) -> bool:
+        """Clone src into dst with FICLONE; False if unsupported here"""
+        if not self.use_reflinks:
+            return False
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            # EXDEV, EOPNOTSUPP, EINVAL: different filesystems or no support
+            return False
+            
+    def read_back(self, destination: Path, algorithm: str, cancel_event=None) -> str:
+        """Hash the written destination for comparison with the source digest"""
+        # Always read the disk: a cached digest would not prove the write
+        return hash_file(destination, algorithm, self.chunk_size, cancel_event)
+        
+    def completed_digest(self, destination: Path, algorithm: str, cancel_event=None) -> str:
+        """Digest of a file finished by an earlier run, from the hash cache when it is unchanged"""
+        if self.hash_cache is not None:
+            digest = self.hash_cache.hash_file(destination, algorithm, self.chunk_size, cancel_event)
+        else:
+            digest = hash_file(destination, algorithm, self.chunk_size, cancel_event)
+        if digest is None:
+            raise JobCancelled("Copy cancelled")
+        return digest
+        
+    def cache_digests(self, entry: CopyEntry, source_stat: os.stat_result,
+                      algorithm: str, digest: str):
+        """Store a verified digest for both source and copy so later scans skip them"""
+        if self.hash_cache is None:
+            return
+        try:
+            current = os.stat(entry.source)
+            if (current.st_mtime_ns, current.st_size) == (source_stat.st_mtime_ns, source_stat.st_size):
+                self.hash_cache.put(source_stat, algorithm, digest, entry.source)
+            self.hash_cache.put(os.stat(entry.destination), algorithm, digest, entry.destination)
+        except OSError:
+            pass
+            
+    def start_copy(self, source_paths: List[Path], destination: Path, rate_limit: int = 0,
+                   low_priority: bool = True, progress_callback=None,
+                   done_callback=None) -> BackgroundJob:
+        """Run copy() as a background job"""
+        def run(job):
+            return self.copy(source_paths, destination, rate_limit,
+                             progress_callback=job.report, cancel_event=job.cancel_event)
+            
+        job = BackgroundJob("copy", run, low_priority=low_priority,
+                            progress_callback=progress_callback, done_callback=done_callback)
+        return job.start()
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Dedupe Module
+Replaces confirmed duplicate files with hardlinks or reflinks to one kept copy
+"""
+
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import List
+
+from .jobs import JobCancelled
+
+DEDUPE_MODES = ('auto', 'reflink', 'hardlink')
+
+class DedupeResult:
+    """Outcome of a dedupe run"""
+    def __init__(self):
+        self.linked = 0
+        self.reflinked = 0
+        self.reclaimed_bytes = 0
+        self.skipped = []  # (path, reason)
+
+class Deduplicator:
+    def __init__(self, copy_engine, mode: str = 'auto', chunk_size: int = 1024 * 1024):
+        """mode is 'reflink', 'hardlink', or 'auto' (reflink, else hardlink)"""
+        if mode not in DEDUPE_MODES:
+            raise ValueError(f"Unknown dedupe mode: {mode}")
+        self.copy_engine = copy_engine
+        self.mode = mode
+        self.chunk_size = chunk_size
+        
+    def dedupe(self, groups: List[List[Path]], progress_callback=None,
+               cancel_event: threading.Event = None) -> DedupeResult:
+        """Link every duplicate of each group to the group's oldest file"""
+        result = DedupeResult()
+        total = sum(len(paths) - 1 for paths in groups)
+        done = 0
+        for paths in groups:
+            try:
+                keeper = min(paths, key=lambda p: os.stat(p).st_mtime_ns)
+            except OSError as e:
+                result.skipped.extend((path, str(e)) for path in paths)
+                continue
+            for path in paths:
+                if path == keeper:
+                    continue
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled("Dedupe cancelled")
+                try:
+                    self.replace(keeper, path, result, cancel_event)
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    result.skipped.append((path, str(e)))
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total)
+        return result
+        
+    def replace(self, keeper: Path, duplicate: Path, result: DedupeResult,
+                cancel_event: threading.Event = None):
+        """Swap duplicate for a link to keeper via a temporary name and rename"""
+        keeper_stat = os.stat(keeper)
+        duplicate_stat = os.lstat(duplicate)
+        if (keeper_stat.st_dev, keeper_stat.st_ino) == (duplicate_stat.st_dev, duplicate_stat.st_ino):
+            result.skipped.append((duplicate, "already linked"))
+            return
+        if keeper_stat.st_dev != duplicate_stat.st_dev:
+            result.skipped.append((duplicate, "on a different filesystem"))
+            return
+            
+        # Hashes may be stale or cached; compare the actual bytes right before linking
+        if not self.same_content(keeper, duplicate, cancel_event):
+            result.skipped.append((duplicate, "content changed"))
+            return
+            
+        temp_path = duplicate.with_name(f".{duplicate.name}.dedupe-{uuid.uuid4().hex[:8]}")
+        reflinked = False
+        try:
+            if self.mode != 'hardlink':
+                reflinked = self.clone(keeper, temp_path)
+                if reflinked:
+                    shutil.copystat(duplicate, temp_path)
+            if not reflinked:
+                if self.mode == 'reflink':
+                    result.skipped.append((duplicate, "reflinks not supported"))
+                    return
+                os.link(keeper, temp_path)
+                
+            # Don't clobber a file that was modified while it was compared
+            current = os.lstat(duplicate)
+            unchanged = (current.st_ino, current.st_size, current.st_mtime_ns) == (
+                duplicate_stat.st_ino, duplicate_stat.st_size, duplicate_stat.st_mtime_ns)
+            if not unchanged:
+                result.skipped.append((duplicate, "modified during dedupe"))
+                return
+            os.replace(temp_path, duplicate)
+        finally:
+            if os.path.lexists(temp_path):
+                os.unlink(temp_path)
+                
+        if reflinked:
+            result.reflinked += 1
+        else:
+            result.linked += 1
+        # Data of a file with other hardlinks stays allocated after the swap
+        if duplicate_stat.st_nlink == 1:
+            result.reclaimed_bytes += duplicate_stat.st_size
+            
+    def clone(self, source: Path, destination: Path) -> bool:
+        """Create destination as a reflink of source; False (and no file) if unsupported"""
+        with open(source, 'rb') as src, open(destination, 'xb') as dst:
+            cloned = self.copy_engine.reflink(src, dst)
+        if not cloned:
+            os.unlink(destination)
+        return cloned
+        
+    def same_content(self, first: Path, second: Path,
+                     cancel_event: threading.Event = None) -> bool:
+        """Compare two files byte for byte"""
+        if os.path.getsize(first) != os.path.getsize(second):
+            return False
+        buffer_a = bytearray(self.chunk_size)
+        buffer_b = bytearray(self.chunk_size)
+        view_a = memoryview(buffer_a)
+        view_b = memoryview(buffer_b)
+        # Buffered readers fill the whole buffer until EOF, so chunks line up
+        with open(first, 'rb') as a, open(second, 'rb') as b:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled("Dedupe cancelled")
+                count_a = a.readinto(buffer_a)
+                count_b = b.readinto(buffer_b)
+                if count_a != count_b or view_a[:count_a] != view_b[:count_b]:
+                    return False
+                if not count_a:
+                    return True
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Directory Size Module
+Parallel scandir-based recursive sizes with memoized per-directory subtotals
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .jobs import JobCancelled
+
+# Least recently used directory totals beyond this many are forgotten
+MEMO_MAX_ENTRIES = 100000
+
+class DirectoryTotal:
+    """Recursive size, file count and folder count of one directory"""
+    __slots__ = ('size', 'files', 'dirs', 'linked', 'subdirs', 'mtime_ns')
+    
+    def __init__(self, size: int = 0, files: int = 0, dirs: int = 0, linked: Dict = None):
+        self.size = size
+        self.files = files
+        self.dirs = dirs
+        self.subdirs = []  # paths of the immediate subdirectories
+        self.mtime_ns = None  # the directory's own mtime when it was read
+        # (st_dev, st_ino) -> [size, st_nlink, links seen] for hardlinked
+        # files that may also have names outside this directory
+        self.linked = linked if linked is not None else {}
+        
+    def add(self, child: 'DirectoryTotal'):
+        """Fold a subdirectory's total in, counting shared inodes once"""
+        self.size += child.size
+        self.files += child.files
+        self.dirs += child.dirs + 1
+        for inode, (size, nlink, seen) in child.linked.items():
+            entry = self.linked.get(inode)
+            if entry is None:
+                self.linked[inode] = [size, nlink, seen]
+            else:
+                self.size -= size
+                self.files -= 1
+                entry[2] += seen
+                
+    def settle(self):
+        """Forget inodes whose every link has been seen below this directory"""
+        self.linked = {inode: entry for inode, entry in self.linked.items() if entry[2] < entry[1]}
+
+class SizeEngine:
+    def __init__(self, workers: int = None, cache=None, memo_entries: int = MEMO_MAX_ENTRIES):
+        """cache is an optional DirSizeCache that persists scans across sessions"""
+        # scandir and stat release the GIL, so threads overlap filesystem latency
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.cache = cache
+        self.memo = OrderedDict()  # directory path -> DirectoryTotal, least recently used first
+        self.memo_entries = memo_entries
+        self.lock = threading.Lock()
+        
+    def cached(self, path) -> DirectoryTotal:
+        """Memoized total for path, or None"""
+        path = os.path.abspath(path)
+        with self.lock:
+            total = self.memo.get(path)
+            if total is not None:
+                self.memo.move_to_end(path)
+            return total
+            
+    def invalidate(self, path, descendants: bool = True, stored: bool = False):
+        """Drop memoized totals of path, its ancestors and (optionally) everything below it
+
+        With stored, the persisted rows of path and everything below it
+        are dropped too, so files rewritten in place are measured again.
+        """
+        path = os.path.abspath(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        if stored and self.cache is not None:
+            self.cache.remove_tree(path)
+        with self.lock:
+            self.memo.pop(path, None)
+            if descendants:
+                for key in [key for key in self.memo if key.startswith(prefix)]:
+                    del self.memo[key]
+            parent = os.path.dirname(path)
+            while parent and parent != path:
+                self.memo.pop(parent, None)
+                path, parent = parent, os.path.dirname(parent)
+                
+    def clear(self, stored: bool = False):
+        """Drop every memoized total, and with stored every persisted row"""
+        with self.lock:
+            self.memo.clear()
+        if stored and self.cache is not None:
+            self.cache.clear()
+            
+    def directory_size(self, path: Path, progress_callback=None,
+                       cancel_event: threading.Event = None) -> DirectoryTotal:
+        """Total size of a directory tree, scanning directories in parallel
+
+        Symlinks are not followed and hardlinked files are counted once.
+        progress_callback(directories scanned, 0) is called as scanning
+        proceeds. Subtotals of every directory scanned are memoized, so
+        later queries for the tree or any folder inside it only cost one
+        lstat per directory to confirm nothing changed.
+        """
+        root = os.path.abspath(path)
+        fresh = self.fresh_totals(root)
+        if root in fresh:
+            return fresh[root]
+            
+        # With a persistent cache, directories whose mtime is unchanged are
+        # answered from their stored row with one stat instead of a scandir
+        known = self.cache.load_tree(root) if self.cache is not None else {}
+        records = {}  # path -> (own files total, subdirectories)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self.load_directory, root, known): root}
+            while pending:
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise JobCancelled("Size calculation cancelled")
+                for future in done:
+                    directory = pending.pop(future)
+                    own, subdirs = future.result()
+                    records[directory] = (own, subdirs)
+                    for subdir in subdirs:
+                        if subdir not in fresh:
+                            pending[pool.submit(self.load_directory, subdir, known)] = subdir
+                if progress_callback and done:
+                    progress_callback(len(records), 0)
+                    
+        # Roll subtotals up, deepest directories first
+        totals = {}
+        for directory in sorted(records, key=lambda d: d.count(os.sep), reverse=True):
+            own, subdirs = records[directory]
+            own.subdirs = subdirs
+            for subdir in subdirs:
+                child = totals.get(subdir) or fresh.get(subdir)
+                if child is not None:
+                    own.add(child)
+            own.settle()
+            totals[directory] = own
+            with self.lock:
+                self.memo[directory] = own
+                self.memo.move_to_end(directory)
+                while len(self.memo) > self.memo_entries:
+                    self.memo.popitem(last=False)
+        if self.cache is not None:
+            self.cache.flush()
+        return totals[root]
+        
+    def fresh_totals(self, root: str) -> Dict[str, DirectoryTotal]:
+        """Memoized totals under root whose whole subtree is unchanged, checked with one lstat per directory
+
+        Like the persistent cache this trusts directory mtimes, so it sees
+        entries added, removed or renamed but not files rewritten in place.
+        """
+        visited = []  # parents before their subdirectories
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            total = self.cached(directory)
+            if total is None:
+                continue
+            try:
+                if os.lstat(directory).st_mtime_ns != total.mtime_ns:
+                    continue
+            except OSError:
+                continue
+            visited.append((directory, total))
+            stack.extend(total.subdirs)
+        fresh = {}
+        for directory, total in reversed(visited):
+            if all(subdir in fresh for subdir in total.subdirs):
+                fresh[directory] = total
+        return fresh
+        
+    def load_directory(self, directory: str, known: Dict) -> Tuple[DirectoryTotal, List[str]]:
+        """Own files total and subdirectories, from the cache if the directory is unchanged
+
+        Only adding, removing or renaming entries updates a directory's
+        mtime, so a file rewritten in place keeps its stale cached size
+        until its folder changes or its rows are dropped by a rescan.
+        """
+        if self.cache is None:
+            return self.scan_directory(directory)
+        try:
+            dir_stat = os.lstat(directory)
+        except OSError:
+            return self.scan_directory(directory)
+        stored = known.get(directory)
+        if stored is not None and stored.matches(dir_stat):
+            with self.lock:
+                self.cache.hits += 1
+            linked = {inode: list(entry) for inode, entry in stored.linked.items()}
+            total = DirectoryTotal(stored.size, stored.files, linked=linked)
+            total.mtime_ns = dir_stat.st_mtime_ns
+            return total, [os.path.join(directory, name) for name in stored.subdirs]
+            
+        with self.lock:
+            self.cache.misses += 1
+        total, subdirs = self.scan_directory(directory, dir_stat)
+        names = [os.path.basename(subdir) for subdir in subdirs]
+        self.cache.put(directory, dir_stat, total.size, total.files, names, total.linked)
+        if stored is not None:
+            for name in set(stored.subdirs) - set(names):
+                self.cache.remove_tree(os.path.join(directory, name))
+        # Totals memoized for folders above this one no longer add up
+        self.invalidate(directory, descendants=False)
+        return total, subdirs
+        
+    def scan_directory(self, directory: str, dir_stat: os.stat_result = None) -> Tuple[DirectoryTotal, List[str]]:
+        """Sum the files directly in directory and list its subdirectories"""
+        total = DirectoryTotal()
+        subdirs = []
+        try:
+            # Taken before reading, so a change made during the scan shows as stale
+            total.mtime_ns = (dir_stat or os.lstat(directory)).st_mtime_ns
+        except OSError:
+            pass
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if st.st_nlink > 1 and not entry.is_symlink():
+                        inode = (st.st_dev, st.st_ino)
+                        entry_links = total.linked.get(inode)
+                        if entry_links is not None:
+                            entry_links[2] += 1
+                            continue
+                        total.linked[inode] = [st.st_size, st.st_nlink, 1]
+                    total.size += st.st_size
+                    total.files += 1
+        except OSError:
+            pass
+        return total, subdirs
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Directory Size Cache Module
+Persistent SQLite store of per-directory file totals validated by directory mtime
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+DIR_SIZE_CACHE_FILE = Path("config/dir_sizes.db")
+
+class CachedDirectory:
+    """Stored scan of one directory: its own files and its subdirectory names"""
+    __slots__ = ('dev', 'ino', 'mtime_ns', 'size', 'files', 'subdirs', 'linked')
+    
+    def __init__(self, dev, ino, mtime_ns, size, files, subdirs, linked):
+        self.dev = dev
+        self.ino = ino
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.files = files
+        self.subdirs = subdirs
+        self.linked = linked
+        
+    def matches(self, dir_stat: os.stat_result) -> bool:
+        """True if the directory is the same inode and no entry was added, removed or renamed"""
+        return (self.dev, self.ino, self.mtime_ns) == (dir_stat.st_dev, dir_stat.st_ino, dir_stat.st_mtime_ns)
+
+class DirSizeCache:
+    def __init__(self, db_path: Path = DIR_SIZE_CACHE_FILE, batch_size: int = 500):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = []
+        self.removed = []
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+        self.open()
+        
+    def open(self):
+        """Open (creating if needed) the cache database"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    files INTEGER NOT NULL,
+                    subdirs TEXT NOT NULL,
+                    linked TEXT
+                ) WITHOUT ROWID
+            """)
+            self.connection.commit()
+        except sqlite3.Error as e:
+            print(f"Directory size cache unavailable: {e}")
+            self.connection = None
+            
+    def load_tree(self, root: str) -> Dict[str, CachedDirectory]:
+        """All stored directories at or below root, keyed by path"""
+        self.flush()
+        prefix = root.rstrip(os.sep) + os.sep
+        tree = {}
+        with self.lock:
+            if self.connection is None:
+                return tree
+            rows = self.connection.execute(
+                "SELECT path, dev, ino, mtime_ns, size, files, subdirs, linked FROM directories "
+                "WHERE path = ? OR substr(path, 1, ?) = ?", (root, len(prefix), prefix))
+            for path, dev, ino, mtime_ns, size, files, subdirs, linked in rows:
+                linked_map = {}
+                for link_dev, link_ino, link_size, nlink, seen in json.loads(linked or '[]'):
+                    linked_map[(link_dev, link_ino)] = [link_size, nlink, seen]
+                tree[path] = CachedDirectory(dev, ino, mtime_ns, size, files,
+                                             json.loads(subdirs), linked_map)
+        return tree
+        
+    def put(self, path: str, dir_stat: os.stat_result, size: int, files: int,
+            subdirs: List[str], linked: Dict):
+        """Queue a directory's scan result; rows are written in batches"""
+        try:
+            path.encode('utf-8')
+        except UnicodeEncodeError:
+            # Undecodable names can't be stored as text; they are rescanned each time
+            return
+        linked_rows = [[dev, ino, link_size, nlink, seen]
+                       for (dev, ino), (link_size, nlink, seen) in linked.items()]
+        row = (path, dir_stat.st_dev, dir_stat.st_ino, dir_stat.st_mtime_ns, size, files,
+               json.dumps(subdirs), json.dumps(linked_rows) if linked_rows else None)
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.batch_size:
+                self._flush_locked()
+                
+    def remove_tree(self, path: str):
+        """Queue removal of a directory and everything below it"""
+        prefix = path.rstrip(os.sep) + os.sep
+        with self.lock:
+            # Rows queued earlier would otherwise be written back after the delete
+            self.pending = [row for row in self.pending if row[0] != path and not row[0].startswith(prefix)]
+            self.removed.append(path)
+            
+    def flush(self):
+        """Write queued rows"""
+        with self.lock:
+            self._flush_locked()
+            
+    def _flush_locked(self):
+        """Write queued rows; caller holds self.lock"""
+        if self.connection is None or not (self.pending or self.removed):
+            return
+        try:
+            for path in self.removed:
+                prefix = path.rstrip(os.sep) + os.sep
+                self.connection.execute(
+                    "DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(prefix), prefix))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO directories "
+                "(path, dev, ino, mtime_ns, size, files, subdirs, linked) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+            self.connection.commit()
+        except sqlite3.Error as e:
+            print(f"Directory size cache write error: {e}")
+        self.pending = []
+        self.removed = []
+        
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of directories answered without rescanning"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+        
+    def clear(self):
+        """Forget every stored directory"""
+        with self.lock:
+            self.pending = []
+            self.removed = []
+            if self.connection is not None:
+                self.connection.execute("DELETE FROM directories")
+                self.connection.commit()
+                
+    def close(self):
+        """Flush pending rows and close the database"""
+        with self.lock:
+            if self.connection is None:
+                return
+            self._flush_locked()
+            self.connection.close()
+            self.connection = None
\ No newline at end of file
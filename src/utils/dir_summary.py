@@ -0,0 +1,88 @@
+"""
+Directory Summary Module
+Single-pass scandir summary of a folder's immediate contents
+"""
+
+import os
+import stat
+import time
+import threading
+from pathlib import Path
+
+from .jobs import JobCancelled
+
+LIST_LIMIT = 20  # folders with more entries are summarized, not listed
+
+class DirectorySummary:
+    """Counts, shallow size, type breakdown and newest file of one directory"""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.folders = 0
+        self.files = 0
+        self.other = 0
+        self.errors = 0
+        self.size = 0
+        self.types = {}  # lowercase extension -> [files, bytes]
+        self.newest = None  # (mtime, name)
+        self.names = []  # (is_dir, name), kept only while the folder is small enough to list
+        self.complete = False
+        
+    @property
+    def total(self) -> int:
+        """Entries seen so far"""
+        return self.folders + self.files + self.other + self.errors
+        
+    def add(self, entry: os.DirEntry):
+        """Count one scandir entry, using the type scandir already knows and one stat for files"""
+        try:
+            is_dir = entry.is_dir()
+            if not is_dir:
+                st = entry.stat()
+        except OSError:
+            self.errors += 1
+            return
+        if is_dir:
+            self.folders += 1
+        elif stat.S_ISREG(st.st_mode):
+            self.files += 1
+            self.size += st.st_size
+            extension = os.path.splitext(entry.name)[1].lower()
+            counts = self.types.get(extension)
+            if counts is None:
+                counts = self.types[extension] = [0, 0]
+            counts[0] += 1
+            counts[1] += st.st_size
+            if self.newest is None or st.st_mtime > self.newest[0]:
+                self.newest = (st.st_mtime, entry.name)
+        else:
+            self.other += 1
+        if self.total <= LIST_LIMIT:
+            self.names.append((is_dir, entry.name))
+            
+    def top_types(self, count: int = 8):
+        """(extension, files, bytes) of the largest types by size"""
+        ranked = sorted(self.types.items(), key=lambda item: item[1][1], reverse=True)
+        return [(extension, files, size) for extension, (files, size) in ranked[:count]]
+
+def summarize_directory(path: Path, progress_callback=None, cancel_event: threading.Event = None,
+                        progress_interval: float = 0.1) -> DirectorySummary:
+    """Summarize path in one scandir pass
+
+    progress_callback(summary) is called from this thread at most every
+    progress_interval seconds while scanning, so a caller can render a
+    partial summary of a huge folder.
+    """
+    summary = DirectorySummary(path)
+    last_report = time.monotonic()
+    with os.scandir(path) as it:
+        for entry in it:
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled("Directory summary cancelled")
+            summary.add(entry)
+            if progress_callback and summary.total % 256 == 0:
+                now = time.monotonic()
+                if now - last_report >= progress_interval:
+                    last_report = now
+                    progress_callback(summary)
+    summary.complete = True
+    return summary
\ No newline at end of file
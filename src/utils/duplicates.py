@@ -0,0 +1,185 @@
+"""
+Duplicate Finder Module
+Staged duplicate detection: size buckets, partial hashes, then full hashes
+"""
+
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .hashing import hash_file
+from .jobs import JobCancelled
+
+PARTIAL_HASH_BYTES = 64 * 1024
+
+class DuplicateGroup:
+    """Files with identical content"""
+    def __init__(self, size: int, digest: str, paths: List[Path]):
+        self.size = size
+        self.digest = digest
+        self.paths = paths
+        
+    @property
+    def wasted_bytes(self) -> int:
+        """Space that would be freed by keeping a single copy"""
+        return self.size * (len(self.paths) - 1)
+
+class DuplicateFinder:
+    def __init__(self, min_size: int = 1, workers: int = None,
+                 chunk_size: int = 1024 * 1024, follow_hidden: bool = True,
+                 hash_cache=None):
+        self.min_size = min_size
+        # hashlib releases the GIL while hashing, so threads scale across cores
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 2)
+        self.chunk_size = chunk_size
+        self.follow_hidden = follow_hidden
+        self.hardlinks = {}  # path kept for an inode -> other names of it
+        self.hash_cache = hash_cache
+        self.stats = {}  # path -> stat from the scan, used as the cache key
+        
+    def find(self, directory: Path, progress_callback=None,
+             cancel_event: threading.Event = None) -> List[DuplicateGroup]:
+        """Return duplicate groups under directory, largest waste first
+
+        progress_callback(stage, done, total) is called with stage one of
+        'scan', 'partial' and 'full'.
+        """
+        self.hardlinks = {}
+        self.stats = {}
+        by_size = self.collect_by_size(Path(directory), progress_callback, cancel_event)
+        candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+        
+        # Stage 2: the first and last 64 KB split most same-size groups
+        partial_groups = self.regroup(candidates, self.partial_hash, 'partial',
+                                      progress_callback, cancel_event)
+        
+        # Stage 3: full hashes only for files still colliding; files no
+        # bigger than the partial window were already hashed completely
+        full_candidates = []
+        groups = []
+        for (size, partial_digest), paths in partial_groups:
+            if size <= 2 * PARTIAL_HASH_BYTES:
+                groups.append(DuplicateGroup(size, partial_digest, paths))
+            else:
+                full_candidates.append((size, paths))
+        for (size, digest), paths in self.regroup(full_candidates, self.full_hash, 'full',
+                                                  progress_callback, cancel_event):
+            groups.append(DuplicateGroup(size, digest, paths))
+        if self.hash_cache is not None:
+            self.hash_cache.flush()
+            
+        groups.sort(key=lambda group: group.wasted_bytes, reverse=True)
+        return groups
+        
+    def collect_by_size(self, directory: Path, progress_callback=None,
+                        cancel_event: threading.Event = None) -> Dict[int, List[Path]]:
+        """Stage 1: walk with scandir, bucket regular files by size, one path per inode"""
+        by_size = {}
+        seen_inodes = {}
+        stack = [str(directory)]
+        scanned = 0
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        # Per entry, so a folder of millions of files still stops promptly
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise JobCancelled("Duplicate scan cancelled")
+                        if not self.follow_hidden and entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if st.st_size < self.min_size:
+                            continue
+                        # Hardlinks share one inode and are not real duplicates
+                        inode = (st.st_dev, st.st_ino)
+                        if inode in seen_inodes:
+                            self.hardlinks.setdefault(seen_inodes[inode], []).append(Path(entry.path))
+                            continue
+                        path = Path(entry.path)
+                        seen_inodes[inode] = path
+                        self.stats[path] = st
+                        by_size.setdefault(st.st_size, []).append(path)
+                        scanned += 1
+            except OSError:
+                continue
+            if progress_callback:
+                progress_callback('scan', scanned, 0)
+        return by_size
+        
+    def regroup(self, groups: List[Tuple[int, List[Path]]], hash_function, stage,
+                progress_callback=None, cancel_event: threading.Event = None):
+        """Hash every file of every group in parallel and split groups by digest
+
+        Returns [((size, digest), paths)] for digests shared by 2+ files.
+        """
+        items = [(size, path) for size, paths in groups for path in paths]
+        total = len(items)
+        buckets = {}
+        if not items:
+            return []
+            
+        def work(item):
+            size, path = item
+            if cancel_event is not None and cancel_event.is_set():
+                return path, size, None
+            try:
+                return path, size, hash_function(path, cancel_event)
+            except OSError:
+                return path, size, None
+                
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for done, (path, size, digest) in enumerate(pool.map(work, items), 1):
+                if digest is not None:
+                    buckets.setdefault((size, digest), []).append(path)
+                if progress_callback:
+                    progress_callback(stage, done, total)
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled("Duplicate scan cancelled")
+        return [(key, bucket) for key, bucket in buckets.items() if len(bucket) > 1]
+        
+    def cached_hash(self, path: Path, kind: str, compute, cancel_event=None) -> str:
+        """Look a digest up in the hash cache, computing and storing it on a miss"""
+        if self.hash_cache is None:
+            return compute(path, cancel_event)
+        file_stat = self.stats.get(path) or os.stat(path)
+        digest = self.hash_cache.get(file_stat, 'blake2b', kind)
+        if digest is None:
+            digest = compute(path, cancel_event)
+            # Skip caching if the file changed since it was scanned
+            current = os.stat(path)
+            if (current.st_mtime_ns, current.st_size) == (file_stat.st_mtime_ns, file_stat.st_size):
+                self.hash_cache.put(file_stat, 'blake2b', digest, path, kind)
+        return digest
+        
+    def partial_hash(self, path: Path, cancel_event=None) -> str:
+        """BLAKE2b of the first and last PARTIAL_HASH_BYTES"""
+        return self.cached_hash(path, 'partial', self._read_partial_hash, cancel_event)
+        
+    def _read_partial_hash(self, path: Path, cancel_event=None) -> str:
+        """Read and hash the edges of a file"""
+        hasher = hashlib.blake2b()
+        with open(path, 'rb', buffering=0) as f:
+            head = f.read(PARTIAL_HASH_BYTES)
+            hasher.update(head)
+            size = os.fstat(f.fileno()).st_size
+            if size > PARTIAL_HASH_BYTES:
+                f.seek(max(PARTIAL_HASH_BYTES, size - PARTIAL_HASH_BYTES))
+                hasher.update(f.read(PARTIAL_HASH_BYTES))
+        return hasher.hexdigest()
+        
+    def full_hash(self, path: Path, cancel_event=None) -> str:
+        """BLAKE2b of the whole file with large reads"""
+        return self.cached_hash(
+            path, 'full', lambda p, c: hash_file(p, 'blake2b', self.chunk_size, c), cancel_event)
\ No newline at end of file
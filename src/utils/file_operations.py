@@ -5,60 +5,73 @@ Advanced file and folder operations
 
 import os
 import shutil
-import hashlib
 from pathlib import Path
 from typing import List, Dict
 import threading
 
+from .copy_engine import CopyEngine
+from .trash import Trash
+from .duplicates import DuplicateFinder
+from .hash_cache import HashCache, HASH_CACHE_FILE
+from .dedupe import Deduplicator, DedupeResult
+from .dir_size import SizeEngine
+from .dir_size_cache import DirSizeCache, DIR_SIZE_CACHE_FILE
+from .zip_compressor import ZipCompressor
+from .archive_index import ArchiveIndexCache
+from .archive_extract import ArchiveExtractor, ExtractResult
+from .jobs import JobCancelled
+
 class FileOperations:
-    def __init__(self):
+    def __init__(self, global_rate_limit: int = 0, purge_rate: int = 2000,
+                 hash_cache_entries: int = 1000000, persist_folder_sizes: bool = True,
+                 config_dir: Path = None):
+        """config_dir holds the cache databases, normally the settings file's folder"""
         self.operation_in_progress = False
+        self.last_error = None
+        config_dir = Path(config_dir) if config_dir is not None else HASH_CACHE_FILE.parent
+        self.hash_cache = HashCache(config_dir / HASH_CACHE_FILE.name, max_entries=hash_cache_entries)
+        self.copy_engine = CopyEngine(global_rate_limit=global_rate_limit,
+                                      hash_cache=self.hash_cache)
+        self.trash = Trash(purge_rate=purge_rate)
+        self.dir_size_cache = DirSizeCache(config_dir / DIR_SIZE_CACHE_FILE.name) if persist_folder_sizes else None
+        self.size_engine = SizeEngine(cache=self.dir_size_cache)
+        self.archive_indexes = ArchiveIndexCache()
+        
+    def set_rate_limits(self, global_rate_limit: int = 0):
+        """Set the bandwidth cap shared by all copies (bytes/s, 0 = unlimited)"""
+        self.copy_engine.set_global_rate_limit(global_rate_limit)
         
     def copy_files(self, source_paths: List[Path], destination: Path, 
-                   progress_callback=None) -> bool:
-        """Copy multiple files/folders with progress tracking"""
+                   progress_callback=None, rate_limit: int = 0,
+                   cancel_event: threading.Event = None) -> bool:
+        """Copy multiple files/folders with byte progress and bandwidth limiting"""
         try:
             self.operation_in_progress = True
-            total_files = sum(1 for path in source_paths for _ in self._count_files(path))
-            processed = 0
-            
-            for source_path in source_paths:
-                dest_path = destination / source_path.name
-                
-                if source_path.is_file():
-                    shutil.copy2(source_path, dest_path)
-                    processed += 1
-                    if progress_callback:
-                        progress_callback(processed, total_files)
-                elif source_path.is_dir():
-                    shutil.copytree(source_path, dest_path)
-                    processed += len(list(self._count_files(source_path)))
-                    if progress_callback:
-                        progress_callback(processed, total_files)
-                        
+            self.last_error = None
+            self.copy_engine.copy(source_paths, destination, rate_limit,
+                                  progress_callback=progress_callback,
+                                  cancel_event=cancel_event)
             return True
         except Exception as e:
+            self.last_error = e
             print(f"Copy error: {e}")
             return False
         finally:
             self.operation_in_progress = False
             
     def move_files(self, source_paths: List[Path], destination: Path,
-                   progress_callback=None) -> bool:
-        """Move multiple files/folders"""
+                   progress_callback=None, rate_limit: int = 0,
+                   cancel_event: threading.Event = None) -> bool:
+        """Move multiple files/folders, renaming in place when on the same device"""
         try:
             self.operation_in_progress = True
-            total_files = len(source_paths)
-            
-            for i, source_path in enumerate(source_paths):
-                dest_path = destination / source_path.name
-                shutil.move(source_path, dest_path)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total_files)
-                    
-            return True
+            self.last_error = None
+            result = self.copy_engine.move(source_paths, destination, rate_limit,
+                                           progress_callback=progress_callback,
+                                           cancel_event=cancel_event)
+            return not result.mismatches
         except Exception as e:
+            self.last_error = e
             print(f"Move error: {e}")
             return False
         finally:
@@ -86,56 +99,98 @@ class FileOperations:
         finally:
             self.operation_in_progress = False
             
-    def calculate_directory_size(self, directory: Path) -> int:
+    def trash_files(self, file_paths: List[Path]):
+        """Move files/folders to the trash; returns (trashed items, [(path, error)])"""
+        trashed = []
+        failed = []
+        for file_path in file_paths:
+            try:
+                trashed.append(self.trash.trash(file_path))
+            except Exception as e:
+                failed.append((file_path, e))
+        return trashed, failed
+        
+    def calculate_directory_size(self, directory: Path, progress_callback=None,
+                                 cancel_event: threading.Event = None) -> int:
         """Calculate total size of directory"""
-        total_size = 0
         try:
-            for path in directory.rglob('*'):
-                if path.is_file():
-                    total_size += path.stat().st_size
-        except PermissionError:
-            pass
-        return total_size
-        
-    def find_duplicate_files(self, directory: Path) -> Dict[str, List[Path]]:
+            return self.size_engine.directory_size(directory, progress_callback, cancel_event).size
+        except OSError as e:
+            print(f"Size calculation error: {e}")
+            return 0
+            
+    def find_duplicate_files(self, directory: Path, progress_callback=None,
+                             cancel_event: threading.Event = None) -> Dict[str, List[Path]]:
         """Find duplicate files based on content hash"""
-        file_hashes = {}
         duplicates = {}
-        
         try:
-            for file_path in directory.rglob('*'):
-                if file_path.is_file():
-                    file_hash = self._calculate_file_hash(file_path)
-                    if file_hash:
-                        if file_hash in file_hashes:
-                            if file_hash not in duplicates:
-                                duplicates[file_hash] = [file_hashes[file_hash]]
-                            duplicates[file_hash].append(file_path)
-                        else:
-                            file_hashes[file_hash] = file_path
+            finder = DuplicateFinder(hash_cache=self.hash_cache)
+            for group in finder.find(directory, progress_callback, cancel_event):
+                duplicates[group.digest] = group.paths
         except Exception as e:
             print(f"Error finding duplicates: {e}")
             
         return duplicates
         
-    def compress_folder(self, folder_path: Path, output_path: Path) -> bool:
-        """Compress folder to zip file"""
+    def dedupe_files(self, duplicates: Dict[str, List[Path]], mode: str = 'auto',
+                     progress_callback=None, cancel_event: threading.Event = None) -> DedupeResult:
+        """Replace duplicates found by find_duplicate_files with links to one copy"""
+        deduplicator = Deduplicator(self.copy_engine, mode)
+        return deduplicator.dedupe(list(duplicates.values()), progress_callback, cancel_event)
+        
+    def compress_folder(self, folder_path: Path, output_path: Path, progress_callback=None,
+                        cancel_event: threading.Event = None, level: int = 6) -> bool:
+        """Compress folder to zip file, deflating members in parallel with byte progress"""
         try:
-            shutil.make_archive(str(output_path.with_suffix('')), 'zip', folder_path)
+            self.operation_in_progress = True
+            self.last_error = None
+            self.create_zip(folder_path, output_path, progress_callback, cancel_event, level)
             return True
+        except JobCancelled as e:
+            self.last_error = e
+            return False
         except Exception as e:
+            self.last_error = e
             print(f"Compression error: {e}")
             return False
+        finally:
+            self.operation_in_progress = False
             
-    def extract_archive(self, archive_path: Path, destination: Path) -> bool:
-        """Extract archive file"""
+    def create_zip(self, folder_path: Path, output_path: Path, progress_callback=None,
+                   cancel_event: threading.Event = None, level: int = 6) -> Path:
+        """Like compress_folder, but raising errors to the caller instead of keeping them in last_error"""
+        output_path = output_path.with_suffix('.zip')
+        ZipCompressor(level=level).compress(folder_path, output_path,
+                                            progress_callback=progress_callback,
+                                            cancel_event=cancel_event)
+        return output_path
+            
+    def extract_archive(self, archive_path: Path, destination: Path, members: List[str] = None,
+                        progress_callback=None, cancel_event: threading.Event = None,
+                        max_ratio: float = 100.0) -> bool:
+        """Extract an archive, or only the given members, streaming with byte progress"""
         try:
-            shutil.unpack_archive(archive_path, destination)
+            self.operation_in_progress = True
+            self.last_error = None
+            self.extract_members(archive_path, destination, members, progress_callback,
+                                 cancel_event, max_ratio)
             return True
         except Exception as e:
+            self.last_error = e
             print(f"Extraction error: {e}")
             return False
+        finally:
+            self.operation_in_progress = False
             
+    def extract_members(self, archive_path: Path, destination: Path, members: List[str] = None,
+                        progress_callback=None, cancel_event: threading.Event = None,
+                        max_ratio: float = 100.0) -> ExtractResult:
+        """Like extract_archive, but raising errors to the caller and returning what was extracted"""
+        index = self.archive_indexes.get(archive_path, cancel_event)
+        return ArchiveExtractor(max_ratio=max_ratio).extract(index, destination, members,
+                                                             progress_callback=progress_callback,
+                                                             cancel_event=cancel_event)
+        
     def _count_files(self, path: Path):
         """Count files in directory recursively"""
         if path.is_file():
@@ -148,13 +203,20 @@ class FileOperations:
             except PermissionError:
                 pass
                 
-    def _calculate_file_hash(self, file_path: Path, chunk_size: int = 8192) -> str:
-        """Calculate MD5 hash of file"""
+    def _calculate_file_hash(self, file_path: Path, algorithm: str = 'blake2b') -> str:
+        """Calculate hash of file, reusing the cached digest of unchanged files"""
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(chunk_size), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return self.hash_cache.hash_file(file_path, algorithm)
         except Exception:
-            return None
\ No newline at end of file
+            return None
+            
+    def prune_hash_cache(self, cancel_event: threading.Event = None) -> int:
+        """Drop cached digests of deleted or modified files"""
+        return self.hash_cache.prune(cancel_event)
+        
+    def close(self):
+        """Flush caches before exit"""
+        self.hash_cache.close()
+        if self.dir_size_cache is not None:
+            self.dir_size_cache.close()
+        self.archive_indexes.close()
\ No newline at end of file
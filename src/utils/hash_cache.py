@@ -0,0 +1,249 @@
+"""
+Hash Cache Module
+Persistent SQLite cache of file digests keyed by device, inode, size and mtime
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from .hashing import hash_file, HASH_CHUNK_SIZE
+
+HASH_CACHE_FILE = Path("config/hash_cache.db")
+
+# Stale rows are pruned at most this often, since pruning stats every row
+PRUNE_INTERVAL = 7 * 24 * 3600
+
+# Rows read, statted and deleted per step of a prune
+PRUNE_BATCH = 5000
+
+class HashCache:
+    def __init__(self, db_path: Path = HASH_CACHE_FILE, max_entries: int = 1000000,
+                 batch_size: int = 500):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = []
+        self.touched = []
+        self.hits = 0
+        self.misses = 0
+        self.entries = 0  # row count, exact after open and after each trim
+        self.connection = None
+        self.open()
+        
+    def open(self):
+        """Open (creating if needed) the cache database"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # One connection shared by worker threads, serialised by self.lock
+            self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS hashes (
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    path TEXT,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (dev, ino, algorithm, kind)
+                ) WITHOUT ROWID
+            """)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.connection.commit()
+            with self.lock:
+                self._enforce_limit_locked()
+        except sqlite3.Error as e:
+            print(f"Hash cache unavailable: {e}")
+            self.connection = None
+            
+    def get(self, file_stat: os.stat_result, algorithm: str, kind: str = 'full') -> str:
+        """Return the cached digest if the file is unchanged, else None"""
+        with self.lock:
+            if self.connection is None:
+                self.misses += 1
+                return None
+            row = self.connection.execute(
+                "SELECT size, mtime_ns, digest FROM hashes "
+                "WHERE dev = ? AND ino = ? AND algorithm = ? AND kind = ?",
+                (file_stat.st_dev, file_stat.st_ino, algorithm, kind)).fetchone()
+            if row and row[0] == file_stat.st_size and row[1] == file_stat.st_mtime_ns:
+                self.hits += 1
+                # Hits refresh last_used so eviction drops rows nobody reads
+                self.touched.append((int(time.time()), file_stat.st_dev, file_stat.st_ino,
+                                     algorithm, kind))
+                if len(self.touched) >= self.batch_size:
+                    self._flush_locked()
+                return row[2]
+            self.misses += 1
+            return None
+            
+    def put(self, file_stat: os.stat_result, algorithm: str, digest: str,
+            path: Path = None, kind: str = 'full'):
+        """Queue a digest for storage; rows are written in batches"""
+        if digest is None:
+            return
+        with self.lock:
+            if self.connection is None:
+                return
+            self.pending.append((file_stat.st_dev, file_stat.st_ino, algorithm, kind,
+                                 file_stat.st_size, file_stat.st_mtime_ns, digest,
+                                 str(path) if path else None, int(time.time())))
+            if len(self.pending) >= self.batch_size:
+                self._flush_locked()
+                
+    def flush(self):
+        """Write queued rows"""
+        with self.lock:
+            self._flush_locked()
+            
+    def _flush_locked(self):
+        """Write queued rows; caller holds self.lock"""
+        if not (self.pending or self.touched) or self.connection is None:
+            return
+        try:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes "
+                "(dev, ino, algorithm, kind, size, mtime_ns, digest, path, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+            self.connection.executemany(
+                "UPDATE hashes SET last_used = ? "
+                "WHERE dev = ? AND ino = ? AND algorithm = ? AND kind = ?", self.touched)
+            self.connection.commit()
+            # Replaced rows make this an overestimate; the trim recounts exactly
+            self.entries += len(self.pending)
+            if self.entries > self.max_entries:
+                self._enforce_limit_locked()
+        except sqlite3.Error as e:
+            print(f"Hash cache write error: {e}")
+        self.pending = []
+        self.touched = []
+        
+    def hash_file(self, file_path: Path, algorithm: str = 'blake2b',
+                  chunk_size: int = HASH_CHUNK_SIZE, cancel_event=None) -> str:
+        """Hash a file, reusing the cached digest when size and mtime are unchanged"""
+        file_stat = os.stat(file_path)
+        digest = self.get(file_stat, algorithm)
+        if digest is not None:
+            return digest
+        digest = hash_file(file_path, algorithm, chunk_size, cancel_event)
+        # A file modified while it was read must not be cached under the old mtime
+        if digest is not None and os.stat(file_path).st_mtime_ns == file_stat.st_mtime_ns:
+            self.put(file_stat, algorithm, digest, file_path)
+        return digest
+        
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+        
+    def stats(self) -> dict:
+        """Lookup counters and table size"""
+        entries = 0
+        with self.lock:
+            if self.connection is not None:
+                entries = self.connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hit_rate, 'entries': entries}
+        
+    def reset_stats(self):
+        """Start counting hits and misses afresh"""
+        self.hits = 0
+        self.misses = 0
+        
+    def enforce_limit(self):
+        """Drop least recently used rows beyond max_entries"""
+        with self.lock:
+            if self.connection is None:
+                return 0
+            self._flush_locked()
+            return self._enforce_limit_locked()
+            
+    def _enforce_limit_locked(self) -> int:
+        """Recount rows and drop the least recently used beyond max_entries; caller holds self.lock"""
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        excess = self.entries - self.max_entries
+        if excess <= 0:
+            return 0
+        self.connection.execute(
+            "DELETE FROM hashes WHERE (dev, ino, algorithm, kind) IN ("
+            "SELECT dev, ino, algorithm, kind FROM hashes ORDER BY last_used LIMIT ?)",
+            (excess,))
+        self.connection.commit()
+        self.entries -= excess
+        return excess
+        
+    def prune(self, cancel_event=None, force: bool = False) -> int:
+        """Delete rows whose file is gone or changed; runs at most weekly unless forced
+
+        Rows are walked in key order PRUNE_BATCH at a time, so memory stays
+        bounded and the lock is released while files are statted.
+        """
+        with self.lock:
+            if self.connection is None:
+                return 0
+            self._flush_locked()
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'last_prune'").fetchone()
+            if not force and row and time.time() - float(row[0]) < PRUNE_INTERVAL:
+                return 0
+                
+        removed = 0
+        after = (-1, -1, '', '')  # below every key
+        while True:
+            with self.lock:
+                if self.connection is None:
+                    return removed
+                rows = self.connection.execute(
+                    "SELECT dev, ino, algorithm, kind, size, mtime_ns, path FROM hashes "
+                    "WHERE (dev, ino, algorithm, kind) > (?, ?, ?, ?) "
+                    "ORDER BY dev, ino, algorithm, kind LIMIT ?", (*after, PRUNE_BATCH)).fetchall()
+            if not rows:
+                break
+            after = rows[-1][:4]
+            
+            stale = []
+            for dev, ino, algorithm, kind, size, mtime_ns, path in rows:
+                if cancel_event is not None and cancel_event.is_set():
+                    return removed
+                try:
+                    st = os.stat(path) if path else None
+                except OSError:
+                    st = None
+                if (st is None or (st.st_dev, st.st_ino) != (dev, ino)
+                        or st.st_size != size or st.st_mtime_ns != mtime_ns):
+                    stale.append((dev, ino, algorithm, kind))
+                    
+            with self.lock:
+                if self.connection is None:
+                    return removed
+                self.connection.executemany(
+                    "DELETE FROM hashes WHERE dev = ? AND ino = ? AND algorithm = ? AND kind = ?", stale)
+                self.connection.commit()
+            removed += len(stale)
+            
+        with self.lock:
+            if self.connection is None:
+                return removed
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_prune', ?)",
+                                    (str(time.time()),))
+            self.connection.commit()
+        self.enforce_limit()
+        return removed
+        
+    def close(self):
+        """Flush pending rows and close the database"""
+        with self.lock:
+            if self.connection is None:
+                return
+            self._flush_locked()
+            self.connection.close()
+            self.connection = None
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Hashing Utility Module
+Shared content hashing and checksum sidecar files
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict
+
+# Sidecar extensions follow b2sum/sha256sum so the files can be checked
+# with `b2sum -c` or `sha256sum -c`
+HASH_ALGORITHMS = {
+    'blake2b': '.b2',
+    'sha256': '.sha256',
+}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def new_hasher(algorithm: str = 'blake2b'):
+    """Create a hash object for one of HASH_ALGORITHMS"""
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    return hashlib.new(algorithm)
+
+def hash_file(file_path: Path, algorithm: str = 'blake2b',
+              chunk_size: int = HASH_CHUNK_SIZE, cancel_event=None) -> str:
+    """Hash a whole file with large unbuffered reads"""
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            count = f.readinto(buffer)
+            if not count:
+                break
+            hasher.update(view[:count])
+    return hasher.hexdigest()
+
+def write_checksum_sidecar(checksums: Dict[Path, str], directory: Path,
+                           algorithm: str = 'blake2b', name: str = 'checksums') -> Path:
+    """Write a coreutils-style checksum file with paths relative to directory
+
+    Entries already in the file are kept unless checksums has a newer
+    digest for the same path, and the file is replaced atomically so a
+    later `b2sum -c` never sees duplicate, stale or half-written lines.
+    """
+    directory = Path(directory)
+    sidecar = directory / f"{name}{HASH_ALGORITHMS[algorithm]}"
+    entries = read_checksum_sidecar(sidecar)
+    for path, digest in checksums.items():
+        try:
+            relative = Path(path).relative_to(directory)
+        except ValueError:
+            relative = Path(path)
+        entries[relative.as_posix()] = digest
+    temp_path = sidecar.with_name(f".{sidecar.name}.tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{digest}  {path}\n" for path, digest in sorted(entries.items()))
+        os.replace(temp_path, sidecar)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    return sidecar
+
+def read_checksum_sidecar(sidecar: Path) -> Dict[str, str]:
+    """Relative path -> digest from an existing checksum file, or {} if there is none"""
+    entries = {}
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            for line in f:
+                digest, separator, path = line.rstrip('\n').partition(' ')
+                if separator and path[:1] in (' ', '*'):
+                    entries[path[1:]] = digest
+    except FileNotFoundError:
+        pass
+    return entries
\ No newline at end of file
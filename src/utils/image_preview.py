@@ -0,0 +1,121 @@
+"""
+Image Preview Module
+Reads and downscales images off the UI thread for tk.PhotoImage
+"""
+
+import base64
+import struct
+import threading
+from pathlib import Path
+from typing import Tuple
+
+from .jobs import JobCancelled
+
+IMAGE_SUFFIXES = {'.png', '.gif', '.ppm', '.pgm', '.pnm'}
+
+class ImageData:
+    """An image ready for tk.PhotoImage(data=data, format=format).subsample(factor)"""
+    def __init__(self, format: str, width: int, height: int, factor: int = 1, data: bytes = None,
+                 prescaled: bool = False):
+        self.format = format
+        self.width = width
+        self.height = height
+        self.factor = factor
+        self.data = data  # base64; None when the image is too large to decode automatically
+        self.prescaled = prescaled  # data is already reduced by factor
+        
+    @property
+    def deferred(self) -> bool:
+        """True if the image was only measured, not read"""
+        return self.data is None
+
+def is_previewable_image(path: Path) -> bool:
+    """True for formats tk.PhotoImage can decode"""
+    return Path(path).suffix.lower() in IMAGE_SUFFIXES
+
+def read_header(path: Path) -> Tuple[str, int, int, dict]:
+    """(format, width, height, extra) from the first bytes of a PNG, GIF or PPM/PGM file"""
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+        width, height = struct.unpack('>II', head[16:24])
+        return 'png', width, height, {}
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        width, height = struct.unpack('<HH', head[6:10])
+        return 'gif', width, height, {}
+    if head[:2] in (b'P5', b'P6'):
+        # Magic, width, height and maxval, separated by whitespace and # comments
+        fields = []
+        position = 2
+        while len(fields) < 3:
+            while position < len(head) and head[position:position + 1].isspace():
+                position += 1
+            if head[position:position + 1] == b'#':
+                position = head.index(b'\n', position)
+                continue
+            start = position
+            while position < len(head) and head[position:position + 1].isdigit():
+                position += 1
+            if start == position:
+                raise ValueError(f"Malformed header in {Path(path).name}")
+            fields.append(int(head[start:position]))
+        width, height, maxval = fields
+        # Exactly one whitespace byte separates the header from the pixels
+        return 'ppm', width, height, {'magic': head[:2], 'maxval': maxval, 'offset': position + 1}
+    if head[:2] in (b'P1', b'P2', b'P3', b'P4'):
+        raise ValueError(f"{Path(path).name} is a {head[:2].decode()} (ASCII or bitmap) PNM image; "
+                         f"only binary P5 and P6 are supported")
+    raise ValueError(f"{Path(path).name} is not a PNG, GIF or PPM image")
+
+def fit_factor(width: int, height: int, box: Tuple[int, int]) -> int:
+    """Smallest integer subsample factor that fits width x height inside box"""
+    return max(1, -(-width // max(box[0], 1)), -(-height // max(box[1], 1)))
+
+def load_image(path: Path, box: Tuple[int, int], max_bytes: int, max_pixels: int,
+               cancel_event: threading.Event = None, force: bool = False) -> ImageData:
+    """Read an image for display in box
+
+    PPM/PGM files are subsampled here, reading only the rows that are
+    kept. PNG and GIF must be decoded by Tk itself, so they are read and
+    encoded ready for PhotoImage; files over max_bytes or max_pixels are
+    only measured unless force is set, so a huge image never decodes on
+    a selection change.
+    """
+    format, width, height, extra = read_header(path)
+    factor = fit_factor(width, height, box)
+    if format == 'ppm':
+        return subsample_pnm(path, width, height, extra, factor, cancel_event)
+    if not force and (Path(path).stat().st_size > max_bytes or width * height > max_pixels):
+        return ImageData(format, width, height, factor)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled("Image preview cancelled")
+    return ImageData(format, width, height, factor, base64.b64encode(raw))
+
+def subsample_pnm(path: Path, width: int, height: int, extra: dict, factor: int,
+                  cancel_event: threading.Event = None) -> ImageData:
+    """Keep every factor-th pixel of every factor-th row of an 8-bit PPM or PGM"""
+    if extra['maxval'] > 255:
+        raise ValueError("16-bit PPM images are not supported")
+    channels = 3 if extra['magic'] == b'P6' else 1
+    stride = width * channels
+    new_width = -(-width // factor)
+    new_height = -(-height // factor)
+    row_bytes = new_width * channels
+    pixels = bytearray(row_bytes * new_height)
+    position = 0
+    with open(path, 'rb') as f:
+        for y in range(0, height, factor):
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled("Image preview cancelled")
+            f.seek(extra['offset'] + y * stride)
+            row = f.read(stride)
+            if len(row) < stride:
+                raise ValueError(f"{Path(path).name} is truncated")
+            for channel in range(channels):
+                pixels[position + channel:position + row_bytes:channels] = row[channel::channels * factor]
+            position += row_bytes
+    # Samples are copied unscaled, so the original maxval still applies
+    header = f"{extra['magic'].decode()}\n{new_width} {new_height}\n{extra['maxval']}\n".encode('ascii')
+    return ImageData('ppm', width, height, factor, base64.b64encode(header + bytes(pixels)), prescaled=True)
\ No newline at end of file
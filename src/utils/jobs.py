@@ -0,0 +1,88 @@
+"""
+Background Jobs Module
+Cancellable worker threads with rate-limited progress reporting
+"""
+
+import time
+import threading
+
+from .throttle import lower_current_thread_priority
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancel() has been requested"""
+
+class BackgroundJob:
+    def __init__(self, name, target, low_priority=False,
+                 progress_callback=None, done_callback=None, progress_interval=0.1):
+        """Run target(job) on a daemon thread
+
+        progress_callback(done, total) and done_callback(result, error) are
+        called from the worker thread; UI code should hop back to Tk with
+        widget.after(0, ...).
+        """
+        self.name = name
+        self.target = target
+        self.low_priority = low_priority
+        self.progress_callback = progress_callback
+        self.done_callback = done_callback
+        self.progress_interval = progress_interval
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.result = None
+        self.error = None
+        self.done = 0
+        self.total = 0
+        self.last_report = 0.0
+        
+    def start(self):
+        """Start the worker thread"""
+        self.thread = threading.Thread(target=self.run, name=self.name)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+        
+    def run(self):
+        """Thread body"""
+        if self.low_priority:
+            lower_current_thread_priority()
+        try:
+            self.result = self.target(self)
+        except Exception as e:
+            self.error = e
+        finally:
+            if self.done_callback:
+                self.done_callback(self.result, self.error)
+                
+    def cancel(self):
+        """Ask the job to stop at its next checkpoint"""
+        self.cancel_event.set()
+        
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called"""
+        return self.cancel_event.is_set()
+        
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled"""
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"{self.name} cancelled")
+            
+    def is_running(self) -> bool:
+        """True while the worker thread is alive"""
+        return self.thread is not None and self.thread.is_alive()
+        
+    def join(self, timeout=None):
+        """Wait for the worker thread"""
+        if self.thread:
+            self.thread.join(timeout)
+            
+    def report(self, done, total):
+        """Record progress and forward it at most every progress_interval"""
+        self.done = done
+        self.total = total
+        if not self.progress_callback:
+            return
+        now = time.monotonic()
+        if done >= total or now - self.last_report >= self.progress_interval:
+            self.last_report = now
+            self.progress_callback(done, total)
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Operation Journal Module
+Append-only journals that let interrupted batch operations resume
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+JOURNAL_DIR = Path("config/journals")
+
+# Large files get a checkpoint record every CHECKPOINT_BYTES so a resume can
+# continue mid-file instead of starting that file over
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+class OperationJournal:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.header = {}
+        self.completed = {}    # destination -> (size, mtime_ns) of the source
+        self.checkpoints = {}  # destination -> (offset, size, mtime_ns)
+        self.planned = False  # the batch passed its checks and writing began
+        self.finished = False
+        self.file = None
+        
+    @classmethod
+    def create(cls, kind: str, sources: List[Path], destination: Path,
+               journal_dir: Path = JOURNAL_DIR, **options):
+        """Start a new journal for a batch operation"""
+        journal_dir = Path(journal_dir)
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        job_id = uuid.uuid4().hex[:12]
+        journal = cls(journal_dir / f"{job_id}.jnl")
+        journal.header = {
+            'op': 'begin',
+            'id': job_id,
+            'kind': kind,
+            'sources': [str(source) for source in sources],
+            'destination': str(destination),
+            'started': datetime.now().isoformat(timespec='seconds'),
+            **options
+        }
+        journal.append(journal.header)
+        return journal
+        
+    @classmethod
+    def load(cls, path: Path):
+        """Replay a journal file written by an earlier run"""
+        journal = cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash can leave a torn final line; everything before it is valid
+                    break
+                journal.apply(record)
+        return journal
+        
+    @classmethod
+    def pending(cls, journal_dir: Path = JOURNAL_DIR) -> List['OperationJournal']:
+        """Return journals of operations that never finished"""
+        journals = []
+        journal_dir = Path(journal_dir)
+        if not journal_dir.is_dir():
+            return journals
+        for path in sorted(journal_dir.glob('*.jnl')):
+            try:
+                journal = cls.load(path)
+            except OSError:
+                continue
+            # A batch that failed its checks never wrote anything to resume
+            if journal.header and journal.planned and not journal.finished:
+                journals.append(journal)
+            else:
+                journal.discard()
+        return journals
+        
+    def apply(self, record: dict):
+        """Update in-memory state from one record"""
+        op = record.get('op')
+        if op == 'begin':
+            self.header = record
+        elif op == 'plan':
+            self.planned = True
+        elif op == 'file':
+            self.completed[record['dst']] = (record['size'], record['mtime'])
+            self.checkpoints.pop(record['dst'], None)
+        elif op == 'chunk':
+            self.checkpoints[record['dst']] = (record['offset'], record['size'], record['mtime'])
+        elif op == 'end':
+            self.finished = True
+            
+    def append(self, record: dict, durable: bool = False):
+        """Write one record and hand it to the OS immediately; durable=True also waits for the disk"""
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+        if durable:
+            os.fsync(self.file.fileno())
+        self.apply(record)
+        
+    @property
+    def kind(self) -> str:
+        """Operation type: 'copy' or 'move'"""
+        return self.header.get('kind', '')
+        
+    @property
+    def sources(self) -> List[Path]:
+        """Source paths of the batch"""
+        return [Path(source) for source in self.header.get('sources', [])]
+        
+    @property
+    def destination(self) -> Path:
+        """Destination folder of the batch"""
+        return Path(self.header.get('destination', ''))
+        
+    def record_plan(self):
+        """Mark the batch as checked, before its first write"""
+        self.append({'op': 'plan'})
+        
+    def record_file(self, destination: Path, source_stat: os.stat_result):
+        """Mark a file as fully copied"""
+        self.append({'op': 'file', 'dst': str(destination),
+                     'size': source_stat.st_size, 'mtime': source_stat.st_mtime_ns})
+        
+    def record_chunk(self, destination: Path, offset: int, source_stat: os.stat_result):
+        """Mark the first `offset` bytes of a file as copied, durably so it survives a crash"""
+        self.append({'op': 'chunk', 'dst': str(destination), 'offset': offset,
+                     'size': source_stat.st_size, 'mtime': source_stat.st_mtime_ns}, durable=True)
+        
+    def is_complete(self, destination: Path, source_stat: os.stat_result) -> bool:
+        """True if the journal and the files on disk agree the copy is done"""
+        recorded = self.completed.get(str(destination))
+        if recorded != (source_stat.st_size, source_stat.st_mtime_ns):
+            return False
+        try:
+            dest_stat = os.stat(destination)
+        except OSError:
+            return False
+        # copystat() gave the destination the source mtime when it finished
+        return (dest_stat.st_size == source_stat.st_size
+                and dest_stat.st_mtime_ns == source_stat.st_mtime_ns)
+        
+    def resume_offset(self, destination: Path, source_stat: os.stat_result) -> int:
+        """Byte offset a partially copied file can continue from (0 = start over)"""
+        checkpoint = self.checkpoints.get(str(destination))
+        if not checkpoint:
+            return 0
+        offset, size, mtime_ns = checkpoint
+        if (size, mtime_ns) != (source_stat.st_size, source_stat.st_mtime_ns):
+            return 0
+        try:
+            if os.stat(destination).st_size < offset:
+                return 0
+        except OSError:
+            return 0
+        return offset
+        
+    def finish(self):
+        """Record completion and remove the journal"""
+        self.append({'op': 'end'})
+        self.discard()
+        
+    def close(self):
+        """Close the journal file, keeping it for a later resume"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            
+    def discard(self):
+        """Close and delete the journal"""
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+            
+    def describe(self) -> str:
+        """Short human readable summary for resume prompts"""
+        count = len(self.header.get('sources', []))
+        action = "Copy" if self.kind == 'copy' else "Move"
+        return (f"{action} of {count} item(s) to {self.destination} "
+                f"started {self.header.get('started', '')}")
\ No newline at end of file
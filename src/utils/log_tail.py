@@ -0,0 +1,101 @@
+"""
+Log Tail Module
+Reads the end of a growing file and follows appended lines across truncation and rotation
+"""
+
+import os
+from pathlib import Path
+from typing import List
+
+TAIL_WINDOW = 4 * 1024 * 1024  # most bytes read back from the end for the initial lines
+
+class LogTail:
+    def __init__(self, path: Path, max_lines: int = 5000, encoding: str = 'utf-8'):
+        """Follow path the way tail -F does: by name, reopening it when it is replaced"""
+        self.path = Path(path)
+        self.max_lines = max_lines
+        self.encoding = encoding
+        self.file = None
+        self.identity = None
+        self.position = 0
+        self.partial = b''
+        
+    def open(self):
+        """Open the file currently at path"""
+        self.file = open(self.path, 'rb')
+        st = os.fstat(self.file.fileno())
+        self.identity = (st.st_dev, st.st_ino)
+        self.position = 0
+        self.partial = b''
+        return st.st_size
+        
+    def tail(self) -> List[str]:
+        """Last max_lines complete lines, read backwards from the end of the file"""
+        size = self.open()
+        start = size
+        newlines = 0
+        blocks = []
+        while start > 0 and newlines <= self.max_lines and size - start < TAIL_WINDOW:
+            block_start = max(0, start - 64 * 1024)
+            self.file.seek(block_start)
+            block = self.file.read(start - block_start)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+            start = block_start
+        data = b''.join(reversed(blocks))
+        if start > 0:
+            # Began mid-line: drop the fragment before the first newline
+            data = data[data.find(b'\n') + 1:] if b'\n' in data else b''
+        self.position = size
+        return self.split(data)[-self.max_lines:]
+        
+    def poll(self) -> List[str]:
+        """New lines since the last call, with a notice line where the file was truncated or replaced"""
+        lines = self.read_appended()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return lines  # mid-rotation; keep the old file until a new one appears
+        if (st.st_dev, st.st_ino) != self.identity:
+            # Whatever the old file gained before it was replaced was read above
+            self.close()
+            self.open()
+            lines.append(f"--- {self.path.name} was replaced; following the new file ---")
+            lines += self.read_appended()
+        elif st.st_size < self.position:
+            self.position = 0
+            self.partial = b''
+            lines.append(f"--- {self.path.name} was truncated ---")
+            lines += self.read_appended()
+        return lines
+        
+    def read_appended(self) -> List[str]:
+        """Complete lines written after the current position"""
+        size = os.fstat(self.file.fileno()).st_size
+        if size <= self.position:
+            return []
+        skipped = size - self.position > TAIL_WINDOW
+        if skipped:
+            # A burst larger than the widget can show: skip to its last lines
+            self.position = size - TAIL_WINDOW
+            self.partial = b''
+        self.file.seek(self.position)
+        data = self.file.read(size - self.position)
+        self.position += len(data)
+        if skipped:
+            data = data[data.find(b'\n') + 1:] if b'\n' in data else b''
+        return self.split(self.partial + data)[-self.max_lines:]
+        
+    def split(self, data: bytes) -> List[str]:
+        """Decode complete lines, keeping an unterminated last line for the next read"""
+        end = data.rfind(b'\n')
+        self.partial = data[end + 1:]
+        if end == -1:
+            return []
+        return [line.decode(self.encoding, 'replace').rstrip('\r') for line in data[:end].split(b'\n')]
+        
+    def close(self):
+        """Close the followed file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
\ No newline at end of file
@@ -0,0 +1,379 @@
+"""
+Mapped File Module
+Memory-mapped documents that render only the rows a viewer asks for
+"""
+
+import os
+import re
+import mmap
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .jobs import JobCancelled
+
+MAX_ROW_BYTES = 16 * 1024  # longer lines are shown as several rows
+
+RELEASE_INTERVAL = 64 * 1024 * 1024
+
+SEARCH_CHUNK = 64 * 1024 * 1024
+
+BYTES_PER_ROW = 16
+
+ASCII_TABLE = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
+
+def release_pages(data, start: int, end: int) -> int:
+    """Drop scanned pages of a mapping from memory; returns the new page-aligned start"""
+    end -= end % mmap.PAGESIZE
+    if end > start and isinstance(data, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED'):
+        data.madvise(mmap.MADV_DONTNEED, start, end - start)
+    return max(start, end)
+
+def compile_query(query: str, regex: bool = False, ignore_case: bool = False):
+    """Compile text typed into a find bar into a bytes pattern"""
+    if not query:
+        raise ValueError("Enter text to find")
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    source = query.encode('utf-8')
+    try:
+        return re.compile(source if regex else re.escape(source), flags)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern: {e}")
+
+def search_windows(data, start: int, end: int, backwards: bool = False):
+    """(start, end) windows of up to SEARCH_CHUNK bytes covering data[start:end]
+
+    Window edges fall just after a newline where one is near, so matches
+    within a line are never split between windows.
+    """
+    if not backwards:
+        position = start
+        while position < end:
+            stop = min(position + SEARCH_CHUNK, end)
+            if stop < end:
+                newline = data.find(b'\n', stop, min(stop + MAX_ROW_BYTES, end))
+                stop = newline + 1 if newline != -1 else stop
+            yield position, stop
+            position = stop
+    else:
+        position = end
+        while position > start:
+            lower = max(position - SEARCH_CHUNK, start)
+            if lower > start:
+                newline = data.rfind(b'\n', max(lower - MAX_ROW_BYTES, start), lower)
+                lower = newline + 1 if newline != -1 else lower
+            yield lower, position
+            position = lower
+
+def find_pattern(data, pattern, start: int, end: int, backwards: bool = False,
+                 cancel_event: threading.Event = None) -> Optional[Tuple[int, int]]:
+    """First (or with backwards, last) non-empty match in data[start:end]"""
+    released = start - start % mmap.PAGESIZE
+    for lower, upper in search_windows(data, start, end, backwards):
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled("Search cancelled")
+        found = None
+        for match in pattern.finditer(data, lower, upper):
+            if match.end() > match.start():
+                found = match.span()
+                if not backwards:
+                    break
+        if found:
+            return found
+        if not backwards:
+            released = release_pages(data, released, upper)
+    return None
+
+class MappedFile:
+    """Read-only mmap of a file; empty files map to b''"""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.file = open(self.path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        
+    def close(self):
+        """Unmap and close the file"""
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+class LineIndex:
+    def __init__(self, data, size: int, block_size: int = 256 * 1024):
+        """Sparse map of line numbers to byte offsets, one anchor per block of the file"""
+        self.data = data
+        self.size = size
+        self.block_size = block_size
+        self.anchor_lines = array('Q', [0])
+        self.anchor_offsets = array('Q', [0])
+        self.indexed_bytes = 0
+        self.indexed_lines = 0
+        self.total_lines = None
+        self.complete = False
+        
+    def build(self, progress_callback=None, cancel_event: threading.Event = None):
+        """Count newlines block by block, recording the first line start in each block
+
+        Memory is one anchor per block rather than one per line, and a
+        lookup scans at most one block from its anchor, so a 20 GB file
+        needs well under 2 MB of index. Scanned pages are released as the
+        scan moves on, so memory stays flat however large the file.
+        """
+        position = 0
+        lines = 0
+        released = 0
+        while position < self.size:
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled("Line indexing cancelled")
+            end = min(position + self.block_size, self.size)
+            block = self.data[position:end]
+            newline = block.find(b'\n')
+            if newline != -1 and position + newline + 1 < self.size:
+                # Offsets first: readers bisect anchor_lines and then index anchor_offsets
+                self.anchor_offsets.append(position + newline + 1)
+                self.anchor_lines.append(lines + 1)
+            lines += block.count(b'\n')
+            self.indexed_lines = lines
+            self.indexed_bytes = end
+            position = end
+            if position - released >= RELEASE_INTERVAL:
+                released = release_pages(self.data, released, position)
+            if progress_callback:
+                progress_callback(position, self.size)
+        ends_with_newline = self.size == 0 or self.data[self.size - 1:self.size] == b'\n'
+        self.total_lines = lines if ends_with_newline else lines + 1
+        self.complete = True
+        
+    def offset_of_line(self, line: int) -> Optional[int]:
+        """Byte offset where 0-based line starts, or None if indexing has not reached it"""
+        if not self.complete and line > self.indexed_lines:
+            return None
+        if self.complete and line >= self.total_lines:
+            line = max(self.total_lines - 1, 0)
+        count = len(self.anchor_lines)
+        i = bisect_right(self.anchor_lines, line, 0, count) - 1
+        offset = self.anchor_offsets[i]
+        for _ in range(line - self.anchor_lines[i]):
+            newline = self.data.find(b'\n', offset)
+            if newline == -1:
+                break
+            offset = newline + 1
+        return offset
+        
+    def line_of_offset(self, offset: int) -> Optional[int]:
+        """0-based line containing offset, or None if indexing has not reached it"""
+        if offset > self.indexed_bytes and not self.complete:
+            return None
+        count = len(self.anchor_lines)
+        i = bisect_right(self.anchor_offsets, offset, 0, count) - 1
+        anchor = self.anchor_offsets[i]
+        return self.anchor_lines[i] + self.data[anchor:offset].count(b'\n')
+
+class MappedDocument:
+    def __init__(self, path: Path):
+        """Mapping and search shared by the text and hex documents"""
+        self.mapped = MappedFile(path)
+        self.path = self.mapped.path
+        self.size = self.mapped.size
+        self.data = self.mapped.data
+        self.index = None
+        
+    def compile_query(self, query: str, regex: bool = False, ignore_case: bool = False):
+        """Bytes pattern for the find bar"""
+        return compile_query(query, regex, ignore_case)
+        
+    def find(self, pattern, start: int, backwards: bool = False,
+             cancel_event: threading.Event = None) -> Optional[Tuple[int, int]]:
+        """Span of the next match after start (or the last one before it), wrapping around"""
+        if backwards:
+            return (find_pattern(self.data, pattern, 0, start, True, cancel_event)
+                    or find_pattern(self.data, pattern, start, self.size, True, cancel_event))
+        return (find_pattern(self.data, pattern, start, self.size, False, cancel_event)
+                or find_pattern(self.data, pattern, 0, start, False, cancel_event))
+        
+    def count(self, pattern, progress_callback=None, cancel_event: threading.Event = None) -> int:
+        """Number of non-empty matches in the whole file"""
+        total = 0
+        released = 0
+        for lower, upper in search_windows(self.data, 0, self.size):
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled("Count cancelled")
+            total += sum(1 for match in pattern.finditer(self.data, lower, upper) if match.end() > match.start())
+            released = release_pages(self.data, released, upper)
+            if progress_callback:
+                progress_callback(upper, self.size, total)
+        return total
+        
+    def close(self):
+        """Release the mapping"""
+        self.mapped.close()
+
+class TextDocument(MappedDocument):
+    jump_label = "Go to line or %:"
+    
+    def __init__(self, path: Path, encoding: str = 'utf-8'):
+        """A text file addressed by byte offset, rendered a few rows at a time"""
+        super().__init__(path)
+        self.encoding = encoding
+        self.index = LineIndex(self.data, self.size)
+        
+    def row_start(self, offset: int) -> int:
+        """Start of the row containing offset"""
+        offset = min(max(offset, 0), self.size)
+        lower = max(0, offset - MAX_ROW_BYTES)
+        newline = self.data.rfind(b'\n', lower, offset)
+        return newline + 1 if newline != -1 else lower
+        
+    def rows(self, top: int, count: int) -> Tuple[List[str], int]:
+        """Up to count rows starting at offset top, and the offset after the last one"""
+        rows = []
+        position = top
+        while len(rows) < count and position < self.size:
+            newline = self.data.find(b'\n', position, position + MAX_ROW_BYTES)
+            end = newline if newline != -1 else min(position + MAX_ROW_BYTES, self.size)
+            rows.append(self.data[position:end].decode(self.encoding, 'replace').rstrip('\r'))
+            position = end + 1 if newline != -1 else end
+        return rows, position
+        
+    def step(self, top: int, rows: int) -> int:
+        """Offset of the row that is rows away from the one at top"""
+        if rows >= 0:
+            return self.rows(top, rows)[1] if rows else top
+        position = top
+        for _ in range(-rows):
+            if position <= 0:
+                break
+            position = self.row_start(position - 1)
+        return position
+        
+    def seek_fraction(self, fraction: float) -> int:
+        """Row start nearest to a fraction of the file"""
+        return self.row_start(int(min(max(fraction, 0.0), 1.0) * self.size))
+        
+    def last_page(self, rows: int) -> int:
+        """Top offset that shows the final rows of the file"""
+        return self.step(self.size, -rows)
+        
+    def describe(self, top: int) -> str:
+        """Position of top for a status line"""
+        line = self.index.line_of_offset(top)
+        where = f"Line {line + 1:,}" if line is not None else f"Byte {top:,}"
+        if self.index.complete:
+            return f"{where} of {self.index.total_lines:,}"
+        percent = self.index.indexed_bytes * 100 // max(self.size, 1)
+        return f"{where} (indexing lines {percent}%)"
+        
+    def locate(self, value: str) -> int:
+        """Offset for a line number or percentage typed into the jump bar"""
+        try:
+            if value.endswith('%'):
+                return self.seek_fraction(float(value[:-1]) / 100)
+            line = int(value)
+        except ValueError:
+            raise ValueError("Enter a line number or a percentage")
+        offset = self.index.offset_of_line(max(line - 1, 0))
+        if offset is None:
+            raise ValueError(f"Line {line:,} not indexed yet")
+        return offset
+        
+    def match_spans(self, top: int, count: int, pattern) -> List[Tuple[int, int, int, int]]:
+        """(row, start column, end column, match offset) of matches in the rows from top"""
+        spans = []
+        position = top
+        for row in range(count):
+            if position >= self.size:
+                break
+            newline = self.data.find(b'\n', position, position + MAX_ROW_BYTES)
+            end = newline if newline != -1 else min(position + MAX_ROW_BYTES, self.size)
+            for match in pattern.finditer(self.data, position, end):
+                if match.end() > match.start():
+                    start_column = len(self.data[position:match.start()].decode(self.encoding, 'replace'))
+                    width = len(self.data[match.start():match.end()].decode(self.encoding, 'replace'))
+                    spans.append((row, start_column, start_column + width, match.start()))
+            position = end + 1 if newline != -1 else end
+        return spans
+
+class HexDocument(MappedDocument):
+    jump_label = "Go to offset or %:"
+    
+    def __init__(self, path: Path):
+        """A binary file shown as hex and ASCII, BYTES_PER_ROW bytes per row"""
+        super().__init__(path)
+        
+    def row_start(self, offset: int) -> int:
+        """Start of the row containing offset"""
+        offset = min(max(offset, 0), self.last_row())
+        return offset - offset % BYTES_PER_ROW
+        
+    def last_row(self) -> int:
+        """Offset of the final row"""
+        return max(self.size - 1, 0) // BYTES_PER_ROW * BYTES_PER_ROW
+        
+    def rows(self, top: int, count: int) -> Tuple[List[str], int]:
+        """Up to count formatted rows starting at offset top, and the offset after the last one"""
+        end = min(top + count * BYTES_PER_ROW, self.size)
+        chunk = self.data[top:end]
+        rows = [self.format_row(top + i, chunk[i:i + BYTES_PER_ROW]) for i in range(0, len(chunk), BYTES_PER_ROW)]
+        return rows, end
+        
+    def format_row(self, offset: int, row: bytes) -> str:
+        """Offset, two groups of eight hex bytes, and the printable characters"""
+        left = row[:8].hex(' ')
+        right = row[8:].hex(' ')
+        text = row.translate(ASCII_TABLE).decode('ascii')
+        return f"{offset:08x}  {left:<23}  {right:<23}  |{text}|"
+        
+    def step(self, top: int, rows: int) -> int:
+        """Offset of the row that is rows away from the one at top"""
+        return self.row_start(top + rows * BYTES_PER_ROW)
+        
+    def seek_fraction(self, fraction: float) -> int:
+        """Row start nearest to a fraction of the file"""
+        return self.row_start(int(min(max(fraction, 0.0), 1.0) * self.size))
+        
+    def last_page(self, rows: int) -> int:
+        """Top offset that shows the final rows of the file"""
+        return max(0, self.last_row() - (rows - 1) * BYTES_PER_ROW)
+        
+    def describe(self, top: int) -> str:
+        """Position of top for a status line"""
+        return f"Offset 0x{top:x} of 0x{self.size:x}"
+        
+    def locate(self, value: str) -> int:
+        """Offset for a byte offset (decimal or 0x hex) or percentage typed into the jump bar"""
+        try:
+            if value.endswith('%'):
+                return self.seek_fraction(float(value[:-1]) / 100)
+            return self.row_start(int(value, 0))
+        except ValueError:
+            raise ValueError("Enter an offset such as 4096 or 0x1000, or a percentage")
+            
+    def compile_query(self, query: str, regex: bool = False, ignore_case: bool = False):
+        """Hex byte pairs such as 'de ad be ef' match those bytes; anything else is text"""
+        if not regex and re.fullmatch(r'(?:[0-9a-fA-F]{2}\s*)+', query.strip()):
+            return re.compile(re.escape(bytes.fromhex(query)))
+        return compile_query(query, regex, ignore_case)
+        
+    def match_spans(self, top: int, count: int, pattern) -> List[Tuple[int, int, int, int]]:
+        """(row, start column, end column, match offset) of matches in the rows from top
+
+        Each matched byte highlights its hex pair and its ASCII character.
+        """
+        end = min(top + count * BYTES_PER_ROW, self.size)
+        spans = []
+        for match in pattern.finditer(self.data, top, end):
+            position = match.start()
+            while position < match.end():
+                row = (position - top) // BYTES_PER_ROW
+                row_offset = top + row * BYTES_PER_ROW
+                first = position - row_offset
+                last = min(match.end() - row_offset, BYTES_PER_ROW) - 1
+                prefix = len(f"{row_offset:08x}") + 2
+                hex_start = prefix + 3 * first + (1 if first >= 8 else 0)
+                hex_end = prefix + 3 * last + (1 if last >= 8 else 0) + 2
+                spans.append((row, hex_start, hex_end, match.start()))
+                spans.append((row, prefix + 51 + first, prefix + 52 + last, match.start()))
+                position = row_offset + last + 1
+        return spans
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Preview Cache Module
+Thread-safe LRU of recently rendered previews, bounded by count and size
+"""
+
+import threading
+from collections import OrderedDict
+
+class PreviewCache:
+    def __init__(self, max_entries: int = 64, max_bytes: int = 0):
+        """Keys should include the file's mtime and size so edits miss the cache
+
+        max_bytes bounds the total of the sizes passed to put (0 = no limit).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        
+    def get(self, key):
+        """Cached value for key, or None"""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+            
+    def put(self, key, value, size: int = 0):
+        """Store value, evicting the least recently used entries"""
+        with self.lock:
+            self.total_bytes += size - self.sizes.get(key, 0)
+            self.entries[key] = value
+            self.sizes[key] = size
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries or (
+                    self.max_bytes and self.total_bytes > self.max_bytes and len(self.entries) > 1):
+                old_key, _ = self.entries.popitem(last=False)
+                self.total_bytes -= self.sizes.pop(old_key)
+                
+    def clear(self):
+        """Forget every cached preview"""
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.total_bytes = 0
\ No newline at end of file
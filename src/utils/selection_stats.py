@@ -0,0 +1,170 @@
+"""
+Selection Stats Module
+Parallel walk totalling size, counts, dates and owners of a multi-selection
+"""
+
+import os
+import stat
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+from .jobs import JobCancelled
+
+try:
+    import pwd
+except ImportError:  # Windows
+    pwd = None
+
+@lru_cache(maxsize=256)
+def owner_name(uid: int) -> str:
+    """User name for a uid, or the number if it has none"""
+    if pwd is None:
+        return str(uid)
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+class SelectionStats:
+    """Running totals for a set of files and folders and everything below them"""
+    def __init__(self):
+        self.size = 0
+        self.files = 0
+        self.folders = 0
+        self.errors = 0
+        self.oldest = None  # earliest st_mtime seen
+        self.newest = None
+        self.owners = set()  # uids
+        self.complete = False
+        
+    def add_stat(self, st: os.stat_result):
+        """Fold one item's modification time and owner into the ranges"""
+        if self.oldest is None or st.st_mtime < self.oldest:
+            self.oldest = st.st_mtime
+        if self.newest is None or st.st_mtime > self.newest:
+            self.newest = st.st_mtime
+        self.owners.add(st.st_uid)
+        
+    def merge(self, other: 'SelectionStats'):
+        """Add the totals of a scanned directory"""
+        self.size += other.size
+        self.files += other.files
+        self.folders += other.folders
+        self.errors += other.errors
+        if other.oldest is not None and (self.oldest is None or other.oldest < self.oldest):
+            self.oldest = other.oldest
+        if other.newest is not None and (self.newest is None or other.newest > self.newest):
+            self.newest = other.newest
+        self.owners |= other.owners
+        
+    def copy(self) -> 'SelectionStats':
+        """Snapshot safe to hand to another thread"""
+        snapshot = SelectionStats()
+        snapshot.merge(self)
+        snapshot.complete = self.complete
+        return snapshot
+        
+    def owner_names(self, limit: int = 4) -> str:
+        """Comma-separated owners, abbreviated past limit"""
+        names = sorted(owner_name(uid) for uid in self.owners)
+        if len(names) > limit:
+            return f"{', '.join(names[:limit])} and {len(names) - limit} more"
+        return ", ".join(names)
+
+class SelectionWalker:
+    def __init__(self, workers: int = None):
+        """Scan directories on a thread pool; scandir and stat release the GIL"""
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        
+    def walk(self, paths: Iterable[Path], progress_callback=None, cancel_event: threading.Event = None,
+             progress_interval: float = 0.2) -> SelectionStats:
+        """Totals for paths and everything below them
+
+        Symlinks are not followed and hardlinked files are counted once.
+        progress_callback(snapshot) is called from this thread at most
+        every progress_interval seconds with the totals so far.
+        """
+        stats = SelectionStats()
+        seen_links = set()
+        roots = []
+        for path in paths:
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                stats.errors += 1
+                continue
+            stats.add_stat(st)
+            if stat.S_ISDIR(st.st_mode):
+                stats.folders += 1
+                roots.append(os.fspath(path))
+            else:
+                self.add_file(stats, st, seen_links)
+                
+        last_report = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self.scan_directory, root) for root in roots}
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise JobCancelled("Properties scan cancelled")
+                for future in done:
+                    part, subdirs, linked = future.result()
+                    stats.merge(part)
+                    for inode, size in linked:
+                        if inode not in seen_links:
+                            seen_links.add(inode)
+                            stats.size += size
+                            stats.files += 1
+                    pending.update(pool.submit(self.scan_directory, subdir) for subdir in subdirs)
+                now = time.monotonic()
+                if progress_callback and now - last_report >= progress_interval:
+                    last_report = now
+                    progress_callback(stats.copy())
+        stats.complete = True
+        return stats
+        
+    def add_file(self, stats: SelectionStats, st: os.stat_result, seen_links: set):
+        """Count a selected file, skipping further names of a hardlinked one"""
+        if st.st_nlink > 1 and not stat.S_ISLNK(st.st_mode):
+            inode = (st.st_dev, st.st_ino)
+            if inode in seen_links:
+                return
+            seen_links.add(inode)
+        stats.size += st.st_size
+        stats.files += 1
+        
+    def scan_directory(self, directory: str):
+        """Totals of the entries directly in directory, its subdirectories, and its hardlinked files
+
+        Hardlinked files are returned as ((dev, ino), size) for the caller
+        to count once across the whole walk.
+        """
+        part = SelectionStats()
+        subdirs = []
+        linked = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        part.errors += 1
+                        continue
+                    part.add_stat(st)
+                    if stat.S_ISDIR(st.st_mode):
+                        part.folders += 1
+                        subdirs.append(entry.path)
+                    elif st.st_nlink > 1 and not stat.S_ISLNK(st.st_mode):
+                        linked.append(((st.st_dev, st.st_ino), st.st_size))
+                    else:
+                        part.size += st.st_size
+                        part.files += 1
+        except OSError:
+            part.errors += 1
+        return part, subdirs, linked
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Syntax Module
+Line-at-a-time regex tokenizers for highlighting the visible rows of a preview
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+MAX_TOKENIZED_CHARS = 4000  # the rest of a very long row is left plain
+
+# Each group name is the token type; a match's lastgroup says which one hit
+TOKENIZERS = {
+    'python': re.compile(r'''
+        (?P<comment>\#.*$)
+        | (?P<string>[rRbBuUfF]{0,2}(?:'(?:\\.|[^'\\])*'?|"(?:\\.|[^"\\])*"?))
+        | (?P<keyword>\b(?:False|None|True|and|as|assert|async|await|break|class|continue|def|del
+                        |elif|else|except|finally|for|from|global|if|import|in|is|lambda|nonlocal
+                        |not|or|pass|raise|return|try|while|with|yield|match|case)\b)
+        | (?P<builtin>\b(?:self|cls|print|len|range|open|str|int|float|bool|list|dict|set|tuple
+                        |bytes|object|type|super|isinstance|getattr|setattr|hasattr|Exception)\b)
+        | (?P<decorator>^\s*@[\w.]+)
+        | (?P<number>\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*\.?\d*(?:[eE][+-]?\d+)?j?)\b)
+        ''', re.VERBOSE),
+    'json': re.compile(r'''
+        (?P<key>"(?:\\.|[^"\\])*"(?=\s*:))
+        | (?P<string>"(?:\\.|[^"\\])*"?)
+        | (?P<keyword>\b(?:true|false|null)\b)
+        | (?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)
+        ''', re.VERBOSE),
+    'yaml': re.compile(r'''
+        (?P<comment>(?:^|(?<=\s))\#.*$)
+        | (?P<keyword>^(?:---|\.\.\.)\s*$|\b(?:true|false|null|yes|no|on|off|True|False|Null)\b)
+        | (?P<key>^[\s-]*[^\s#'"\-][^:#]*?(?=:(?:\s|$)))
+        | (?P<string>'(?:''|[^'])*'?|"(?:\\.|[^"\\])*"?)
+        | (?P<builtin>[&*][\w-]+|![\w!/-]*)
+        | (?P<number>(?<![\w.])-?\d+(?:\.\d+)?(?![\w.]))
+        ''', re.VERBOSE),
+    'shell': re.compile(r'''
+        (?P<comment>(?:^|(?<=\s))\#.*$)
+        | (?P<string>'[^']*'?|"(?:\\.|[^"\\])*"?)
+        | (?P<variable>\$\{[^}]*\}?|\$[\w@*#?$!-])
+        | (?P<keyword>\b(?:if|then|else|elif|fi|for|while|until|do|done|case|esac|in|function
+                        |return|local|export|readonly|select|break|continue|exit|source)\b)
+        | (?P<builtin>\b(?:echo|printf|cd|test|set|unset|shift|read|eval|exec|trap)\b)
+        ''', re.VERBOSE),
+    'log': re.compile(r'''
+        (?P<timestamp>\b\d{4}-\d{2}-\d{2}[T\ ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?
+                      |\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b)
+        | (?P<error>\b(?:ERROR|ERR|FATAL|CRITICAL|SEVERE|PANIC|Traceback|Exception)\b)
+        | (?P<warning>\b(?:WARN|WARNING)\b)
+        | (?P<info>\b(?:INFO|DEBUG|TRACE|NOTICE)\b)
+        | (?P<string>"(?:\\.|[^"\\])*")
+        ''', re.VERBOSE),
+}
+
+LANGUAGE_SUFFIXES = {
+    '.py': 'python', '.pyw': 'python', '.pyi': 'python',
+    '.json': 'json', '.jsonl': 'json', '.ndjson': 'json', '.geojson': 'json',
+    '.yaml': 'yaml', '.yml': 'yaml',
+    '.sh': 'shell', '.bash': 'shell', '.zsh': 'shell', '.ksh': 'shell',
+    '.log': 'log', '.out': 'log', '.err': 'log',
+}
+
+SHELL_NAMES = {'.bashrc', '.bash_profile', '.profile', '.zshrc'}
+
+ROTATED_LOG = re.compile(r'\.log(?:\.\d+)?(?:\.gz)?$|\.log[-_.]\d{4,}')
+
+def language_for(path: Path) -> Optional[str]:
+    """Tokenizer name for a file, from its suffix or name"""
+    path = Path(path)
+    language = LANGUAGE_SUFFIXES.get(path.suffix.lower())
+    if language:
+        return language
+    if path.name in SHELL_NAMES:
+        return 'shell'
+    if ROTATED_LOG.search(path.name.lower()):
+        return 'log'
+    return None
+
+def tokenize(language: str, row: str) -> List[Tuple[str, int, int]]:
+    """(token type, start column, end column) for each token in one row"""
+    return [(match.lastgroup, match.start(), match.end())
+            for match in TOKENIZERS[language].finditer(row, 0, MAX_TOKENIZED_CHARS)
+            if match.end() > match.start()]
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Throttle Utility Module
+Token-bucket bandwidth limiting and background I/O priority
+"""
+
+import os
+import sys
+import time
+import threading
+
+# ioprio_set(2) is not wrapped by the os module, so it is called through
+# syscall(2); the numbers are per-architecture
+IOPRIO_SYSCALLS = {
+    'x86_64': 251,
+    'i686': 289,
+    'i386': 289,
+    'aarch64': 30,
+    'armv7l': 314,
+    'ppc64le': 273,
+}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASS_IDLE = 3
+
+class TokenBucket:
+    def __init__(self, rate: int = 0, burst: int = None):
+        """Create a bucket refilled at `rate` bytes per second (0 = unlimited)"""
+        self.lock = threading.Lock()
+        self.rate = 0
+        self.burst = 0
+        self.tokens = 0.0
+        self.last_refill = time.monotonic()
+        self.set_rate(rate, burst)
+        
+    def set_rate(self, rate: int, burst: int = None):
+        """Change the refill rate; takes effect for the next consume"""
+        with self.lock:
+            self.rate = max(0, int(rate or 0))
+            # Default burst of a quarter second keeps writes smooth without
+            # letting an idle bucket dump a huge backlog at once
+            self.burst = burst if burst else max(self.rate // 4, 64 * 1024)
+            self.tokens = min(self.tokens, self.burst)
+            self.last_refill = time.monotonic()
+            
+    @property
+    def unlimited(self) -> bool:
+        """True when the bucket never blocks"""
+        return self.rate <= 0
+        
+    def consume(self, amount: int, cancel_event: threading.Event = None) -> bool:
+        """Block until `amount` bytes may pass; False if cancelled while waiting"""
+        while True:
+            with self.lock:
+                if self.rate <= 0:
+                    return True
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                # Requests larger than the burst are let through once the
+                # bucket is full, leaving it in debt for the remainder
+                needed = min(amount, self.burst)
+                if self.tokens >= needed:
+                    self.tokens -= amount
+                    return True
+                wait = (needed - self.tokens) / self.rate
+                
+            if cancel_event is not None:
+                if cancel_event.wait(min(wait, 0.25)):
+                    return False
+            else:
+                time.sleep(min(wait, 0.25))
+
+class BandwidthLimiter:
+    def __init__(self, *buckets: TokenBucket):
+        """Combine several buckets (e.g. per-job and global) into one gate"""
+        self.buckets = [bucket for bucket in buckets if bucket is not None]
+        
+    def consume(self, amount: int, cancel_event: threading.Event = None) -> bool:
+        """Take `amount` bytes from every bucket in turn"""
+        for bucket in self.buckets:
+            if not bucket.consume(amount, cancel_event):
+                return False
+        return True
+
+def lower_current_thread_priority() -> bool:
+    """Drop CPU and I/O priority of the calling thread for background work"""
+    lowered = False
+    
+    # Only on Linux does setpriority() with a thread id affect just that
+    # thread; elsewhere it would renice the whole process, UI included, and
+    # an unprivileged user could never raise it back
+    if sys.platform.startswith('linux'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+            lowered = True
+        except (OSError, AttributeError):
+            pass
+        lowered = _set_idle_io_priority() or lowered
+    elif sys.platform == 'win32':
+        lowered = _set_windows_background_mode() or lowered
+        
+    return lowered
+
+def _set_idle_io_priority() -> bool:
+    """Put the calling thread in the idle I/O scheduling class"""
+    try:
+        import ctypes
+        
+        syscall_nr = IOPRIO_SYSCALLS.get(os.uname().machine)
+        if syscall_nr is None:
+            return False
+        libc = ctypes.CDLL(None, use_errno=True)
+        ioprio = IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT
+        return libc.syscall(syscall_nr, IOPRIO_WHO_PROCESS, threading.get_native_id(), ioprio) == 0
+    except Exception:
+        return False
+
+def _set_windows_background_mode() -> bool:
+    """Enter THREAD_MODE_BACKGROUND_BEGIN, lowering CPU, I/O and memory priority"""
+    try:
+        import ctypes
+        
+        kernel32 = ctypes.windll.kernel32
+        return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 0x00010000))
+    except Exception:
+        return False
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Top Files Module
+Streaming scandir walk that keeps the K largest or oldest files in a bounded heap
+"""
+
+import os
+import time
+import heapq
+import threading
+from pathlib import Path
+from typing import List
+
+from .jobs import JobCancelled
+
+TOP_FILE_ORDERS = {
+    'size': "Largest",
+    'age': "Oldest",
+    'size_age': "Largest x oldest",
+}
+
+class TopFile:
+    """A ranked file with the stat fields the results show"""
+    __slots__ = ('path', 'size', 'mtime', 'score')
+    
+    def __init__(self, path: Path, size: int, mtime: float, score: float):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.score = score
+
+class TopFilesFinder:
+    def __init__(self, k: int = 100, order: str = 'size', follow_hidden: bool = True,
+                 report_interval: float = 0.25):
+        if order not in TOP_FILE_ORDERS:
+            raise ValueError(f"Unknown order: {order}")
+        self.k = k
+        self.order = order
+        self.follow_hidden = follow_hidden
+        self.report_interval = report_interval
+        self.scanned = 0
+        
+    def score(self, size: int, mtime: float, now: float) -> float:
+        """Ranking value; larger ranks higher"""
+        age = max(now - mtime, 0.0)
+        if self.order == 'size':
+            return size
+        if self.order == 'age':
+            return age
+        return size * age
+        
+    def find(self, directory: Path, partial_callback=None,
+             cancel_event: threading.Event = None) -> List[TopFile]:
+        """Walk directory and return the top K files, best first
+
+        Memory stays O(K): a min-heap holds the current top K and a file
+        only enters by beating its smallest member. partial_callback(files,
+        scanned) receives a sorted snapshot every report_interval seconds.
+        """
+        heap = []  # (score, tiebreak, size, mtime, path)
+        now = time.time()
+        last_report = time.monotonic()
+        self.scanned = 0
+        stack = [str(directory)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        # Per entry, so a folder of millions of files still stops promptly
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise JobCancelled("Top files scan cancelled")
+                        if not self.follow_hidden and entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        self.scanned += 1
+                        score = self.score(st.st_size, st.st_mtime, now)
+                        if len(heap) < self.k:
+                            heapq.heappush(heap, (score, self.scanned, st.st_size, st.st_mtime, entry.path))
+                        elif score > heap[0][0]:
+                            heapq.heapreplace(heap, (score, self.scanned, st.st_size, st.st_mtime, entry.path))
+            except OSError:
+                continue
+            if partial_callback and time.monotonic() - last_report >= self.report_interval:
+                last_report = time.monotonic()
+                partial_callback(self.ranked(heap), self.scanned)
+        return self.ranked(heap)
+        
+    @staticmethod
+    def ranked(heap) -> List[TopFile]:
+        """Heap contents as TopFile objects, best first"""
+        return [TopFile(Path(path), size, mtime, score)
+                for score, _, size, mtime, path in sorted(heap, reverse=True)]
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Trash Module
+freedesktop.org-compatible trash with rename-based delete, restore and purge
+"""
+
+import errno
+import os
+import sys
+import stat
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from urllib.parse import quote, unquote
+
+from .throttle import TokenBucket
+from .jobs import JobCancelled
+
+class TrashedItem:
+    """One entry of a trash directory, described by its .trashinfo file"""
+    def __init__(self, trash_dir: Path, name: str, original_path: Path, deletion_date: str):
+        self.trash_dir = trash_dir
+        self.name = name
+        self.original_path = original_path
+        self.deletion_date = deletion_date
+        
+    @property
+    def files_path(self) -> Path:
+        """Where the trashed data lives"""
+        return self.trash_dir / 'files' / self.name
+        
+    @property
+    def info_path(self) -> Path:
+        """The item's .trashinfo metadata file"""
+        return self.trash_dir / 'info' / f"{self.name}.trashinfo"
+
+class Trash:
+    def __init__(self, purge_rate: int = 2000):
+        """purge_rate limits emptying to that many entries per second (0 = unlimited)"""
+        self.uid = os.getuid() if hasattr(os, 'getuid') else 0
+        data_home = os.environ.get('XDG_DATA_HOME') or str(Path.home() / '.local' / 'share')
+        self.home_trash = Path(data_home) / 'Trash'
+        self.purge_bucket = TokenBucket(purge_rate, burst=max(purge_rate // 4, 1))
+        self.known_trash_dirs = {self.home_trash}
+        
+    @staticmethod
+    def is_supported() -> bool:
+        """The freedesktop layout is used on Linux and other Unix desktops"""
+        return os.name == 'posix' and sys.platform != 'darwin'
+        
+    def trash(self, path: Path) -> TrashedItem:
+        """Move path into the trash with a single rename"""
+        path = Path(os.path.abspath(path))
+        trash_dir, topdir = self.trash_dir_for(path)
+        files_dir = trash_dir / 'files'
+        info_dir = trash_dir / 'info'
+        files_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        info_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        
+        # Home trash stores absolute paths; per-mount trashes store paths
+        # relative to the mount so the volume can be mounted elsewhere
+        stored_path = path if topdir is None else path.relative_to(topdir)
+        deletion_date = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        info = (f"[Trash Info]\nPath={quote(str(stored_path))}\n"
+                f"DeletionDate={deletion_date}\n")
+        
+        name, info_path = self._reserve_info(info_dir, path.name, info)
+        try:
+            os.rename(path, files_dir / name)
+        except OSError:
+            os.unlink(info_path)
+            raise
+        return TrashedItem(trash_dir, name, path, deletion_date)
+        
+    def _reserve_info(self, info_dir: Path, base_name: str, info: str):
+        """Atomically claim a unique trash name by creating its .trashinfo"""
+        stem, suffix = os.path.splitext(base_name)
+        counter = 1
+        name = base_name
+        while True:
+            info_path = info_dir / f"{name}.trashinfo"
+            try:
+                fd = os.open(info_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                counter += 1
+                name = f"{stem}.{counter}{suffix}"
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(info)
+            return name, info_path
+            
+    def trash_dir_for(self, path: Path):
+        """Pick the home trash or a per-mount trash on path's device
+
+        Returns (trash_dir, topdir); topdir is None for the home trash.
+        """
+        device = os.lstat(path).st_dev
+        home_probe = self.home_trash
+        while not home_probe.exists() and home_probe.parent != home_probe:
+            home_probe = home_probe.parent
+        try:
+            if os.stat(home_probe).st_dev == device:
+                return self.home_trash, None
+        except OSError:
+            pass
+            
+        topdir = self.mount_point(path)
+        shared = topdir / '.Trash'
+        try:
+            shared_stat = os.lstat(shared)
+            # The spec requires a sticky, non-symlink shared .Trash directory
+            if stat.S_ISDIR(shared_stat.st_mode) and shared_stat.st_mode & stat.S_ISVTX:
+                trash_dir = shared / str(self.uid)
+                self.known_trash_dirs.add(trash_dir)
+                return trash_dir, topdir
+        except OSError:
+            pass
+        trash_dir = topdir / f".Trash-{self.uid}"
+        self.known_trash_dirs.add(trash_dir)
+        return trash_dir, topdir
+        
+    @staticmethod
+    def mount_point(path: Path) -> Path:
+        """Walk up from path until the device changes"""
+        path = Path(os.path.abspath(path))
+        device = os.lstat(path).st_dev
+        while path.parent != path:
+            if os.lstat(path.parent).st_dev != device:
+                return path
+            path = path.parent
+        return path
+        
+    def discover_mounted_trash_dirs(self):
+        """Add per-mount trash directories of currently mounted volumes"""
+        try:
+            with open('/proc/self/mounts', 'r', encoding='utf-8') as f:
+                mount_points = [line.split()[1].replace('\\040', ' ') for line in f if line.strip()]
+        except OSError:
+            return
+        for mount_point in mount_points:
+            for candidate in (Path(mount_point) / '.Trash' / str(self.uid),
+                              Path(mount_point) / f".Trash-{self.uid}"):
+                try:
+                    if (candidate / 'info').is_dir():
+                        self.known_trash_dirs.add(candidate)
+                except OSError:
+                    pass
+                    
+    def list_items(self) -> List[TrashedItem]:
+        """Read .trashinfo files from the home trash and per-mount trashes"""
+        self.discover_mounted_trash_dirs()
+        items = []
+        for trash_dir in sorted(self.known_trash_dirs):
+            info_dir = trash_dir / 'info'
+            if not info_dir.is_dir():
+                continue
+            topdir = None if trash_dir == self.home_trash else self._topdir_of(trash_dir)
+            with os.scandir(info_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith('.trashinfo'):
+                        continue
+                    item = self._parse_info(trash_dir, topdir, entry.path, entry.name[:-len('.trashinfo')])
+                    if item is not None:
+                        items.append(item)
+        return items
+        
+    @staticmethod
+    def _topdir_of(trash_dir: Path) -> Path:
+        """Mount directory of a .Trash-uid or .Trash/uid trash"""
+        return trash_dir.parent.parent if trash_dir.parent.name == '.Trash' else trash_dir.parent
+        
+    @staticmethod
+    def _parse_info(trash_dir: Path, topdir: Path, info_path: str, name: str):
+        """Parse a .trashinfo file; None if it is malformed"""
+        original = None
+        deletion_date = ''
+        try:
+            with open(info_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    key, _, value = line.strip().partition('=')
+                    if key == 'Path':
+                        original = Path(unquote(value))
+                    elif key == 'DeletionDate':
+                        deletion_date = value
+        except (OSError, UnicodeDecodeError):
+            return None
+        if original is None:
+            return None
+        if topdir is not None and not original.is_absolute():
+            original = topdir / original
+        return TrashedItem(trash_dir, name, original, deletion_date)
+        
+    def restore(self, item: TrashedItem, destination: Path = None) -> Path:
+        """Rename a trashed item back to its original (or a new) location"""
+        target = Path(destination) if destination else item.original_path
+        if os.path.lexists(target):
+            raise FileExistsError(f"Cannot restore, {target} already exists")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(item.files_path, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(str(item.files_path), str(target))
+        os.unlink(item.info_path)
+        return target
+        
+    def purge(self, items: List[TrashedItem] = None, progress_callback=None,
+              cancel_event: threading.Event = None) -> int:
+        """Permanently delete trashed items (all by default), throttled
+
+        Data is removed before its .trashinfo, so an interrupted purge
+        leaves nothing that looks restorable but isn't.
+        """
+        if items is None:
+            items = self.list_items()
+        removed = 0
+        for index, item in enumerate(items):
+            if os.path.lexists(item.files_path):
+                removed += self.remove_tree(item.files_path, cancel_event)
+            try:
+                os.unlink(item.info_path)
+            except FileNotFoundError:
+                pass
+            if progress_callback:
+                progress_callback(index + 1, len(items))
+        return removed
+        
+    def remove_tree(self, path: Path, cancel_event: threading.Event = None) -> int:
+        """Delete a file or tree bottom-up, pacing unlinks with the purge bucket"""
+        removed = 0
+        if os.path.islink(path) or not os.path.isdir(path):
+            self._pace(cancel_event)
+            os.unlink(path)
+            return 1
+            
+        stack = [(str(path), False)]
+        while stack:
+            current, listed = stack.pop()
+            if listed:
+                self._pace(cancel_event)
+                os.rmdir(current)
+                removed += 1
+                continue
+            stack.append((current, True))
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, False))
+                    else:
+                        self._pace(cancel_event)
+                        try:
+                            os.unlink(entry.path)
+                        except PermissionError:
+                            # Read-only directories need write permission to unlink
+                            os.chmod(current, stat.S_IRWXU)
+                            os.unlink(entry.path)
+                        removed += 1
+        return removed
+        
+    def _pace(self, cancel_event: threading.Event = None):
+        """Wait for a purge token, raising JobCancelled if cancelled meanwhile"""
+        if not self.purge_bucket.consume(1, cancel_event):
+            raise JobCancelled("Purge cancelled")
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled("Purge cancelled")
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Treemap Module
+Squarified treemap layout with level-of-detail merging of small items
+"""
+
+import os
+import threading
+from typing import List
+
+from .jobs import JobCancelled
+
+class TreemapRect:
+    """One laid-out rectangle; path is None for a merged block of small items"""
+    __slots__ = ('x', 'y', 'width', 'height', 'label', 'path', 'size', 'is_dir', 'depth', 'merged')
+    
+    def __init__(self, x, y, width, height, label, path, size, is_dir, depth, merged=0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.label = label
+        self.path = path
+        self.size = size
+        self.is_dir = is_dir
+        self.depth = depth
+        self.merged = merged
+
+def squarify(areas: List[float], x: float, y: float, width: float, height: float):
+    """Lay out areas (sorted largest first, summing to width*height) as near-square rectangles"""
+    rects = []
+    index = 0
+    while index < len(areas):
+        side = min(width, height)
+        if side <= 0:
+            break
+        row = [areas[index]]
+        index += 1
+        while index < len(areas) and _worst(row + [areas[index]], side) <= _worst(row, side):
+            row.append(areas[index])
+            index += 1
+            
+        # Place the row as a strip along the shorter side
+        thickness = sum(row) / side
+        if width >= height:
+            offset = y
+            for area in row:
+                length = area / thickness
+                rects.append((x, offset, thickness, length))
+                offset += length
+            x += thickness
+            width -= thickness
+        else:
+            offset = x
+            for area in row:
+                length = area / thickness
+                rects.append((offset, y, length, thickness))
+                offset += length
+            y += thickness
+            height -= thickness
+    return rects
+
+def _worst(row: List[float], side: float) -> float:
+    """Worst aspect ratio of a row laid along side"""
+    total = sum(row)
+    return max(max(row) * side * side / (total * total), total * total / (side * side * min(row)))
+
+class TreemapLayout:
+    def __init__(self, size_engine, min_pixels: int = 6, header: int = 14,
+                 padding: int = 2, max_rects: int = 20000):
+        """Items smaller than min_pixels x min_pixels are merged into one block"""
+        self.size_engine = size_engine
+        self.min_pixels = min_pixels
+        self.header = header
+        self.padding = padding
+        self.max_rects = max_rects
+        
+    def layout(self, directory, width: int, height: int,
+               cancel_event: threading.Event = None) -> List[TreemapRect]:
+        """Rectangles for directory drawn into width x height pixels
+
+        Folder sizes come from the size engine's memoized subtotals, so
+        only folders large enough to show their contents are listed.
+        """
+        rects = []
+        self._layout_directory(os.path.abspath(directory), 0, 0, width, height, 0, rects, cancel_event)
+        return rects
+        
+    def _layout_directory(self, directory: str, x, y, width, height, depth,
+                          rects: List[TreemapRect], cancel_event):
+        """Lay out one folder's children into a rectangle, recursing into large folders"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled("Treemap layout cancelled")
+        items = self.children(directory, cancel_event)
+        total = sum(size for _, _, size, _ in items)
+        if not total:
+            return
+            
+        # Level of detail: anything under the pixel threshold joins one block
+        area = width * height
+        min_area = self.min_pixels * self.min_pixels
+        visible = []
+        merged_size = 0
+        merged_count = 0
+        for item in sorted(items, key=lambda item: item[2], reverse=True):
+            if not item[2]:
+                continue
+            if item[2] * area / total >= min_area:
+                visible.append(item)
+            else:
+                merged_size += item[2]
+                merged_count += 1
+        if merged_count:
+            # squarify() expects areas largest first, so the block keeps that order
+            index = next((i for i, item in enumerate(visible) if item[2] < merged_size), len(visible))
+            visible.insert(index, (f"{merged_count} smaller items", None, merged_size, False))
+            
+        areas = [size * area / total for _, _, size, _ in visible]
+        for (name, path, size, is_dir), (rx, ry, rw, rh) in zip(visible, squarify(areas, x, y, width, height)):
+            if len(rects) >= self.max_rects:
+                return
+            rects.append(TreemapRect(rx, ry, rw, rh, name, path, size, is_dir, depth,
+                                     merged_count if path is None else 0))
+            inner_top = self.header if rh > self.header + 3 * self.min_pixels else self.padding
+            inner_width = rw - 2 * self.padding
+            inner_height = rh - inner_top - self.padding
+            if is_dir and inner_width >= 2 * self.min_pixels and inner_height >= 2 * self.min_pixels:
+                self._layout_directory(path, rx + self.padding, ry + inner_top,
+                                       inner_width, inner_height, depth + 1, rects, cancel_event)
+                
+    def children(self, directory: str, cancel_event=None):
+        """(name, path, size, is_dir) for the files and folders directly in directory"""
+        total = self.size_engine.cached(directory)
+        if total is None:
+            total = self.size_engine.directory_size(directory, cancel_event=cancel_event)
+        items = []
+        for subdir in total.subdirs:
+            subtotal = self.size_engine.cached(subdir)
+            if subtotal is None:
+                subtotal = self.size_engine.directory_size(subdir, cancel_event=cancel_event)
+            items.append((os.path.basename(subdir), subdir, subtotal.size, True))
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            items.append((entry.name, entry.path, entry.stat(follow_symlinks=False).st_size, False))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return items
\ No newline at end of file
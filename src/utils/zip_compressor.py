@@ -0,0 +1,271 @@
+"""
+Zip Compressor Module
+Parallel deflate of zip members, streamed into the archive in order
+"""
+
+import os
+import stat
+import struct
+import time
+import zlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+from .jobs import JobCancelled
+
+# Already-compressed formats gain nothing from deflate and are stored
+STORE_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.lz4', '.7z', '.rar', '.br',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif',
+    '.mp3', '.aac', '.ogg', '.opus', '.flac', '.m4a',
+    '.mp4', '.mkv', '.avi', '.mov', '.webm',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub', '.jar', '.apk', '.whl', '.woff2',
+}
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+UTF8_FLAG = 0x800
+DEFLATE_WINDOW = 32 * 1024
+
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_RECORD = struct.Struct('<IHHHHIIH')
+ZIP64_END_RECORD = struct.Struct('<IQHHIIQQQQ')
+ZIP64_LOCATOR = struct.Struct('<IIQI')
+
+class ZipMember:
+    """A file or folder to be written, with its place in the archive once written"""
+    def __init__(self, path: Path, arcname: str, st: os.stat_result, is_dir: bool):
+        self.path = path
+        self.arcname = arcname
+        self.mode = st.st_mode
+        self.size = 0 if is_dir else st.st_size
+        self.mtime = st.st_mtime
+        self.is_dir = is_dir
+        self.method = ZIP_STORED
+        self.zip64 = False
+        self.offset = 0
+        self.crc = 0
+        self.compressed_size = 0
+
+class ZipCompressor:
+    def __init__(self, level: int = 6, workers: int = None, chunk_size: int = 1024 * 1024,
+                 store_extensions=STORE_EXTENSIONS):
+        """level 0 stores everything; 1-9 are zlib levels"""
+        self.level = level
+        # zlib releases the GIL while deflating, so threads scale across cores
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.store_extensions = store_extensions
+        
+    def compress(self, source: Path, output: Path, progress_callback=None,
+                 cancel_event: threading.Event = None) -> int:
+        """Zip the contents of folder source into output; returns the archive size
+
+        Each file is cut into chunks deflated in parallel, each primed with
+        the previous 32 KB as a dictionary (as pigz does), and the pieces
+        are written in order as one deflate stream. The archive is built
+        under a temporary name and renamed into place when complete.
+        """
+        source = Path(source)
+        output = Path(output)
+        members = self.plan(source)
+        total_bytes = sum(member.size for member in members)
+        temp_path = output.with_name(f".{output.name}.part")
+        try:
+            with open(temp_path, 'wb') as out, ThreadPoolExecutor(max_workers=self.workers) as pool:
+                self.write_members(out, pool, members, total_bytes, progress_callback, cancel_event)
+                self.write_central_directory(out, members)
+                archive_size = out.tell()
+            os.replace(temp_path, output)
+        except BaseException:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+        return archive_size
+        
+    def plan(self, source: Path) -> List[ZipMember]:
+        """Folders and regular files under source, in walk order"""
+        members = []
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            relative = Path(dirpath).relative_to(source)
+            if dirpath != str(source):
+                members.append(ZipMember(Path(dirpath), f"{relative.as_posix()}/", os.stat(dirpath), True))
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                members.append(ZipMember(path, (relative / name).as_posix(), st, False))
+        return members
+        
+    def write_members(self, out, pool, members: List[ZipMember], total_bytes: int,
+                      progress_callback=None, cancel_event: threading.Event = None):
+        """Feed chunks to the pool and write results in submission order"""
+        window = deque()
+        max_in_flight = self.workers * 2
+        done_bytes = 0
+        last_report = 0.0
+        for member in members:
+            if member.is_dir:
+                window.append((member, b'', None, True, True))
+            else:
+                member.method = self.method_for(member)
+                member.zip64 = self.max_compressed_size(member) >= ZIP64_LIMIT
+                for chunk, future, first, last in self.chunks(member, pool, cancel_event):
+                    window.append((member, chunk, future, first, last))
+                    while len(window) > max_in_flight:
+                        done_bytes += self.write_chunk(out, *window.popleft())
+            while window and (window[0][2] is None or window[0][2].done()):
+                done_bytes += self.write_chunk(out, *window.popleft())
+            if progress_callback and time.monotonic() - last_report >= 0.1:
+                last_report = time.monotonic()
+                progress_callback(done_bytes, total_bytes)
+        while window:
+            done_bytes += self.write_chunk(out, *window.popleft())
+        if progress_callback:
+            progress_callback(done_bytes, total_bytes)
+            
+    def method_for(self, member: ZipMember) -> int:
+        """Deflate unless the level is 0 or the file type is already compressed"""
+        if self.level == 0 or member.path.suffix.lower() in self.store_extensions:
+            return ZIP_STORED
+        return ZIP_DEFLATED
+        
+    def max_compressed_size(self, member: ZipMember) -> int:
+        """Upper bound of a member's stored size: zlib's deflateBound with each chunk's flush overhead"""
+        size = member.size
+        if member.method == ZIP_STORED:
+            return size
+        chunks = size // self.chunk_size + 1
+        return size + (size >> 12) + (size >> 14) + (size >> 25) + 13 * chunks
+        
+    def chunks(self, member: ZipMember, pool, cancel_event: threading.Event = None):
+        """Yield (raw chunk, deflate future or None, first, last) for one file
+
+        A file that grew or shrank since plan() is written as read, with
+        member.size corrected before its headers are patched.
+        """
+        with open(member.path, 'rb') as f:
+            chunk = f.read(self.chunk_size)
+            read = len(chunk)
+            first = True
+            previous_tail = b''
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled("Compression cancelled")
+                next_chunk = f.read(self.chunk_size) if chunk else b''
+                read += len(next_chunk)
+                last = not next_chunk
+                if last and read != member.size:
+                    member.size = read
+                    if not member.zip64 and self.max_compressed_size(member) >= ZIP64_LIMIT:
+                        raise OSError(f"{member.path} grew past 4 GB while being compressed")
+                future = None
+                if member.method == ZIP_DEFLATED:
+                    future = pool.submit(self.deflate, chunk, previous_tail, last)
+                yield chunk, future, first, last
+                if last:
+                    return
+                previous_tail = chunk[-DEFLATE_WINDOW:]
+                chunk = next_chunk
+                first = False
+                
+    def deflate(self, chunk: bytes, dictionary: bytes, last: bool) -> bytes:
+        """Raw-deflate one chunk; non-final chunks end on a byte boundary with a sync flush"""
+        if dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        data = compressor.compress(chunk)
+        return data + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        
+    def write_chunk(self, out, member: ZipMember, chunk: bytes, future, first: bool, last: bool) -> int:
+        """Write one chunk of a member, with its local header first and sizes patched in last"""
+        if first:
+            member.offset = out.tell()
+            out.write(self.local_header(member))
+        data = future.result() if future is not None else chunk
+        out.write(data)
+        member.crc = zlib.crc32(chunk, member.crc)
+        member.compressed_size += len(data)
+        if last and not member.is_dir:
+            end = out.tell()
+            out.seek(member.offset + 14)
+            if member.zip64:
+                out.write(struct.pack('<III', member.crc, ZIP64_LIMIT, ZIP64_LIMIT))
+                out.seek(member.offset + LOCAL_HEADER.size + len(member.arcname.encode('utf-8')) + 4)
+                out.write(struct.pack('<QQ', member.size, member.compressed_size))
+            else:
+                out.write(struct.pack('<III', member.crc, member.compressed_size, member.size))
+            out.seek(end)
+        return len(chunk)
+        
+    def local_header(self, member: ZipMember) -> bytes:
+        """Local file header with placeholder CRC and sizes"""
+        name = member.arcname.encode('utf-8')
+        dos_time, dos_date = self.dos_datetime(member.mtime)
+        extra = b''
+        if member.zip64:
+            extra = struct.pack('<HHQQ', 1, 16, 0, 0)
+        version = 45 if member.zip64 else 20
+        return LOCAL_HEADER.pack(0x04034b50, version, UTF8_FLAG, member.method, dos_time, dos_date,
+                                 0, 0, 0, len(name), len(extra)) + name + extra
+        
+    def write_central_directory(self, out, members: List[ZipMember]):
+        """Central directory and end records, with zip64 records when limits are exceeded"""
+        start = out.tell()
+        for member in members:
+            name = member.arcname.encode('utf-8')
+            dos_time, dos_date = self.dos_datetime(member.mtime)
+            zip64_fields = []
+            size = member.size
+            compressed_size = member.compressed_size
+            offset = member.offset
+            if size >= ZIP64_LIMIT or compressed_size >= ZIP64_LIMIT:
+                zip64_fields += [size, compressed_size]
+                size = compressed_size = ZIP64_LIMIT
+            if offset >= ZIP64_LIMIT:
+                zip64_fields.append(offset)
+                offset = ZIP64_LIMIT
+            extra = b''
+            if zip64_fields:
+                extra = struct.pack(f'<HH{len(zip64_fields)}Q', 1, 8 * len(zip64_fields), *zip64_fields)
+            version = 45 if zip64_fields or member.zip64 else 20
+            external = (member.mode & 0xFFFF) << 16
+            if member.is_dir:
+                external |= 0x10  # MS-DOS directory attribute
+            out.write(CENTRAL_HEADER.pack(0x02014b50, (3 << 8) | version, version, UTF8_FLAG,
+                                          member.method, dos_time, dos_date, member.crc,
+                                          compressed_size, size, len(name), len(extra), 0, 0, 0,
+                                          external, offset))
+            out.write(name + extra)
+        end = out.tell()
+        count = len(members)
+        directory_size = end - start
+        if count > ZIP_FILECOUNT_LIMIT or start >= ZIP64_LIMIT or directory_size >= ZIP64_LIMIT:
+            out.write(ZIP64_END_RECORD.pack(0x06064b50, 44, 45, 45, 0, 0, count, count,
+                                            directory_size, start))
+            out.write(ZIP64_LOCATOR.pack(0x07064b50, 0, end, 1))
+            count = min(count, ZIP_FILECOUNT_LIMIT)
+            start = min(start, ZIP64_LIMIT)
+            directory_size = min(directory_size, ZIP64_LIMIT)
+        out.write(END_RECORD.pack(0x06054b50, 0, 0, count, count, directory_size, start, 0))
+        
+    @staticmethod
+    def dos_datetime(timestamp: float):
+        """(time, date) in MS-DOS format, clamped to the 1980-2107 range"""
+        t = time.localtime(timestamp)
+        year = min(max(t.tm_year, 1980), 2107)
+        dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+        dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+        return dos_time, dos_date
\ No newline at end of file